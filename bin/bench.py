@@ -0,0 +1,495 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Benchmark ``searchio`` commands offline.
+
+Every benchmark runs ``src/searchio`` in a throwaway sandbox (its own
+workflow, data and cache directories), so your installed workflow
+and the repo's ``info.plist`` aren't touched. Suggestions are fetched
+from ``bin/stubserver.py``, which is started on a free port.
+
+Scenarios:
+
+    cold-start  ``searchio --version`` with an empty cache directory
+    cache-hit   ``searchio search`` for a query that's already cached
+    cache-miss  ``searchio search`` for a new query (stub server)
+    list        ``searchio list <query>``
+    variants    ``searchio variants google <query>``
+    reload      ``searchio reload`` with ``--searches`` saved searches
+    clean       ``searchio clean`` over ``--entries`` cache entries,
+                half of them expired (full scan, no expiry index)
+    clean-index the same, but using the expiry index
+
+Each scenario is run ``--warmup`` times (not timed), then ``--count``
+times. Wall times are reported as min/p50/p95/p99/mean in
+milliseconds. Use ``-o`` to save the results as JSON, and
+``-c`` to compare a run with saved results.
+"""
+
+from __future__ import print_function, absolute_import
+
+import argparse
+from collections import OrderedDict
+from datetime import datetime
+import hashlib
+import json
+import marshal
+import os
+import platform
+from plistlib import readPlist
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+from time import time, sleep
+
+
+here = os.path.dirname(os.path.abspath(__file__))
+rootdir = os.path.dirname(here)
+srcdir = os.path.join(rootdir, 'src')
+sys.path.insert(0, os.path.join(srcdir, 'lib'))
+
+from searchio import CACHE_FORMAT, CACHE_SERIALIZER  # noqa: E402
+from searchio import EXPIRY_BUCKET, MAX_CACHE_AGE  # noqa: E402
+
+SCENARIOS = ('cold-start', 'cache-hit', 'cache-miss', 'list', 'variants',
+             'reload', 'clean', 'clean-index')
+
+# UID of the search that points at the stub server
+SEARCH_UID = 'bench'
+
+# Benchmarks send requests faster than the default rate limit allows
+UNLIMITED = dict(rate=1000.0, burst=1000.0)
+
+# Files in `src` to symlink into the sandbox workflow directory.
+# `info.plist` is copied, as `reload` rewrites it.
+WORKFLOW_FILES = ('icon.png', 'icons', 'lib', 'lib.zip', 'searchio')
+
+
+def log(s, *args):
+    """Simple STDERR logger."""
+    if args:
+        s = s % args
+    print(s, file=sys.stderr)
+
+
+def percentile(values, p):
+    """Return percentile ``p`` (0-100) of sorted ``values``.
+
+    Interpolates linearly between the closest ranks.
+
+    """
+    if len(values) == 1:
+        return values[0]
+
+    k = (len(values) - 1) * p / 100.0
+    i = int(k)
+    if i + 1 >= len(values):
+        return values[-1]
+
+    return values[i] + (values[i + 1] - values[i]) * (k - i)
+
+
+def summarise(times):
+    """Return statistics for ``times`` in milliseconds."""
+    ms = sorted(t * 1000 for t in times)
+    return dict(
+        count=len(ms),
+        min=ms[0],
+        p50=percentile(ms, 50),
+        p95=percentile(ms, 95),
+        p99=percentile(ms, 99),
+        mean=sum(ms) / len(ms),
+        max=ms[-1],
+    )
+
+
+def free_port():
+    """Return an unused TCP port."""
+    s = socket.socket()
+    try:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+    finally:
+        s.close()
+
+
+def git_revision():
+    """Return current git commit or `None`."""
+    try:
+        with open(os.devnull, 'wb') as devnull:
+            return subprocess.check_output(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=rootdir, stderr=devnull).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Sandbox(object):
+    """Temporary workflow installation to run ``searchio`` in.
+
+    Attributes:
+        cachedir (str): Workflow cache directory.
+        datadir (str): Workflow data directory.
+        env (dict): Environment to run ``searchio`` with.
+        root (str): Temporary directory containing everything else.
+        workflowdir (str): Workflow directory.
+
+    """
+
+    def __init__(self):
+        """Create sandbox directories."""
+        self.root = tempfile.mkdtemp(prefix='searchio-bench-')
+        self.workflowdir = os.path.join(self.root, 'workflow')
+        self.datadir = os.path.join(self.root, 'data')
+        self.cachedir = os.path.join(self.root, 'cache')
+        for p in (self.workflowdir, self.datadir, self.cachedir):
+            os.makedirs(p)
+
+        for fn in WORKFLOW_FILES:
+            p = os.path.join(srcdir, fn)
+            if os.path.exists(p):
+                os.symlink(p, os.path.join(self.workflowdir, fn))
+
+        shutil.copy(os.path.join(srcdir, 'info.plist'), self.workflowdir)
+        version = readPlist(os.path.join(srcdir, 'info.plist'))['version']
+
+        # Don't check for updates
+        with open(os.path.join(self.datadir, 'settings.json'), 'wb') as fp:
+            json.dump({'__workflow_autoupdate': False}, fp)
+
+        self.env = dict(os.environ)
+        self.env.update(
+            alfred_version='3.0',
+            alfred_workflow_bundleid='net.deanishe.searchio',
+            alfred_workflow_cache=self.cachedir,
+            alfred_workflow_data=self.datadir,
+            alfred_workflow_name='Searchio',
+            alfred_workflow_version=version,
+            HOME=self.root,
+        )
+        for k in ('SEARCHIO_CASSETTE', 'alfred_debug'):
+            self.env.pop(k, None)
+
+    def add_search(self, uid, url, **options):
+        """Save a search whose suggestions are fetched from ``url``.
+
+        ``options`` are added to (or override) the search's settings.
+
+        """
+        p = os.path.join(self.datadir, 'searches')
+        if not os.path.exists(p):
+            os.makedirs(p)
+
+        d = dict(uid=uid, title='Bench ' + uid, keyword=uid,
+                 icon='icons/engines/google.png', jsonpath='$[1][*]',
+                 search_url='https://example.com/?q={query}',
+                 suggest_url=url)
+        d.update(options)
+        with open(os.path.join(p, uid + '.json'), 'wb') as fp:
+            json.dump(d, fp)
+
+    def clear_cache(self):
+        """Delete everything in the cache directory."""
+        shutil.rmtree(self.cachedir)
+        os.makedirs(self.cachedir)
+
+    def run(self, *args):
+        """Run ``searchio <args>`` and return wall time."""
+        cmd = [os.path.join(self.workflowdir, 'searchio')] + list(args)
+        with open(os.devnull, 'wb') as devnull:
+            start = time()
+            subprocess.check_call(cmd, cwd=self.workflowdir, env=self.env,
+                                  stdout=devnull, stderr=devnull)
+            return time() - start
+
+    def destroy(self):
+        """Delete sandbox."""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+class StubServer(object):
+    """``bin/stubserver.py`` running in a subprocess."""
+
+    def __init__(self, latency, logfile=None, stall=0):
+        """Start stub server with response time ``latency``.
+
+        If ``logfile`` is given, requests are logged to it. If
+        ``stall`` is given, responses stop for that many seconds
+        after the headers.
+
+        """
+        self.port = free_port()
+        self.url = 'http://127.0.0.1:{:d}/?q={{query}}'.format(self.port)
+        cmd = [sys.executable, os.path.join(here, 'stubserver.py'),
+               '-p', str(self.port), '-l', latency, '-s', str(stall)]
+        if not logfile:
+            cmd.append('-q')
+
+        with open(logfile or os.devnull, 'wb') as fp:
+            self.proc = subprocess.Popen(cmd, stderr=fp)
+
+        # Wait for server to start listening
+        for _ in range(100):
+            try:
+                socket.create_connection(('127.0.0.1', self.port)).close()
+                return
+            except socket.error:
+                sleep(0.05)
+
+        self.stop()
+        raise RuntimeError('stub server did not start')
+
+    def stop(self):
+        """Stop server."""
+        if self.proc.poll() is None:
+            self.proc.terminate()
+            self.proc.wait()
+
+
+class Bench(object):
+    """Benchmark scenarios.
+
+    Each ``scenario`` is a generator that does its (untimed) set-up,
+    then yields a function that performs one run and returns its
+    duration. Runs may do their own untimed preparation.
+
+    """
+
+    def __init__(self, sandbox, stub, args):
+        """Create new `Bench`."""
+        self.sb = sandbox
+        self.stub = stub
+        self.args = args
+        self._n = 0
+
+    def query(self):
+        """Return a query that hasn't been used before."""
+        self._n += 1
+        return 'query {:d} {:.0f}'.format(self._n, time() * 1000)
+
+    def cold_start(self):
+        """``searchio --version`` with empty cache."""
+        def run():
+            self.sb.clear_cache()
+            return self.sb.run('--version')
+
+        yield run
+
+    def cache_hit(self):
+        """``searchio search`` with cached suggestions."""
+        self.sb.run('search', SEARCH_UID, 'cached')
+        yield lambda: self.sb.run('search', SEARCH_UID, 'cached')
+
+    def cache_miss(self):
+        """``searchio search`` for a new query."""
+        yield lambda: self.sb.run('search', SEARCH_UID, self.query())
+
+    def list(self):
+        """``searchio list <query>``."""
+        yield lambda: self.sb.run('list', 'goo')
+
+    def variants(self):
+        """``searchio variants google <query>``."""
+        yield lambda: self.sb.run('variants', 'google', 'eng')
+
+    def reload(self):
+        """``searchio reload`` with many saved searches."""
+        for i in range(self.args.searches):
+            uid = 'reload-{:04d}'.format(i)
+            self.sb.add_search(uid, self.stub.url)
+
+        try:
+            yield lambda: self.sb.run('reload')
+        finally:
+            d = os.path.join(self.sb.datadir, 'searches')
+            for fn in os.listdir(d):
+                if fn.startswith('reload-'):
+                    os.unlink(os.path.join(d, fn))
+
+    def clean(self, index=False):
+        """``searchio clean`` over a large cache."""
+        template = os.path.join(self.sb.root, 'clean-template')
+        populate_cache(template, self.args.entries, index)
+
+        def run():
+            self.sb.clear_cache()
+            os.rmdir(self.sb.cachedir)
+            shutil.copytree(template, self.sb.cachedir, symlinks=True)
+            return self.sb.run('clean')
+
+        try:
+            yield run
+        finally:
+            shutil.rmtree(template)
+            self.sb.clear_cache()
+
+    def clean_index(self):
+        """``searchio clean`` over a large, indexed cache."""
+        return self.clean(index=True)
+
+    def run(self, name):
+        """Run scenario ``name`` and return its timings."""
+        gen = getattr(self, name.replace('-', '_'))()
+        fn = next(gen)
+        try:
+            for _ in range(self.args.warmup):
+                fn()
+
+            return [fn() for _ in range(self.args.count)]
+        finally:
+            gen.close()
+
+
+def populate_cache(cachedir, entries, index=False):
+    """Write ``entries`` cached suggestions, half of them expired.
+
+    Entries are spread over 10 searches, in the same layout as
+    `searchio.cache.cache_key()`, and all have the same 10 suggestions,
+    interned as `searchio.terms.intern()` does. If ``index`` is `True`,
+    they are also added to the expiry index, as
+    `searchio.cache.expire_at()` does.
+
+    """
+    now = time()
+    old = now - 86400
+    buckets = {}
+    dictionary = '# 0\n'
+    ids = []
+    for j in range(10):
+        ids.append(len(dictionary))
+        dictionary += 'suggestion {:d}\n'.format(j)
+
+    for i in range(10):
+        d = os.path.join(cachedir, 'terms', 'search-{:d}'.format(i))
+        os.makedirs(d)
+        with open(os.path.join(d, '1.txt'), 'wb') as fp:
+            fp.write(dictionary)
+
+    for i in range(entries):
+        uid = 'search-{:d}'.format(i % 10)
+        h = hashlib.md5(str(i)).hexdigest()
+        d = os.path.join(cachedir, 'searches', uid, h[:2], h[2:4])
+        if not os.path.exists(d):
+            os.makedirs(d)
+
+        p = os.path.join(d, h + '.' + CACHE_SERIALIZER)
+        with open(p, 'wb') as fp:
+            marshal.dump((CACHE_FORMAT, now, 1, ids), fp, 2)
+        if i % 2:
+            os.utime(p, (old, old))
+
+        key = 'searches/{}/{}/{}/{}'.format(uid, h[:2], h[2:4], h)
+        expiry = (old if i % 2 else now) + MAX_CACHE_AGE
+        buckets.setdefault(int(expiry // EXPIRY_BUCKET), []).append(key)
+
+    if index:
+        d = os.path.join(cachedir, 'expiry')
+        os.makedirs(d)
+        for n, keys in buckets.items():
+            with open(os.path.join(d, '{:d}.txt'.format(n)), 'wb') as fp:
+                fp.write(''.join(k + '\n' for k in keys))
+
+        open(os.path.join(d, '.indexed'), 'w').close()
+
+
+def print_results(results, baseline=None):
+    """Print table of results, compared to ``baseline`` if given."""
+    cols = ('min', 'p50', 'p95', 'p99', 'mean')
+    print('{:<12}'.format('scenario') +
+          ''.join('{:>10}'.format(c) for c in cols) +
+          ('{:>10}'.format('Δ p50') if baseline else ''))
+
+    for name, d in results.items():
+        s = d['stats']
+        line = '{:<12}'.format(name) + ''.join(
+            '{:>8.1f}ms'.format(s[c]) for c in cols)
+        if baseline:
+            b = baseline.get(name)
+            if b:
+                delta = (s['p50'] - b['stats']['p50']) / b['stats']['p50']
+                line += '{:>+9.1f}%'.format(delta * 100)
+            else:
+                line += '{:>10}'.format('n/a')
+
+        print(line)
+
+
+def main():
+    """Run benchmarks."""
+    p = argparse.ArgumentParser(
+        description=__doc__.split('\n')[0],
+        epilog='Scenarios: ' + ', '.join(SCENARIOS))
+    p.add_argument('-n', '--count', type=int, default=20,
+                   help='timed runs per scenario (default: 20)')
+    p.add_argument('-w', '--warmup', type=int, default=2,
+                   help='untimed runs per scenario (default: 2)')
+    p.add_argument('-l', '--latency', default='0.02',
+                   help='stub server latency (see stubserver.py; '
+                        'default: 0.02)')
+    p.add_argument('-s', '--searches', type=int, default=100,
+                   help='saved searches for `reload` (default: 100)')
+    p.add_argument('-e', '--entries', type=int, default=10000,
+                   help='cache entries for `clean` (default: 10000)')
+    p.add_argument('-o', '--output', metavar='FILE',
+                   help='save results to FILE as JSON')
+    p.add_argument('-c', '--compare', metavar='FILE',
+                   help='compare p50 with results saved in FILE')
+    p.add_argument('scenarios', nargs='*', metavar='scenario',
+                   help='scenarios to run (default: all)')
+    args = p.parse_args()
+
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            p.error('unknown scenario: ' + name)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)['results']
+
+    sandbox = Sandbox()
+    stub = StubServer(args.latency)
+    bench = Bench(sandbox, stub, args)
+    sandbox.add_search(SEARCH_UID, stub.url, **UNLIMITED)
+
+    results = {}
+    try:
+        for name in args.scenarios or SCENARIOS:
+            log('running %s ...', name)
+            results[name] = dict(times=bench.run(name))
+            results[name]['stats'] = summarise(results[name]['times'])
+    finally:
+        stub.stop()
+        sandbox.destroy()
+
+    results = OrderedDict((k, results[k]) for k in SCENARIOS if k in results)
+    print_results(results, baseline)
+
+    if args.output:
+        data = dict(
+            date=datetime.utcnow().isoformat() + 'Z',
+            revision=git_revision(),
+            python=platform.python_version(),
+            platform=platform.platform(),
+            options=dict(count=args.count, warmup=args.warmup,
+                         latency=args.latency, searches=args.searches,
+                         entries=args.entries),
+            results=results,
+        )
+        with open(args.output, 'wb') as fp:
+            json.dump(data, fp, indent=2, sort_keys=True)
+
+        log('results saved to %s', args.output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Compare size and load time of suggestion cache entry formats.
+
+Formats:
+
+    results     list of ``Result(term, url, source)`` tuples, pickled
+                (the old format)
+    terms       ``(CACHE_FORMAT, time, terms)``, pickled
+    marshal     ``(CACHE_FORMAT, time, terms)``, marshalled
+    interned    ``(CACHE_FORMAT, time, gen, ids)``, marshalled, plus
+                its share of the term dictionary (the current format)
+
+Entries come in groups, like the prefixes of a word being typed,
+whose suggestions overlap (by default, 6 prefixes that each have 9
+of the previous prefix's 10 suggestions).
+
+"load" is the time to deserialize an entry. "results" is the time to
+turn it into the results ``searchio search`` shows, incl. the result
+for the query itself, i.e. for the ``terms`` formats it includes
+generating the URLs.
+"""
+
+from __future__ import print_function, absolute_import
+
+import argparse
+from collections import namedtuple
+import cPickle
+import marshal
+import os
+import sys
+from time import time
+
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(here), 'src', 'lib'))
+
+from searchio import CACHE_FORMAT  # noqa: E402
+from searchio import util  # noqa: E402
+
+# Same as `searchio.cmd.search.Result`, which would import too much
+Result = namedtuple('Result', 'term url source')
+
+URL = 'https://www.google.com/search?q={query}&hl=en&safe=off'
+TITLE = u'Google (English)'
+
+
+def make_terms(i, n, group):
+    """Return ``n`` suggestions for the ``i``-th query."""
+    word, prefix = divmod(i, group)
+    return [u'suggestion {:d} for word number {:d}'.format(j, word)
+            for j in range(prefix, prefix + n)]
+
+
+class Dictionary(object):
+    """In-memory version of a `searchio.terms` dictionary."""
+
+    def __init__(self):
+        self.data = '# 0\n'
+
+    def intern(self, terms):
+        """Return IDs of ``terms``, adding new ones."""
+        ids = []
+        for term in terms:
+            line = term.encode('utf-8')
+            i = self.data.find('\n' + line + '\n')
+            if i < 0:
+                i = len(self.data) - 1
+                self.data += line + '\n'
+            ids.append(i + 1)
+        return ids
+
+    def lookup(self, ids):
+        """Return terms with ``ids``."""
+        data = self.data
+        return [data[i:data.find('\n', i)].decode('utf-8') for i in ids]
+
+
+def old_results(data, query):
+    """Generate results from entry in old format."""
+    return data + [Result(query, util.mkurl(URL, query), TITLE)]
+
+
+def terms_results(data, query):
+    """Generate results from entry in terms format."""
+    mkurl = util.url_builder(URL)
+    return ([Result(t, mkurl(t), TITLE) for t in data[2]] +
+            [Result(query, mkurl(query), TITLE)])
+
+
+def interned_load(dictionary):
+    """Return function to load entries interned in ``dictionary``."""
+    def load(s):
+        data = marshal.loads(s)
+        return data[:2] + (dictionary.lookup(data[3]),)
+    return load
+
+
+def main():
+    """Run benchmark."""
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    p.add_argument('-e', '--entries', type=int, default=2000,
+                   help='number of cache entries (default: 2000)')
+    p.add_argument('-n', '--suggestions', type=int, default=10,
+                   help='suggestions per entry (default: 10)')
+    p.add_argument('-g', '--group', type=int, default=6,
+                   help='entries with overlapping suggestions (default: 6)')
+    args = p.parse_args()
+
+    now = time()
+    dictionary = Dictionary()
+    formats = [('results', [], cPickle.loads, old_results),
+               ('terms', [], cPickle.loads, terms_results),
+               ('marshal', [], marshal.loads, terms_results),
+               ('interned', [], interned_load(dictionary), terms_results)]
+
+    for i in range(args.entries):
+        terms = make_terms(i, args.suggestions, args.group)
+        results = [Result(t, util.mkurl(URL, t), TITLE) for t in terms]
+        formats[0][1].append(cPickle.dumps(results, protocol=-1))
+        formats[1][1].append(cPickle.dumps((CACHE_FORMAT, now, terms),
+                                           protocol=-1))
+        formats[2][1].append(marshal.dumps((CACHE_FORMAT, now, terms), 2))
+        formats[3][1].append(marshal.dumps(
+            (CACHE_FORMAT, now, 1, dictionary.intern(terms)), 2))
+
+    print('{:<10} {:>12} {:>12} {:>12}'.format('format', 'bytes/entry',
+                                               'load (µs)', 'results (µs)'))
+    for name, entries, load, results in formats:
+        size = sum(len(s) for s in entries)
+        if name == 'interned':
+            size += len(dictionary.data)
+        size /= float(len(entries))
+        start = time()
+        for s in entries:
+            load(s)
+        t_load = (time() - start) / len(entries) * 1e6
+
+        start = time()
+        for s in entries:
+            results(load(s), u'query')
+        t_results = (time() - start) / len(entries) * 1e6
+
+        print('{:<10} {:>12.0f} {:>12.1f} {:>12.1f}'.format(
+            name, size, t_load, t_results))
+
+
+if __name__ == '__main__':
+    main()
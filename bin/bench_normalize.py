@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Measure effect of query normalisation on suggestion cache hit ratio.
+
+Replays a query log and counts how many queries would have been
+cache hits (i.e. the same cache key had been seen before) with:
+
+    exact       raw query (the old behaviour)
+    nfc         NFC-normalised, whitespace collapsed
+    casefold    as ``nfc``, plus lowercased
+
+Each line of the log is either ``<search UID><TAB><query>`` or just
+a query. Use ``-`` to read the log from STDIN. Expiry is ignored, so
+the figures are an upper bound on the real hit ratio.
+"""
+
+from __future__ import print_function, absolute_import
+
+import argparse
+from collections import namedtuple
+import os
+import sys
+
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(here), 'src', 'lib'))
+
+from searchio import cache  # noqa: E402
+
+# Stand-in for `searchio.engines.Search`
+Search = namedtuple('Search', 'uid casefold')
+
+
+def read_log(fp):
+    """Yield ``(uid, query)`` tuples from log file."""
+    for line in fp:
+        line = line.decode('utf-8').rstrip(u'\r\n')
+        if not line:
+            continue
+        uid, _, query = line.rpartition(u'\t')
+        yield uid or u'default', query
+
+
+def main():
+    """Run benchmark."""
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    p.add_argument('logfile', help='query log (`-` for STDIN)')
+    args = p.parse_args()
+
+    if args.logfile == '-':
+        queries = list(read_log(sys.stdin))
+    else:
+        with open(args.logfile) as fp:
+            queries = list(read_log(fp))
+
+    modes = [
+        ('exact', None),
+        ('nfc', False),
+        ('casefold', True),
+    ]
+
+    print('{:<10} {:>9} {:>9} {:>9}'.format('mode', 'queries', 'hits',
+                                            'ratio'))
+    for name, casefold in modes:
+        seen = set()
+        hits = 0
+        for uid, query in queries:
+            if casefold is None:
+                key = (uid, query)
+            else:
+                s = Search(uid, casefold)
+                key = cache.cache_key(s, cache.canonical_query(s, query))
+
+            if key in seen:
+                hits += 1
+            else:
+                seen.add(key)
+
+        ratio = float(hits) / len(queries) if queries else 0.0
+        print('{:<10} {:>9d} {:>9d} {:>8.1f}%'.format(name, len(queries),
+                                                      hits, ratio * 100))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Compare ``searchio`` start-up from ``src/lib`` and ``src/lib.zip``.
+
+Runs ``searchio search <search> <query>`` repeatedly on the cache-hit
+path (the query is fetched once first) and reports per-invocation
+wall time for:
+
+    lib     python -c '<import from src/lib>' (the old behaviour)
+    zip     src/searchio launcher (-OSE + src/lib.zip)
+
+If ``strace`` is installed, the number of system calls and the number
+of ``stat``/``open`` calls per invocation are also reported.
+
+Build the archive with ``python -O bin/mkzip.py`` first.
+"""
+
+from __future__ import print_function, absolute_import
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from time import time
+
+
+here = os.path.dirname(os.path.abspath(__file__))
+srcdir = os.path.join(os.path.dirname(here), 'src')
+
+# Bootstrap that imports searchio the old way: site + src/lib
+BOOT_LIB = ("import sys; sys.path.insert(0, 'lib'); "
+            "from searchio import cli; cli.main()")
+
+# System calls that count as filesystem lookups
+LOOKUP_CALLS = set(['stat', 'stat64', 'lstat', 'lstat64', 'newfstatat',
+                    'statx', 'open', 'openat', 'access'])
+
+
+def log(s, *args):
+    """Simple STDERR logger."""
+    if args:
+        s = s % args
+    print(s, file=sys.stderr)
+
+
+def commands(search, query):
+    """Return ``{mode: command}`` for the benchmarks."""
+    return {
+        'lib': ['/usr/bin/python', '-c', BOOT_LIB, 'search', search, query],
+        'zip': [os.path.join(srcdir, 'searchio'), 'search', search, query],
+    }
+
+
+def run(cmd):
+    """Run ``cmd`` in workflow directory and return wall time."""
+    with open(os.devnull, 'wb') as devnull:
+        start = time()
+        subprocess.check_call(cmd, cwd=srcdir, stdout=devnull,
+                              stderr=devnull)
+        return time() - start
+
+
+def count_syscalls(cmd):
+    """Return ``(total, lookups)`` system calls made by ``cmd``.
+
+    Returns ``None`` if ``strace`` isn't available.
+
+    """
+    fd, path = tempfile.mkstemp(suffix='.strace')
+    os.close(fd)
+    try:
+        try:
+            run(['strace', '-f', '-qq', '-o', path] + cmd)
+        except OSError:  # strace not installed
+            return None
+
+        total = lookups = 0
+        rx = re.compile(r'^(?:\d+\s+)?([a-z0-9_]+)\(')
+        with open(path) as fp:
+            for line in fp:
+                m = rx.match(line)
+                if not m:  # resumed calls, signals, exits
+                    continue
+                total += 1
+                if m.group(1) in LOOKUP_CALLS:
+                    lookups += 1
+
+        return total, lookups
+    finally:
+        os.unlink(path)
+
+
+def main():
+    """Run benchmarks."""
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    p.add_argument('-n', '--count', type=int, default=20,
+                   help='runs per mode (default: 20)')
+    p.add_argument('search', nargs='?', default='google-en',
+                   help='UID of installed search (default: google-en)')
+    p.add_argument('query', nargs='?', default='python',
+                   help='query to search for (default: python)')
+    args = p.parse_args()
+
+    if not os.path.exists(os.path.join(srcdir, 'lib.zip')):
+        log('error: src/lib.zip not found; run `python -O bin/mkzip.py`')
+        return 1
+
+    cmds = commands(args.search, args.query)
+    # Populate cache, so every timed run is a cache hit
+    run(cmds['lib'])
+
+    print('{:<6} {:>9} {:>9} {:>9} {:>9} {:>9}'.format(
+        'mode', 'min', 'median', 'mean', 'syscalls', 'lookups'))
+
+    for mode in ('lib', 'zip'):
+        cmd = cmds[mode]
+        run(cmd)  # warm OS caches
+        times = sorted(run(cmd) for _ in range(args.count))
+        median = times[len(times) // 2]
+        mean = sum(times) / len(times)
+        counts = count_syscalls(cmd)
+        if counts:
+            total, lookups = [str(n) for n in counts]
+        else:
+            total = lookups = 'n/a'
+
+        print('{:<6} {:>7.1f}ms {:>7.1f}ms {:>7.1f}ms {:>9} {:>9}'.format(
+            mode, times[0] * 1000, median * 1000, mean * 1000,
+            total, lookups))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
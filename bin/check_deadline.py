@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Check that `searchio.util.getjson` deadlines are met.
+
+Runs ``bin/stubserver.py`` with responses that stall after the
+headers, and checks that ``getjson()`` gives up (with and without
+a hedged request) within ``--slack`` seconds of its deadline. Also
+checks that a server that doesn't stall is answered.
+
+Exits with status 1 if a check fails.
+"""
+
+from __future__ import print_function, absolute_import
+
+import argparse
+import os
+import sys
+import threading
+from time import time
+
+from bench import StubServer, log
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(here), 'src', 'lib'))
+
+from searchio import util  # noqa: E402
+
+
+def check(name, url, slack, timeout, hedge=None, stalls=True):
+    """Run one check and return `True` if it passed."""
+    start = time()
+    try:
+        util.getjson(url.format(query='test'), timeout=timeout, hedge=hedge)
+        err = None
+    except util.DeadlineExceeded as err:
+        pass
+    elapsed = time() - start
+
+    if stalls:
+        ok = err is not None and elapsed < timeout + slack
+    else:
+        ok = err is None
+    log('%s %-24s %6.1f ms', 'ok  ' if ok else 'FAIL', name, elapsed * 1000)
+    return ok
+
+
+def main():
+    """Run checks."""
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    p.add_argument('-t', '--timeout', type=float, default=0.3,
+                   help='deadline in seconds (default: 0.3)')
+    p.add_argument('-s', '--slack', type=float, default=0.01,
+                   help='allowed overrun in seconds (default: 0.01)')
+    args = p.parse_args()
+
+    # Check a working server first, so imports aren't timed
+    ok = True
+    server = StubServer('0')
+    try:
+        ok &= check('no stall', server.url, args.slack, args.timeout,
+                    stalls=False)
+    finally:
+        server.stop()
+
+    server = StubServer('0', stall=args.timeout * 10)
+    try:
+        ok &= check('stall', server.url, args.slack, args.timeout)
+        ok &= check('stall + hedge', server.url, args.slack, args.timeout,
+                    hedge=args.timeout / 3)
+    finally:
+        server.stop()
+
+    # Let abandoned requests fail before the interpreter exits
+    for t in threading.enumerate():
+        if t.name.startswith('getjson-'):
+            t.join()
+
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
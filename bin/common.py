@@ -16,7 +16,7 @@ from collections import namedtuple
 import os
 import re
 import sys
-from urllib import urlopen
+import urllib2
 from uuid import uuid4
 
 
@@ -53,6 +53,9 @@ def mkdata(title, description, icon='', variants=None, **kwargs):
     if 'pcencode' in kwargs:
         d['pcencode'] = kwargs['pcencode']
 
+    if 'casefold' in kwargs:
+        d['casefold'] = kwargs['casefold']
+
     return d
 
 
@@ -100,6 +103,33 @@ def httpget(url, cachepath=None):
     return data
 
 
+def urlopen(url):
+    """Open ``url``, recording or replaying it if a cassette is set.
+
+    See ``searchio.cassette`` for the ``SEARCHIO_CASSETTE`` and
+    ``SEARCHIO_CASSETTE_MODE`` environment variables.
+
+    Args:
+        url (str): URL to open.
+
+    Returns:
+        file: File-like HTTP response.
+    """
+    handlers = []
+    if os.getenv('SEARCHIO_CASSETTE'):
+        libdir = os.path.join(os.path.dirname(os.path.dirname(
+                              os.path.abspath(__file__))), 'src', 'lib')
+        if libdir not in sys.path:
+            sys.path.insert(0, libdir)
+
+        from searchio.cassette import Cassette, Handler
+        handlers.append(Handler(Cassette(
+            os.getenv('SEARCHIO_CASSETTE'),
+            os.getenv('SEARCHIO_CASSETTE_MODE') or 'replay')))
+
+    return urllib2.build_opener(*handlers).open(url)
+
+
 def print_lang(lang, **kwargs):
     s = u'{l.code}\t{l.name}'.format(l=lang).encode('utf-8')
     print(s, **kwargs)
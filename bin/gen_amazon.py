@@ -83,7 +83,7 @@ def stores():
 
 def main():
     """Print Amazon engine JSON to STDOUT."""
-    data = mkdata('Amazon', 'Online shopping')
+    data = mkdata('Amazon', 'Online shopping', casefold=True)
 
     for s in stores():
         data['variants'].append(s)
@@ -415,7 +415,7 @@ def lang2search(l):
 
 def main():
     """Print Wikipedia engine JSON to STDOUT."""
-    data = mkdata(u'Bing', u'General search engine')
+    data = mkdata(u'Bing', u'General search engine', casefold=True)
 
     lines = LANGS.strip().split('\n')
     i = 0
@@ -38,7 +38,7 @@ def variants():
 
 def main():
     """Print eBay engine JSON to STDOUT."""
-    data = mkdata(u'eBay', u'Online auction search')
+    data = mkdata(u'eBay', u'Online auction search', casefold=True)
     for v in variants():
         s = mkvariant(v.uid.lower(),
                       v.name,
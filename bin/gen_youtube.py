@@ -76,7 +76,7 @@ def yt2search(y):
 
 
 def main():
-    data = mkdata(u'YouTube', u'Video search')
+    data = mkdata(u'YouTube', u'Video search', casefold=True)
 
     soup = BS(html(), 'html.parser')
     for y in parse(soup):
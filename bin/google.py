@@ -45,7 +45,8 @@ def google_search(search_url, suggest_url, title, description, jsonpath=None):
         jsonpath (unicode, optional): JSONPath for results
 
     """
-    kwargs = {}
+    # Google's suggestions are case-insensitive
+    kwargs = {'casefold': True}
     if jsonpath:
         kwargs['jsonpath'] = jsonpath
 
@@ -0,0 +1,373 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Simulate many Alfred users typing searches at the same time.
+
+Each of ``--users`` simulated users types random words, one key at a
+time. Like Alfred, every keystroke runs ``searchio search`` with the
+query typed so far, and (unless ``--no-cancel`` is given) the
+previous process is terminated if it's still running. Delays between
+keys are log-normal with median ``--key-delay``, and users pause for
+``--pause`` seconds between words.
+
+By default, all users share one workflow installation (data and cache
+directories), i.e. they're the same account. Use ``--isolated`` to
+give each user their own. Suggestions come from ``bin/stubserver.py``
+(see `bench.py`), and the searches use the default rate limit unless
+``--rate``/``--burst`` are given.
+
+Reported are throughput (completed searches per second), latency
+percentiles of completed searches, HTTP requests received by the
+stub server, lock contention (time spent acquiring `LockFile`s and
+``flock()`` locks) and how much the cache directory grew.
+"""
+
+from __future__ import print_function, absolute_import
+
+import argparse
+from datetime import datetime
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from time import time, sleep
+
+from bench import (
+    Sandbox,
+    StubServer,
+    git_revision,
+    log,
+    percentile,
+)
+
+
+# UID of the search that points at the stub server
+SEARCH_UID = 'load'
+
+# Used if there's no system word list
+WORDS = (
+    'alfred apple banana cache coffee python search suggestion '
+    'keyboard network latency window workflow engine variant '
+    'mountain river ocean garden kitchen library museum station'
+).split()
+
+# Lock acquisitions slower than this (in seconds) count as contended
+CONTENDED = 0.001
+
+# Runs ``searchio`` like the ``searchio`` launcher, but records the
+# time spent acquiring locks in the file named by $LOADGEN_STATS
+BOOTSTRAP = """
+import atexit, fcntl, json, os, sys, time
+sys.path.insert(0, 'lib')
+waits = []
+
+def timed(fn):
+    def wrapper(*args, **kwargs):
+        start = time.time()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            waits.append(time.time() - start)
+    return wrapper
+
+_flock = fcntl.flock
+_timed_flock = timed(_flock)
+fcntl.flock = lambda fd, op: (_flock if op & fcntl.LOCK_UN
+                              else _timed_flock)(fd, op)
+
+from workflow import util
+util.LockFile.acquire = timed(util.LockFile.acquire)
+
+@atexit.register
+def save():
+    with open(os.environ['LOADGEN_STATS'], 'a') as fp:
+        fp.write(json.dumps(waits) + '\\n')
+
+from searchio import cli
+cli.main()
+"""
+
+
+def load_words(path):
+    """Return list of lowercase words from ``path`` or built-in list."""
+    try:
+        with open(path) as fp:
+            words = [s.strip().lower() for s in fp]
+    except (IOError, OSError):
+        return list(WORDS)
+
+    return [s for s in words if s.isalpha() and 3 <= len(s) <= 12]
+
+
+def dir_size(path):
+    """Return ``(files, bytes)`` in directory tree."""
+    files = size = 0
+    for root, _, filenames in os.walk(path):
+        for fn in filenames:
+            try:
+                size += os.path.getsize(os.path.join(root, fn))
+                files += 1
+            except OSError:  # deleted in the meantime
+                pass
+
+    return files, size
+
+
+class Keystroke(object):
+    """One ``searchio search`` process.
+
+    Attributes:
+        cancelled (bool): Whether process was terminated by next key.
+        duration (float): Wall time of process.
+        returncode (int): Exit status of process.
+
+    """
+
+    def __init__(self, sandbox, query, statsfile):
+        """Start ``searchio search`` for ``query``."""
+        self.cancelled = False
+        self.duration = None
+        self.returncode = None
+
+        env = dict(sandbox.env, LOADGEN_STATS=statsfile)
+        cmd = ['/usr/bin/python', '-OSE', '-c', BOOTSTRAP,
+               'search', SEARCH_UID, query]
+        with open(os.devnull, 'wb') as devnull:
+            self._start = time()
+            self.proc = subprocess.Popen(cmd, cwd=sandbox.workflowdir,
+                                         env=env, stdout=devnull,
+                                         stderr=devnull)
+
+        self._waiter = threading.Thread(target=self._wait)
+        self._waiter.daemon = True
+        self._waiter.start()
+
+    @property
+    def running(self):
+        """Whether process is still running."""
+        return self.returncode is None
+
+    def cancel(self):
+        """Terminate process if it's still running."""
+        if self.running:
+            self.cancelled = True
+            try:
+                self.proc.terminate()
+            except OSError:  # exited in the meantime
+                pass
+
+    def join(self):
+        """Wait for process to exit."""
+        self._waiter.join()
+
+    def _wait(self):
+        self.proc.wait()
+        self.duration = time() - self._start
+        self.returncode = self.proc.returncode
+
+
+class User(threading.Thread):
+    """Simulated user typing words until ``deadline``."""
+
+    def __init__(self, sandbox, words, args, deadline, statsfile):
+        """Create new `User`."""
+        super(User, self).__init__()
+        self.daemon = True
+        self.sandbox = sandbox
+        self.words = words
+        self.args = args
+        self.deadline = deadline
+        self.statsfile = statsfile
+        self.keystrokes = []
+        # Log-normal parameters for delay between keys
+        self._mu = math.log(args.key_delay)
+        self._sigma = 0.5
+
+    def run(self):
+        """Type words until deadline."""
+        # Don't start all users in step
+        sleep(random.uniform(0, self.args.pause))
+        prev = None
+        while time() < self.deadline:
+            query = u''
+            for c in random.choice(self.words):
+                if time() >= self.deadline:
+                    break
+
+                query += c
+                if prev and not self.args.no_cancel:
+                    prev.cancel()
+
+                prev = Keystroke(self.sandbox, query, self.statsfile)
+                self.keystrokes.append(prev)
+                sleep(random.lognormvariate(self._mu, self._sigma))
+
+            sleep(random.uniform(0, self.args.pause * 2))
+
+        for k in self.keystrokes:
+            k.join()
+
+
+def lock_stats(path):
+    """Return lock statistics from file written by `BOOTSTRAP`."""
+    waits = []
+    try:
+        with open(path) as fp:
+            for line in fp:
+                waits.extend(json.loads(line))
+    except IOError:
+        pass
+
+    waits.sort()
+    slow = [t for t in waits if t > CONTENDED]
+    return dict(
+        acquisitions=len(waits),
+        contended=len(slow),
+        wait_total=sum(slow),
+        wait_p99=percentile(waits, 99) if waits else 0.0,
+        wait_max=waits[-1] if waits else 0.0,
+    )
+
+
+def main():
+    """Run load test."""
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    p.add_argument('-u', '--users', type=int, default=10,
+                   help='number of simulated users (default: 10)')
+    p.add_argument('-d', '--duration', type=float, default=30.0,
+                   help='seconds to run for (default: 30)')
+    p.add_argument('-k', '--key-delay', type=float, default=0.15,
+                   help='median seconds between keys (default: 0.15)')
+    p.add_argument('-p', '--pause', type=float, default=1.0,
+                   help='average seconds between words (default: 1.0)')
+    p.add_argument('-l', '--latency', default='lognormal:0.08:0.5',
+                   help='stub server latency (see stubserver.py; '
+                        'default: lognormal:0.08:0.5)')
+    p.add_argument('-w', '--words', default='/usr/share/dict/words',
+                   help='word list (default: /usr/share/dict/words)')
+    p.add_argument('--rate', type=float,
+                   help='rate limit of search (requests/second)')
+    p.add_argument('--burst', type=float,
+                   help='burst size of search')
+    p.add_argument('--isolated', action='store_true',
+                   help='give each user their own data and cache')
+    p.add_argument('--no-cancel', action='store_true',
+                   help="don't terminate previous search on keystroke")
+    p.add_argument('-o', '--output', metavar='FILE',
+                   help='save results to FILE as JSON')
+    args = p.parse_args()
+
+    words = load_words(args.words)
+    tmpdir = tempfile.mkdtemp(prefix='searchio-loadgen-')
+    statsfile = os.path.join(tmpdir, 'locks.jsonl')
+    stublog = os.path.join(tmpdir, 'stub.log')
+    stub = StubServer(args.latency, stublog)
+
+    options = {}
+    if args.rate is not None:
+        options['rate'] = args.rate
+    if args.burst is not None:
+        options['burst'] = args.burst
+
+    sandboxes = []
+    for _ in range(args.users if args.isolated else 1):
+        sb = Sandbox()
+        sb.add_search(SEARCH_UID, stub.url, **options)
+        sandboxes.append(sb)
+
+    try:
+        # Create settings and directories first, so they don't count
+        for sb in sandboxes:
+            Keystroke(sb, u'warmup', os.devnull).join()
+            sb.clear_cache()
+
+        log('%d user(s) typing for %0.0fs ...', args.users, args.duration)
+        start = time()
+        users = [User(sandboxes[i % len(sandboxes)], words, args,
+                      start + args.duration, statsfile)
+                 for i in range(args.users)]
+        for u in users:
+            u.start()
+        for u in users:
+            u.join()
+
+        elapsed = time() - start
+        files = size = 0
+        for sb in sandboxes:
+            n, b = dir_size(sb.cachedir)
+            files += n
+            size += b
+    finally:
+        stub.stop()
+        for sb in sandboxes:
+            sb.destroy()
+
+    keys = [k for u in users for k in u.keystrokes]
+    done = [k for k in keys if not k.cancelled and k.returncode == 0]
+    failed = [k for k in keys if not k.cancelled and k.returncode != 0]
+    ms = sorted(k.duration * 1000 for k in done)
+    with open(stublog) as fp:
+        requests = sum(1 for line in fp if '"GET ' in line)
+
+    locks = lock_stats(statsfile)
+    results = dict(
+        elapsed=elapsed,
+        keystrokes=len(keys),
+        completed=len(done),
+        cancelled=len([k for k in keys if k.cancelled]),
+        failed=len(failed),
+        throughput=len(done) / elapsed,
+        latency=dict(
+            p50=percentile(ms, 50) if ms else None,
+            p95=percentile(ms, 95) if ms else None,
+            p99=percentile(ms, 99) if ms else None,
+            max=ms[-1] if ms else None,
+        ),
+        http_requests=requests,
+        locks=locks,
+        cache=dict(files=files, bytes=size),
+    )
+
+    print('keystrokes     {:d} ({:d} completed, {:d} cancelled, '
+          '{:d} failed)'.format(results['keystrokes'], results['completed'],
+                                results['cancelled'], results['failed']))
+    print('throughput     {:.1f} searches/s'.format(results['throughput']))
+    if ms:
+        print('latency        p50={p50:.1f}ms p95={p95:.1f}ms '
+              'p99={p99:.1f}ms max={max:.1f}ms'.format(**results['latency']))
+    print('HTTP requests  {:d} ({:.2f} per keystroke)'.format(
+          requests, float(requests) / (len(keys) or 1)))
+    print('locks          {acquisitions:d} acquired, {contended:d} contended, '
+          '{wait_total:.3f}s waiting (p99={wait_p99:.4f}s, '
+          'max={wait_max:.4f}s)'.format(**locks))
+    print('cache growth   {:d} files, {:.1f} KiB'.format(files, size / 1024.0))
+
+    if args.output:
+        data = dict(
+            date=datetime.utcnow().isoformat() + 'Z',
+            revision=git_revision(),
+            options=vars(args),
+            results=results,
+        )
+        with open(args.output, 'wb') as fp:
+            json.dump(data, fp, indent=2, sort_keys=True)
+
+        log('results saved to %s', args.output)
+
+    shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
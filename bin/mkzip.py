@@ -0,0 +1,163 @@
+#!/usr/bin/python -O
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Bundle the workflow's runtime libraries into ``src/lib.zip``.
+
+Only the modules that ``searchio`` actually imports (found with
+`modulefinder`) are added to the archive, and only as optimised
+bytecode (``.pyo``). The ``src/searchio`` launcher puts the archive
+at the front of ``sys.path``, so Python can import everything from
+a single file via `zipimport` instead of stat-walking ``src/lib``.
+
+Must be run with ``python -O`` (i.e. the same interpreter flags as
+the launcher), as that determines the bytecode type. Re-run it
+whenever anything in ``src/lib`` changes. The archive's ``MANIFEST``
+lists the source files it was built from. While Alfred's debugger is
+open, the launcher checks them and ignores the archive (with
+a warning) if one has changed.
+"""
+
+from __future__ import print_function, absolute_import
+
+import argparse
+import imp
+import marshal
+from modulefinder import ModuleFinder
+import os
+import struct
+import sys
+import zipfile
+
+
+here = os.path.dirname(os.path.abspath(__file__))
+srcdir = os.path.join(os.path.dirname(here), 'src')
+libdir = os.path.join(srcdir, 'lib')
+zippath = os.path.join(srcdir, 'lib.zip')
+
+# Archive member listing the bundled files (read by the launcher)
+MANIFEST = 'MANIFEST'
+
+# Modules the workflow runs or imports dynamically
+ENTRY_POINTS = [
+    'searchio.cli',
+    'workflow.background',
+    'workflow.update',
+]
+
+# Non-Python files read via `pkgutil.get_data()`
+DATA_FILES = [
+    'workflow/Notify.tgz',
+    'workflow/version',
+]
+
+
+def log(s, *args):
+    """Simple STDERR logger."""
+    if args:
+        s = s % args
+    print(s, file=sys.stderr)
+
+
+def entry_points():
+    """Entry points plus all ``searchio.cmd`` sub-commands."""
+    modules = list(ENTRY_POINTS)
+    cmddir = os.path.join(libdir, 'searchio', 'cmd')
+    for fn in sorted(os.listdir(cmddir)):
+        name, ext = os.path.splitext(fn)
+        if ext == '.py' and name != '__init__':
+            modules.append('searchio.cmd.' + name)
+
+    return modules
+
+
+def find_modules():
+    """Return ``{name: path}`` of all library modules needed at runtime.
+
+    Returns:
+        dict: Module name to source path (only modules in ``src/lib``).
+
+    """
+    finder = ModuleFinder(path=[libdir] + sys.path)
+    for name in entry_points():
+        finder.import_hook(name)
+
+    modules = {}
+    for name, mod in finder.modules.items():
+        path = mod.__file__
+        if not path or not path.startswith(libdir + '/'):
+            continue
+        modules[name] = path
+
+    return modules
+
+
+def compile_module(path):
+    """Compile Python source file to ``.pyc``/``.pyo`` bytes.
+
+    Args:
+        path (str): Path to ``.py`` file.
+
+    Returns:
+        str: Bytecode file contents.
+
+    """
+    with open(path, 'rU') as fp:
+        source = fp.read()
+
+    if not source.endswith('\n'):
+        source += '\n'
+
+    code = compile(source, path, 'exec', dont_inherit=True)
+    mtime = int(os.stat(path).st_mtime)
+    return imp.get_magic() + struct.pack('<I', mtime) + marshal.dumps(code)
+
+
+def main():
+    """Run script."""
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    p.add_argument('-o', '--output', default=zippath,
+                   help='path of archive (default: src/lib.zip)')
+    p.add_argument('-v', '--verbose', action='store_true',
+                   help='list modules added to archive')
+    args = p.parse_args()
+
+    if __debug__:
+        log('error: run with `python -O` to create optimised bytecode')
+        return 1
+
+    modules = find_modules()
+    tmp = args.output + '.tmp'
+    size = 0
+    sources = []
+    with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_STORED) as zf:
+        for name in sorted(modules):
+            path = modules[name]
+            relpath = os.path.relpath(path, libdir)
+            arcname = os.path.splitext(relpath)[0] + '.pyo'
+            data = compile_module(path)
+            size += len(data)
+            zf.writestr(arcname, data)
+            sources.append(relpath)
+            if args.verbose:
+                log('%-40s %s', name, arcname)
+
+        for relpath in DATA_FILES:
+            zf.write(os.path.join(libdir, relpath), relpath)
+            sources.append(relpath)
+
+        zf.writestr(MANIFEST, ''.join(p + '\n' for p in sources))
+
+    os.rename(tmp, args.output)
+    log('%d module(s), %d bytes of bytecode -> %s',
+        len(modules), size, os.path.relpath(args.output))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
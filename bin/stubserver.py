@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Local OpenSearch suggestion server for testing.
+
+If ``--cassette`` is given, requests whose path and query match a
+response recorded in the cassette (see ``searchio.cassette``) are
+answered with the recorded response, regardless of the host it was
+recorded from. All other requests are answered with OpenSearch-style
+suggestions for the ``q`` parameter, i.e.
+``["<q>", ["<q>", "<q> 1", "<q> 2", ...]]`` (``--results`` suggestions
+in total).
+
+Each response is delayed by a time drawn from ``--latency``, which
+is one of:
+
+    SECS                    fixed delay, e.g. 0.08
+    uniform:MIN:MAX         uniform between MIN and MAX seconds
+    lognormal:MEDIAN:SIGMA  log-normal, e.g. lognormal:0.08:0.5
+    bimodal:FAST:SLOW:P     FAST seconds, or SLOW with probability P
+                            (imitates a slow connection or backend node)
+
+If ``--stall`` is given, suggestion responses stop for that many
+seconds after the headers and the first byte of the body, like a
+server that hangs mid-response.
+
+Point a search's ``suggest_url`` at it, e.g.
+``http://127.0.0.1:8765/?q={query}``, or the same path and query as
+the recorded URL to replay a cassette.
+"""
+
+from __future__ import print_function, absolute_import
+
+import argparse
+import base64
+import BaseHTTPServer
+import json
+import os
+import random
+import socket
+import SocketServer
+import sys
+import time
+import urlparse
+
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(here), 'src', 'lib'))
+
+# Response headers not to replay, as the body is sent whole
+SKIP_HEADERS = set(['connection', 'content-length', 'transfer-encoding'])
+
+
+def parse_latency(spec):
+    """Return function that returns delays according to ``spec``.
+
+    Args:
+        spec (str): Latency distribution (see module docstring).
+
+    Returns:
+        callable: Function that returns a delay in seconds.
+
+    Raises:
+        ValueError: Raised if ``spec`` is invalid.
+
+    """
+    parts = spec.split(':')
+    name, args = parts[0], [float(s) for s in parts[1:]]
+    if not args:
+        secs = float(name)
+        return lambda: secs
+
+    if name == 'uniform' and len(args) == 2:
+        return lambda: random.uniform(*args)
+
+    if name == 'lognormal' and len(args) == 2:
+        import math
+        mu, sigma = math.log(args[0]), args[1]
+        return lambda: random.lognormvariate(mu, sigma)
+
+    if name == 'bimodal' and len(args) == 3:
+        fast, slow, p = args
+        return lambda: slow if random.random() < p else fast
+
+    raise ValueError('invalid latency: ' + spec)
+
+
+class Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Multi-threaded HTTP server."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        """Ignore clients that hang up (i.e. abandoned requests)."""
+        if sys.exc_info()[0] is socket.error:
+            return
+
+        BaseHTTPServer.HTTPServer.handle_error(self, request, client_address)
+
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Return suggestions after a random delay."""
+
+    # Set by `main()`
+    cassette = None
+    latency = staticmethod(lambda: 0.0)
+    results = 3
+    stall = 0.0
+    quiet = False
+
+    def do_GET(self):
+        """Handle GET request."""
+        time.sleep(max(0, self.latency()))
+
+        d = self.cassette.match(self.path) if self.cassette else None
+        if d:
+            self.send_recorded(d)
+            return
+
+        qs = urlparse.parse_qs(urlparse.urlsplit(self.path).query)
+        q = qs.get('q', [''])[0].decode('utf-8')
+        terms = [q] + [u'{} {:d}'.format(q, i)
+                       for i in range(1, self.results)]
+        data = json.dumps([q, terms])
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if self.stall:
+            self.wfile.write(data[:1])
+            self.wfile.flush()
+            time.sleep(self.stall)
+            data = data[1:]
+        self.wfile.write(data)
+
+    def send_recorded(self, d):
+        """Send recorded response ``d``."""
+        body = base64.b64decode(d['body'])
+        self.send_response(d['status'], d['reason'])
+        for line in d['headers'].splitlines():
+            k, _, v = line.partition(':')
+            if k and k.lower() not in SKIP_HEADERS:
+                self.send_header(k, v.strip())
+
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        """Log request to STDERR unless ``--quiet``."""
+        if not self.quiet:
+            BaseHTTPServer.BaseHTTPRequestHandler.log_message(self, fmt,
+                                                              *args)
+
+
+def main():
+    """Run server."""
+    p = argparse.ArgumentParser(
+        description=__doc__.split('\n')[0],
+        epilog='Latency: SECS, uniform:MIN:MAX, lognormal:MEDIAN:SIGMA '
+               'or bimodal:FAST:SLOW:P')
+    p.add_argument('-p', '--port', type=int, default=8765,
+                   help='port to listen on (default: 8765)')
+    p.add_argument('-c', '--cassette',
+                   help='replay responses recorded in this cassette')
+    p.add_argument('-l', '--latency', type=parse_latency,
+                   default=parse_latency('0.08'),
+                   help='response time distribution (default: 0.08)')
+    p.add_argument('-n', '--results', type=int, default=3,
+                   help='number of suggestions to return (default: 3)')
+    p.add_argument('-s', '--stall', type=float, default=0.0,
+                   help='stop for SECS after sending headers (default: 0)')
+    p.add_argument('-q', '--quiet', action='store_true',
+                   help="don't log requests")
+    args = p.parse_args()
+
+    if args.cassette:
+        from searchio.cassette import Cassette
+        Handler.cassette = Cassette(args.cassette)
+        print('{:d} recorded response(s)'.format(
+              len(Handler.cassette.responses)), file=sys.stderr)
+
+    Handler.latency = staticmethod(args.latency)
+    Handler.results = args.results
+    Handler.stall = args.stall
+    Handler.quiet = args.quiet
+
+    server = Server(('127.0.0.1', args.port), Handler)
+    print('listening on http://127.0.0.1:{:d}/'.format(args.port),
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -26,6 +26,126 @@ HELP_URL = 'https://github.com/deanishe/alfred-searchio/issues'
 # Cache search results for 15 minutes
 MAX_CACHE_AGE = 900
 
+# Adaptive cache TTL. A search's TTL starts at `MAX_CACHE_AGE` and
+# is multiplied by `TTL_GROWTH` each time a refresh returns the same
+# suggestions (up to `TTL_MAX`) and divided by it when they've changed
+# (down to `TTL_MIN`).
+TTL_MIN = 300
+TTL_MAX = 86400 * 7
+TTL_GROWTH = 2.0
+
+# Default time limit (in seconds) for fetching search suggestions.
+# Covers the whole request: DNS lookup, connecting, TLS and reading
+# the response. Can be overridden per search via its "timeout" key.
+SEARCH_TIMEOUT = 3.0
+
+# Failed requests are cached for `ERROR_CACHE_AGE` seconds. After
+# `BREAKER_THRESHOLD` consecutive failures, no requests are sent to
+# a host for `BREAKER_COOLDOWN` seconds. Then requests are let through
+# one at a time till `BREAKER_PROBES` of them have succeeded.
+ERROR_CACHE_AGE = 30
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 60
+BREAKER_PROBES = 2
+
+# Searches with "hedge" enabled send a second request if the first
+# hasn't answered within the host's `HEDGE_PERCENTILE` latency. Only
+# once the host's latency histogram contains `HEDGE_MIN_SAMPLES`
+# requests. Histograms are halved when they reach `LATENCY_MAX_SAMPLES`.
+HEDGE_PERCENTILE = 0.9
+HEDGE_MIN_SAMPLES = 20
+LATENCY_MAX_SAMPLES = 200
+
+# Default rate limit for requests to a suggestion server: on average
+# `RATE_LIMIT` requests per second, and bursts of up to `RATE_BURST`
+# requests. Can be overridden per engine or search via its "rate"
+# and "burst" keys.
+RATE_LIMIT = 4.0
+RATE_BURST = 10.0
+
+# Stop reading suggestion responses after `MAX_BYTES` bytes or
+# `MAX_RESULTS` suggestions. Can be overridden per search via its
+# "max_bytes" and "max_results" keys (0 = no limit).
+MAX_BYTES = 256 * 1024
+MAX_RESULTS = 50
+
+# The suggestion cache is capped at `CACHE_MAX_ENTRIES` entries and
+# `CACHE_MAX_BYTES` bytes in total, and at `SEARCH_CACHE_MAX_ENTRIES`
+# and `SEARCH_CACHE_MAX_BYTES` per search. The per-search caps can be
+# overridden via a search's "cache_max_entries" and "cache_max_bytes"
+# keys (0 = no limit). Least-recently-used entries are evicted until
+# the cache is at `LRU_TARGET` of its cap (see `searchio.lru`). Usage
+# logs are compacted when they reach `LRU_LOG_MAX` bytes.
+CACHE_MAX_ENTRIES = 100000
+CACHE_MAX_BYTES = 100 * 1024 * 1024
+SEARCH_CACHE_MAX_ENTRIES = 20000
+SEARCH_CACHE_MAX_BYTES = 20 * 1024 * 1024
+LRU_TARGET = 0.9
+LRU_LOG_MAX = 1024 * 1024
+
+# Suggestions chosen by the user are remembered per search (see
+# `searchio.history`). Each use adds 1 to an entry's score, and scores
+# halve every `HISTORY_HALF_LIFE` seconds. The lowest-scored entries are
+# dropped when a search's history exceeds `HISTORY_MAX_ENTRIES`. Up to
+# `HISTORY_MAX_RESULTS` matching entries are shown above suggestions.
+HISTORY_HALF_LIFE = 86400 * 30
+HISTORY_MAX_ENTRIES = 20000
+HISTORY_MAX_RESULTS = 5
+
+# A request failing with a timeout, DNS or "network unreachable" error
+# queues a probe (a connection to `NETWORK_PROBE_HOST`, run by the worker).
+# If it fails, the workflow switches to offline mode (see
+# `searchio.network`), in which suggestions only come from the cache
+# and history. While offline, the network is probed again every
+# `NETWORK_CHECK_INTERVAL` seconds. The workflow variable
+# NETWORK_PROBE_HOST overrides the probe host; set it to an empty
+# value to turn offline mode off.
+NETWORK_CHECK_INTERVAL = 5
+NETWORK_PROBE_HOST = 'captive.apple.com:80'
+NETWORK_PROBE_TIMEOUT = 2.0
+
+# Cached suggestions are saved as (`CACHE_FORMAT`, time, generation,
+# term IDs) with the `CACHE_SERIALIZER` serializer (see
+# `searchio.cache`). Entries in other formats are ignored.
+CACHE_FORMAT = 2
+CACHE_SERIALIZER = 'marshal'
+
+# Suggested terms are interned in a dictionary per search (see
+# `searchio.terms`), which is compacted when it's bigger than
+# `TERMS_COMPACT_MIN` bytes and `TERMS_COMPACT_RATIO` times its size
+# after the last compaction.
+TERMS_COMPACT_MIN = 64 * 1024
+TERMS_COMPACT_RATIO = 2
+
+# Cache entries are added to an expiry index when they're written
+# (see `searchio.cache.expire_at`), grouped into buckets of
+# `EXPIRY_BUCKET` seconds, so `searchio clean` needn't check every
+# file. After sending results, searches spend up to `CLEAN_BUDGET`
+# seconds deleting expired entries.
+EXPIRY_BUCKET = 300
+CLEAN_BUDGET = 0.01
+
+# When the WARM_CACHE workflow variable is set, `searchio warm` is
+# started in the background after `searchio reload` and by searches,
+# but at most once every `WARM_INTERVAL` seconds.
+WARM_INTERVAL = 3600
+
+# Background jobs are run by a worker process (see `searchio.worker`),
+# which checks its queue every `WORKER_POLL_INTERVAL` seconds, runs up
+# to `WORKER_MAX_JOBS` jobs at a time, and exits after
+# `WORKER_IDLE_TIMEOUT` seconds without jobs.
+WORKER_POLL_INTERVAL = 0.1
+WORKER_MAX_JOBS = 2
+WORKER_IDLE_TIMEOUT = 30
+
+# Per-run timings (see `searchio.spans`) are appended to a log file,
+# which is rotated when it reaches `SPANS_MAX_BYTES`.
+SPANS_MAX_BYTES = 1024 * 1024
+
+# Maximum number of profiles to keep when SEARCHIO_PROFILE is set.
+# The oldest are deleted first.
+PROFILE_MAX_FILES = 500
+
 IMAGE_EXTENSIONS = [
     '.png',
     '.icns',
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Per-host circuit breaker for suggestion requests.
+
+A breaker is "closed" while a host is working. After
+``BREAKER_THRESHOLD`` consecutive failed requests, it "opens" and
+no requests are sent to the host for ``BREAKER_COOLDOWN`` seconds.
+Then it is "half-open": requests are let through one at a time, and
+after ``BREAKER_PROBES`` successes, the breaker closes again. A failure
+while half-open re-opens it.
+
+State is saved in the cache directory, so it is shared by all
+``searchio`` processes. The file is locked while it is updated.
+"""
+
+from __future__ import print_function, absolute_import
+
+from contextlib import contextmanager
+import fcntl
+import json
+import os
+from time import time
+import urlparse
+
+from searchio import BREAKER_COOLDOWN, BREAKER_PROBES, BREAKER_THRESHOLD
+from searchio import util
+
+log = util.logger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+def url2host(url):
+    """Return (lowercase) host of ``url``, e.g. ``www.google.com``."""
+    return urlparse.urlsplit(url).netloc.lower()
+
+
+class Breaker(object):
+    """Circuit breaker for one host.
+
+    Attributes:
+        failures (int): Consecutive failed requests.
+        host (str): Hostname (and port) of suggestion server.
+        opened (float): Time the breaker last opened.
+        path (str): Path of file breaker state is saved in.
+        probe (float): Start time of request in progress while
+            half-open, or 0.
+        state (str): ``CLOSED``, ``OPEN`` or ``HALF_OPEN``.
+        successes (int): Successful requests since half-opening.
+
+    """
+
+    def __init__(self, wf, host):
+        """Create new `Breaker` and load its saved state.
+
+        Args:
+            wf (workflow.Workflow3): Active workflow object.
+            host (str): Hostname (and port) of suggestion server.
+
+        """
+        self.host = host
+        self.path = wf.cachefile(u'breakers/{}.json'.format(host))
+        self.state = CLOSED
+        self.failures = 0
+        self.successes = 0
+        self.opened = 0.0
+        self.probe = 0.0
+        self._claimed = 0.0  # probe started by this object
+        self._load()
+
+    def allow(self):
+        """Whether a request may be sent to the host.
+
+        Returns:
+            bool: `False` if the breaker is open or another process
+                is already probing the host.
+
+        """
+        if self.state == CLOSED:
+            return True
+
+        with self._locked():
+            now = time()
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN:
+                if now - self.opened < BREAKER_COOLDOWN:
+                    return False
+
+                log.debug('[breaker/%s] half-open', self.host)
+                self.state = HALF_OPEN
+                self.successes = 0
+
+            elif self.probe and now - self.probe < BREAKER_COOLDOWN:
+                return False
+
+            self.probe = self._claimed = now
+            return True
+
+    def release(self):
+        """Give up the probe claimed by `allow` without sending it.
+
+        E.g. if the rate limiter refused the request. Otherwise, no
+        other request would be let through while half-open till
+        ``BREAKER_COOLDOWN`` has passed.
+        """
+        if not self._claimed:
+            return
+
+        with self._locked():
+            if self.probe == self._claimed:
+                self.probe = 0.0
+            self._claimed = 0.0
+
+    def success(self):
+        """Record a successful request."""
+        if self.state == CLOSED and not self.failures:
+            return
+
+        with self._locked():
+            if self.state == HALF_OPEN:
+                self.successes += 1
+                self.probe = 0.0
+                if self.successes >= BREAKER_PROBES:
+                    log.debug('[breaker/%s] closed', self.host)
+                    self.state = CLOSED
+                    self.failures = self.successes = 0
+
+            else:
+                self.failures = 0
+
+    def failure(self):
+        """Record a failed request."""
+        with self._locked():
+            self.failures += 1
+            if (self.state == HALF_OPEN or
+                    self.failures >= BREAKER_THRESHOLD):
+                log.warning('[breaker/%s] open after %d failure(s)',
+                            self.host, self.failures)
+                self.state = OPEN
+                self.opened = time()
+                self.probe = 0.0
+
+    def _dict(self):
+        """Return state as a `dict`."""
+        return dict(state=self.state, failures=self.failures,
+                    successes=self.successes, opened=self.opened,
+                    probe=self.probe)
+
+    def _update(self, d):
+        """Set state from `dict` ``d``."""
+        self.state = d.get('state', CLOSED)
+        self.failures = d.get('failures', 0)
+        self.successes = d.get('successes', 0)
+        self.opened = d.get('opened', 0.0)
+        self.probe = d.get('probe', 0.0)
+
+    def _load(self):
+        """Load saved state (if any)."""
+        try:
+            with open(self.path) as fp:
+                fcntl.flock(fp.fileno(), fcntl.LOCK_SH)
+                d = json.load(fp)
+        except (IOError, OSError, ValueError):  # new or corrupt file
+            return
+
+        self._update(d)
+
+    @contextmanager
+    def _locked(self):
+        """Lock state file, reload state, and save it if it changes.
+
+        Like `searchio.ratelimit.TokenBucket`, the state is updated
+        under an exclusive lock, so concurrent processes don't lose
+        each other's failures or probes.
+
+        """
+        try:
+            os.makedirs(os.path.dirname(self.path))
+        except OSError as err:
+            if err.errno != 17:
+                raise err
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                self._update(json.loads(os.read(fd, 1024)))
+            except ValueError:  # new or corrupt file
+                pass
+
+            before = self._dict()
+            yield
+            d = self._dict()
+            if d != before:
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, json.dumps(d))
+        finally:
+            os.close(fd)  # also releases lock
@@ -0,0 +1,365 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Helpers for the search suggestion cache.
+
+Cache entries contain only the IDs of the suggested terms in the
+search's term dictionary (see `searchio.terms`), plus the format
+version, the time they were fetched and the dictionary's generation
+(see `pack`). The URLs and titles of results are generated from the
+`Search` when they're loaded.
+Entries are saved with the ``marshal``-based `MarshalSerializer`,
+which is registered with Alfred-Workflow's serializer manager.
+
+Cache entries are added to an expiry index when they're written. The
+index is a directory of bucket files, ``expiry/<n>.txt``, each listing
+the keys of the entries that expire between ``n * EXPIRY_BUCKET`` and
+``(n + 1) * EXPIRY_BUCKET``. Adding an entry is a single append, and
+the bucket names sort like a min-heap of expiry times, so
+``searchio clean`` only reads the buckets that are due.
+"""
+
+from __future__ import print_function, absolute_import
+
+import hashlib
+import marshal
+import os
+from time import time
+from unicodedata import normalize
+
+from workflow.workflow import manager
+
+from searchio import CACHE_FORMAT, CACHE_SERIALIZER
+from searchio import EXPIRY_BUCKET, MAX_CACHE_AGE
+from searchio import TTL_GROWTH, TTL_MAX, TTL_MIN
+from searchio import terms as dictionary
+from searchio import util
+
+log = util.logger(__name__)
+
+# Directory of expiry index in cache directory
+EXPIRY_DIR = 'expiry'
+# File in `EXPIRY_DIR` that exists once every cache entry is indexed
+INDEXED = '.indexed'
+
+
+class MarshalSerializer(object):
+    """Serializer based on `marshal`.
+
+    Several times faster than cPickle, but only handles built-in types.
+    """
+
+    @classmethod
+    def load(cls, file_obj):
+        """Load data from ``file_obj``."""
+        return marshal.load(file_obj)
+
+    @classmethod
+    def dump(cls, obj, file_obj):
+        """Serialize ``obj`` to ``file_obj``."""
+        return marshal.dump(obj, file_obj, 2)
+
+
+manager.register('marshal', MarshalSerializer)
+
+
+def canonical_query(search, query):
+    """Normalise ``query`` before fetching and caching suggestions.
+
+    The query is NFC-normalised and its whitespace collapsed. If
+    ``search`` is case-insensitive (``search.casefold``), the query
+    is also lowercased. "Python ", "python" and "PYTHON" are thus
+    all the same query for Google.
+
+    Args:
+        search (searchio.engines.Search): Search configuration
+        query (unicode): Query as entered by user
+
+    Returns:
+        unicode: Canonical form of ``query``.
+
+    """
+    query = u' '.join(normalize('NFC', query).split())
+    if search.casefold:
+        query = query.lower()
+
+    return query
+
+
+def cache_key(search, query):
+    """Return cache key for (canonical) ``query``.
+
+    Args:
+        search (searchio.engines.Search): Search configuration
+        query (unicode): Canonical query (see `canonical_query`)
+
+    Returns:
+        unicode: Cache key for use with `load()` and `save()`.
+
+    """
+    h = hashlib.md5(query.encode('utf-8')).hexdigest()
+    return u'searches/{}/{}/{}/{}'.format(search.uid, h[:2], h[2:4], h)
+
+
+def entry_path(wf, key):
+    """Return path of the file cache entry ``key`` is saved in."""
+    return wf.cachefile(u'{}.{}'.format(key, CACHE_SERIALIZER))
+
+
+def age(wf, key):
+    """Return age of cache entry ``key`` in seconds, or 0 if none."""
+    try:
+        return time() - os.stat(entry_path(wf, key)).st_mtime
+    except OSError:
+        return 0
+
+
+def load(wf, key):
+    """Return data saved as cache entry ``key``, or `None`."""
+    try:
+        with open(entry_path(wf, key), 'rb') as fp:
+            return manager.serializer(CACHE_SERIALIZER).load(fp)
+    except (IOError, EOFError, ValueError, TypeError):
+        return None
+
+
+def save(wf, key, data):
+    """Save ``data`` as cache entry ``key``.
+
+    The entry's directory must exist.
+
+    """
+    from workflow.util import atomic_writer
+
+    with atomic_writer(entry_path(wf, key), 'wb') as fp:
+        manager.serializer(CACHE_SERIALIZER).dump(data, fp)
+
+
+def is_entry(data):
+    """Return `True` if ``data`` is a cache entry in the current format."""
+    return (isinstance(data, tuple) and len(data) == 4 and
+            data[0] == CACHE_FORMAT)
+
+
+def pack(wf, uid, terms):
+    """Return cache entry for suggestions ``terms``.
+
+    Adds the terms to the search's term dictionary.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        uid (unicode): Search UID.
+        terms (list): Suggested terms.
+
+    Returns:
+        tuple: Cache entry.
+
+    """
+    gen, ids = dictionary.intern(wf, uid, terms)
+    return (CACHE_FORMAT, time(), gen, ids)
+
+
+def unpack(wf, uid, data):
+    """Return suggestions from cache entry ``data``.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        uid (unicode): Search UID.
+        data (tuple): Cache entry as returned by `load`.
+
+    Returns:
+        list: Suggested terms, or `None` if ``data`` isn't an entry
+            in the current format or its dictionary has been compacted.
+
+    """
+    if not is_entry(data):
+        return None
+
+    return dictionary.lookup(wf, uid, data[2], data[3])
+
+
+def keys(wf, uid):
+    """Return keys of search ``uid``'s cache entries (not errors).
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        uid (unicode): Search UID.
+
+    Returns:
+        list: Cache keys.
+
+    """
+    top = wf.cachefile('searches')
+    ext = '.' + CACHE_SERIALIZER
+    found = []
+    for root, _, filenames in os.walk(os.path.join(top, uid)):
+        for fn in filenames:
+            if fn.endswith(ext) and not fn.endswith('.error' + ext):
+                p = os.path.join(root, fn)[len(top) + 1:-len(ext)]
+                found.append(wf.decode(u'searches/' + p))
+
+    return found
+
+
+def remove(wf, key):
+    """Delete cache entry ``key`` and any directories left empty.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        key (unicode): Cache key (see `cache_key`).
+
+    Returns:
+        int: Size of deleted file, or -1 if it didn't exist.
+
+    """
+    path = entry_path(wf, key)
+    try:
+        size = os.path.getsize(path)
+        os.unlink(path)
+    except OSError:  # already deleted
+        return -1
+
+    top = wf.cachefile('searches')
+    dirpath = os.path.dirname(path)
+    while dirpath.startswith(top + '/'):
+        try:
+            os.rmdir(dirpath)
+        except OSError:  # not empty
+            break
+        dirpath = os.path.dirname(dirpath)
+
+    return size
+
+
+def prefix_results(wf, search, query):
+    """Return cached suggestions for a prefix of ``query``.
+
+    Finds the longest prefix of ``query`` that has cached suggestions
+    (regardless of their age) and returns those that start with
+    ``query``. Used when suggestions for ``query`` itself can't be
+    fetched.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        search (searchio.engines.Search): Search configuration
+        query (unicode): Canonical query (see `canonical_query`)
+
+    Returns:
+        list: Cached terms matching ``query``.
+
+    """
+    prefix = query[:-1]
+    while prefix:
+        terms = unpack(wf, search.uid, load(wf, cache_key(search, prefix)))
+        if terms is not None:
+            q = query.lower()
+            return [t for t in terms if t.lower().startswith(q)]
+
+        prefix = prefix[:-1]
+
+    return []
+
+
+def expiry_bucket(expiry):
+    """Return number of expiry-index bucket for time ``expiry``."""
+    return int(expiry // EXPIRY_BUCKET)
+
+
+def expire_at(wf, key, expiry):
+    """Add cache entry ``key`` to the expiry index.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        key (unicode): Cache key (see `cache_key`).
+        expiry (float): Time entry expires.
+
+    """
+    p = wf.cachefile(u'{}/{:d}.txt'.format(EXPIRY_DIR,
+                                           expiry_bucket(expiry)))
+    flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+    try:
+        fd = os.open(p, flags, 0o600)
+    except OSError as err:
+        if err.errno != 2:
+            raise err
+        os.makedirs(os.path.dirname(p))
+        fd = os.open(p, flags, 0o600)
+
+    # A single write in append mode, so concurrent writers don't
+    # interleave their keys
+    try:
+        os.write(fd, (key + u'\n').encode('utf-8'))
+    finally:
+        os.close(fd)
+
+
+def _ttl_path(wf, uid):
+    """Path to file containing TTL of search ``uid``."""
+    return wf.cachefile('ttl/{}.txt'.format(uid))
+
+
+def get_ttl(wf, uid):
+    """Return current cache TTL for search ``uid``.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        uid (str): Search UID.
+
+    Returns:
+        float: Maximum age of cached suggestions in seconds.
+
+    """
+    try:
+        with open(_ttl_path(wf, uid)) as fp:
+            return float(fp.read())
+    except (IOError, OSError, ValueError):
+        return float(MAX_CACHE_AGE)
+
+
+def update_ttl(wf, uid, changed):
+    """Grow or shrink TTL of search ``uid``.
+
+    If a refresh returned the same suggestions as the expired cache
+    entry, the TTL is multiplied by ``TTL_GROWTH`` (up to ``TTL_MAX``),
+    otherwise it is divided by ``TTL_GROWTH`` (down to ``TTL_MIN``).
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        uid (str): Search UID.
+        changed (bool): Whether the suggestions were different.
+
+    Returns:
+        float: New TTL in seconds.
+
+    """
+    from workflow.util import atomic_writer
+
+    old = get_ttl(wf, uid)
+    if changed:
+        ttl = max(old / TTL_GROWTH, TTL_MIN)
+    else:
+        ttl = min(old * TTL_GROWTH, TTL_MAX)
+
+    if ttl == old:
+        return ttl
+
+    p = _ttl_path(wf, uid)
+    try:
+        os.makedirs(os.path.dirname(p))
+    except OSError as err:
+        if err.errno != 17:
+            raise err
+
+    with atomic_writer(p, 'wb') as fp:
+        fp.write(repr(ttl))
+
+    log.debug('[cache/%s] changed=%r, ttl=%0.0fs -> %0.0fs',
+              uid, changed, old, ttl)
+    return ttl
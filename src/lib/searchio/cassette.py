@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Record and replay HTTP responses for tests and benchmarks.
+
+A `Cassette` is a JSON file of recorded HTTP responses. Its `Handler`
+plugs into `workflow.web` (via ``web.handlers``) and either records
+every response received or replays recorded ones without touching
+the network.
+
+Set ``SEARCHIO_CASSETTE`` to the path of a cassette file to make
+``searchio`` use it, and ``SEARCHIO_CASSETTE_MODE`` to ``record``
+to record responses (the default is ``replay``). ``bin/stubserver.py``
+can also serve the suggestion responses in a cassette.
+"""
+
+from __future__ import print_function, absolute_import
+
+import base64
+import httplib
+import json
+import os
+from StringIO import StringIO
+import urllib
+import urllib2
+import urlparse
+
+from searchio import util
+
+log = util.logger(__name__)
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+
+def url_key(url):
+    """Return host-independent key for ``url``.
+
+    The key is the URL's path and its query with the parameters
+    sorted, so a URL matches regardless of server or parameter order.
+
+    Args:
+        url (str): URL to create key for.
+
+    Returns:
+        str: Path and normalised query.
+
+    """
+    u = urlparse.urlsplit(url)
+    query = urllib.urlencode(sorted(urlparse.parse_qsl(u.query, True)))
+    return u.path + '?' + query
+
+
+class Cassette(object):
+    """Recorded HTTP responses.
+
+    Attributes:
+        mode (str): ``RECORD`` or ``REPLAY``.
+        path (str): Path of cassette file.
+        responses (dict): Recorded responses keyed by
+            ``"<method> <url>"``.
+
+    """
+
+    def __init__(self, path, mode=REPLAY):
+        """Create new `Cassette` and load its responses (if any).
+
+        Args:
+            path (str): Path of cassette file.
+            mode (str, optional): ``RECORD`` or ``REPLAY``.
+
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError('Unknown cassette mode: {!r}'.format(mode))
+
+        self.path = path
+        self.mode = mode
+        self.responses = self._load()
+        self._index = None
+
+    def find(self, method, url):
+        """Return recorded response for request.
+
+        Args:
+            method (str): HTTP method.
+            url (str): URL of request.
+
+        Returns:
+            dict: Recorded response or `None`.
+
+        """
+        return self.responses.get(u'{} {}'.format(method, url))
+
+    def match(self, url):
+        """Return recorded GET response for ``url`` on any host.
+
+        Args:
+            url (str): URL or path + query (see `url_key`).
+
+        Returns:
+            dict: Recorded response or `None`.
+
+        """
+        if self._index is None:
+            self._index = {url_key(d['url']): d
+                           for d in self.responses.values()
+                           if d['method'] == 'GET'}
+
+        return self._index.get(url_key(url))
+
+    def add(self, method, url, status, reason, headers, body):
+        """Record a response and save cassette.
+
+        Args:
+            method (str): HTTP method.
+            url (str): URL of request.
+            status (int): HTTP status code.
+            reason (str): HTTP status message.
+            headers (str): Raw HTTP headers.
+            body (str): Raw response body.
+
+        Returns:
+            dict: Recorded response.
+
+        """
+        d = dict(method=method, url=url, status=status, reason=reason,
+                 headers=headers, body=base64.b64encode(body))
+        key = u'{} {}'.format(method, url)
+        self.responses[key] = d
+        self._index = None
+        self.save({key: d})
+        return d
+
+    def save(self, new=None):
+        """Save cassette.
+
+        Responses recorded by other processes in the meantime are kept.
+
+        Args:
+            new (dict, optional): Responses to add to those saved.
+
+        """
+        from workflow.util import atomic_writer
+
+        responses = self._load()
+        responses.update(new or self.responses)
+        with atomic_writer(self.path, 'wb') as fp:
+            json.dump(sorted(responses.values(), key=lambda d: d['url']),
+                      fp, indent=2, sort_keys=True)
+
+    def response(self, d):
+        """Create file-like HTTP response from a recorded one.
+
+        Args:
+            d (dict): Recorded response.
+
+        Returns:
+            urllib.addinfourl: Response as returned by `urllib2`.
+
+        """
+        headers = httplib.HTTPMessage(StringIO(d['headers']))
+        r = urllib.addinfourl(StringIO(base64.b64decode(d['body'])),
+                              headers, d['url'], d['status'])
+        r.msg = d['reason']
+        return r
+
+    def _load(self):
+        """Load responses from cassette file."""
+        try:
+            with open(self.path) as fp:
+                return {u'{} {}'.format(d['method'], d['url']): d
+                        for d in json.load(fp)}
+        except (IOError, OSError):
+            return {}
+
+
+class Handler(urllib2.BaseHandler):
+    """`urllib2` handler that records or replays a `Cassette`."""
+
+    # Before the default handlers (500) and error processor (1000)
+    handler_order = 100
+
+    def __init__(self, cassette):
+        """Create new `Handler` for ``cassette``."""
+        self.cassette = cassette
+
+    def default_open(self, req):
+        """Return recorded response in replay mode."""
+        if self.cassette.mode != REPLAY:
+            return None
+
+        url = req.get_full_url()
+        d = self.cassette.find(req.get_method(), url)
+        if not d:
+            raise urllib2.URLError('not in cassette: ' + url)
+
+        log.debug('[cassette] replaying %s', url)
+        return self.cassette.response(d)
+
+    def http_response(self, req, response):
+        """Record response in record mode."""
+        if self.cassette.mode != RECORD:
+            return response
+
+        url = req.get_full_url()
+        log.debug('[cassette] recording %s', url)
+        d = self.cassette.add(req.get_method(), url, response.code,
+                              response.msg, ''.join(response.info().headers),
+                              response.read())
+        return self.cassette.response(d)
+
+    https_response = http_response
+
+
+def install(path=None, mode=None):
+    """Make `workflow.web` use a cassette.
+
+    Args:
+        path (str, optional): Path of cassette file. Defaults to
+            ``$SEARCHIO_CASSETTE``.
+        mode (str, optional): ``RECORD`` or ``REPLAY``. Defaults to
+            ``$SEARCHIO_CASSETTE_MODE`` or ``REPLAY``.
+
+    Returns:
+        Cassette: Installed cassette or `None` if no path is set.
+
+    """
+    from workflow import web
+
+    path = path or os.getenv('SEARCHIO_CASSETTE')
+    if not path:
+        return None
+
+    mode = mode or os.getenv('SEARCHIO_CASSETTE_MODE') or REPLAY
+    c = Cassette(path, mode)
+    web.handlers.append(Handler(c))
+    log.debug('[cassette] %s %s', mode, util.shortpath(path))
+    return c
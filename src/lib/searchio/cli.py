@@ -26,10 +26,15 @@ Commands:
     clean        Delete stale cache files
     config       Display (filtered) settings
     help         Show help for a command
+    history      View suggestions you've chosen
     list         Display (filtered) list of engines
+    network      Show or check whether the network is online
+    profile      Show hotspots in collected profiles
     reload       Update info.plist
     search       Perform a search
+    stats        Show timings of searchio's phases
     variants     Display (filtered) list of engine variants
+    warm         Prefetch suggestions for likely queries
     web          Import a new search from a URL
 """
 
@@ -38,6 +43,7 @@ from __future__ import print_function, absolute_import
 import os
 import sys
 
+from searchio import spans
 from searchio import util
 
 log = util.logger(__name__)
@@ -48,6 +54,25 @@ def usage(wf=None):
     return __doc__
 
 
+def search_fast_path(argv):
+    """Return `True` if ``argv`` is a plain ``search <search> <query>``.
+
+    Such calls (i.e. every keystroke in a Script Filter) don't need
+    to be parsed by docopt.
+
+    Args:
+        argv (list): Command-line arguments (minus program name).
+
+    Returns:
+        bool: `True` if ``argv`` can bypass docopt.
+
+    """
+    if len(argv) != 3 or argv[0] != 'search':
+        return False
+
+    return not [s for s in argv[1:] if not s or s.startswith('-')]
+
+
 def cli(wf):
     """Script entry point.
 
@@ -55,15 +80,21 @@ def cli(wf):
         wf (worflow.Workflow3): Active workflow object.
 
     """
-    from docopt import docopt
-
-    vstr = '{} v{}'.format(wf.name, wf.version)
     wf.args
-    args = docopt(usage(wf), version=vstr, options_first=True)
-    log.debug('args=%r', args)
+    argv = sys.argv[1:]
+    if search_fast_path(argv):
+        # Skip docopt entirely for the hot path
+        cmd = argv[0]
+    else:
+        vstr = '{} v{}'.format(wf.name, wf.version)
+        args = util.parse_args(wf, usage(wf), version=vstr,
+                               options_first=True)
+        log.debug('args=%r', args)
+
+        cmd = args.get('<command>')
+        argv = [cmd] + args.get('<args>')
 
-    cmd = args.get('<command>')
-    argv = [cmd] + args.get('<args>')
+    spans.tag(cmd=cmd)
 
     # ---------------------------------------------------------
     # Initialise
@@ -75,6 +106,11 @@ def cli(wf):
             if err.errno != 17:  # ignore file exists
                 raise err
 
+    # Record or replay HTTP responses
+    if os.getenv('SEARCHIO_CASSETTE'):
+        from searchio import cassette
+        cassette.install()
+
     # ---------------------------------------------------------
     # Call sub-command
 
@@ -98,10 +134,22 @@ def cli(wf):
         from searchio.cmd.help import run
         return run(wf, argv)
 
+    elif cmd == 'history':
+        from searchio.cmd.history import run
+        return run(wf, argv)
+
     elif cmd == 'list':
         from searchio.cmd.list import run
         return run(wf, argv)
 
+    elif cmd == 'network':
+        from searchio.cmd.network import run
+        return run(wf, argv)
+
+    elif cmd == 'profile':
+        from searchio.cmd.profile import run
+        return run(wf, argv)
+
     if cmd == 'reload':
         from searchio.cmd.reload import run
         return run(wf, argv)
@@ -110,6 +158,10 @@ def cli(wf):
         from searchio.cmd.search import run
         return run(wf, argv)
 
+    if cmd == 'stats':
+        from searchio.cmd.stats import run
+        return run(wf, argv)
+
     if cmd == 'toggle':
         from searchio.cmd.toggle import run
         return run(wf, argv)
@@ -122,17 +174,51 @@ def cli(wf):
         from searchio.cmd.variants import run
         return run(wf, argv)
 
+    elif cmd == 'warm':
+        from searchio.cmd.warm import run
+        return run(wf, argv)
+
     elif cmd == 'web':
         from searchio.cmd.web import run
         return run(wf, argv)
 
+    elif cmd == 'worker':
+        from searchio.cmd.worker import run
+        return run(wf, argv)
+
     else:
         raise ValueError('Unknown command "{}". Use -h for help.'.format(cmd))
 
 
-def main():
-    from workflow import Workflow3
-    from searchio import UPDATE_SETTINGS, HELP_URL
-    wf = Workflow3(update_settings=UPDATE_SETTINGS,
-                   help_url=HELP_URL)
-    sys.exit(wf.run(cli))
+def main(started=None):
+    """Run workflow.
+
+    Args:
+        started (float, optional): When the launcher started. Used to
+            time start-up (see `searchio.spans`).
+
+    """
+    from time import time
+    from searchio import spans
+    spans.start(started)
+    if started:
+        spans.add('startup', time() - started)
+
+    # Profile this run if SEARCHIO_PROFILE is set
+    from searchio import profiling
+    prof = profiling.start()
+
+    with spans.span('init'):
+        from workflow import Workflow3
+        from searchio import UPDATE_SETTINGS, HELP_URL
+        wf = Workflow3(update_settings=UPDATE_SETTINGS,
+                       help_url=HELP_URL)
+    try:
+        with spans.span('run'):
+            status = wf.run(cli)
+    finally:
+        if prof:
+            profiling.save(wf, prof, sys.argv[1:])
+        spans.save(wf)
+
+    sys.exit(status)
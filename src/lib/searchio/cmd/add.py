@@ -13,16 +13,24 @@
 Display help message for command(s).
 
 Usage:
-    searchio add [-s <url>] [-i <path>] [-j <jpath>] [-u <uid>] [-p] <keyword> <title> <url>
+    searchio add [-s <url>] [-i <path>] [-j <jpath>] [-u <uid>] [-p] [-c]
+                 [-t <secs>] [--hedge] [--rate <n>] [--burst <n>]
+                 [--encoding <enc>] <keyword> <title> <url>
     searchio add --env
     searchio add -h
 
 Options:
+    -b, --burst <n>            Max. number of requests in a burst
+    -c, --casefold             Whether search is case-insensitive
     -e, --env                  Read input from environment variables
+    --encoding <enc>           Encoding of suggestion responses
+    --hedge                    Send second request if first is slow
     -i, --icon <path>          Path of icon for search
     -j, --json-path <jpath>    JSON path for results
     -p, --pcencode             Whether to percent-encode query
+    -r, --rate <n>             Max. requests per second
     -s, --suggest <url>        URL for suggestions
+    -t, --timeout <secs>       Time limit for fetching suggestions
     -u, --uid <uid>            Search UID
     -h, --help                 Display this help message
 """
@@ -32,7 +40,6 @@ from __future__ import print_function, absolute_import
 import json
 import os
 
-from docopt import docopt
 from workflow.notify import notify
 
 from searchio.core import Context
@@ -63,11 +70,17 @@ def parse_args(wf, args):
         ('keyword', 'keyword', '<keyword>', ''),
         ('uid', 'uid', '--uid', util.uuid()),
         ('pcencode', 'pcencode', '--pcencode', False),
+        ('casefold', 'casefold', '--casefold', False),
+        ('hedge', 'hedge', '--hedge', False),
         ('title', 'title', '<title>', ''),
         ('search_url', 'search_url', '<url>', ''),
         ('suggest_url', 'suggest_url', '--suggest', ''),
         ('icon', 'icon', '--icon', ''),
         ('jsonpath', 'jsonpath', '--json-path', '[1]'),
+        ('timeout', 'timeout', '--timeout', ''),
+        ('rate', 'rate', '--rate', ''),
+        ('burst', 'burst', '--burst', ''),
+        ('encoding', 'encoding', '--encoding', ''),
     ]
 
     d = {}
@@ -87,12 +100,19 @@ def parse_args(wf, args):
 
         d[k] = v
 
+    # numeric options
+    for k in ('timeout', 'rate', 'burst'):
+        if d[k]:
+            d[k] = float(d[k])
+        else:
+            del d[k]
+
     return d
 
 
 def run(wf, argv):
     """Run ``searchio add`` sub-command."""
-    args = docopt(usage(wf), argv)
+    args = util.parse_args(wf, usage(wf), argv)
     ctx = Context(wf)
     d = parse_args(wf, args)
 
@@ -8,27 +8,40 @@
 # Created on 2016-12-17
 #
 
-"""searchio clean [-h|-a]
+"""searchio clean [-h|-a|-f|-l|-b <ms>]
 
 Delete stale files from the cache.
 
 Usage:
-    searchio clean [-a]
+    searchio clean [-a|-f|-l]
+    searchio clean -b <ms>
     searchio -h
 
 Options:
-    -a, --all      Delete everything in the cache
-    -h, --help     Display this help message
+    -a, --all             Delete everything in the cache
+    -b, --budget-ms <ms>  Stop after <ms> milliseconds
+    -f, --full            Check every cached file and rebuild the
+                          expiry index and usage logs
+    -l, --lru             Evict least-recently-used entries from
+                          searches over their size caps
+    -h, --help            Display this help message
+
+Only the entries listed as due in the expiry index are checked,
+unless the --full option is given or the index hasn't been built yet.
 """
 
 from __future__ import print_function, absolute_import
 
+import fcntl
 import os
 from time import time
 
-from docopt import docopt
-
-from searchio import MAX_CACHE_AGE
+from searchio import CACHE_SERIALIZER, ERROR_CACHE_AGE
+from searchio import cache
+from searchio.core import Context
+from searchio.engines import Search
+from searchio import lru
+from searchio import terms
 from searchio import util
 
 log = util.logger(__name__)
@@ -39,23 +52,139 @@ def usage(wf=None):
     return __doc__
 
 
-def run(wf, argv):
-    """Run ``searchio clean`` sub-command."""
-    from shutil import rmtree
+def clean_index(wf, deadline=None):
+    """Delete the expired cache entries listed in the expiry index.
 
-    args = docopt(usage(wf), argv)
+    Buckets are processed oldest first. Each entry is checked against
+    the current TTL of its search: entries that have been rewritten or
+    whose search's TTL has grown are re-indexed, not deleted.
 
-    # Clear old session data
-    wf.clear_session_cache()
+    If ``deadline`` passes, the unprocessed keys are saved for next
+    time. Does nothing if another process is already cleaning.
 
-    # Clear entire cache
-    if args.get('--all'):
-        return wf.clear_cache()
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        deadline (float, optional): Time (as returned by `time.time()`)
+            to stop at.
+
+    Returns:
+        int: Number of files deleted.
+
+    """
+    from workflow.util import atomic_writer
+
+    dirpath = wf.cachefile(cache.EXPIRY_DIR)
+    now = time()
+    try:
+        names = os.listdir(dirpath)
+    except OSError:  # no index
+        return 0
+
+    due = sorted(int(fn[:-4]) for fn in names
+                 if fn.endswith('.txt') and fn[:-4].isdigit())
+    due = [n for n in due if n < cache.expiry_bucket(now)]
+    if not due:
+        return 0
+
+    fd = os.open(os.path.join(dirpath, '.lock'), os.O_RDWR | os.O_CREAT,
+                 0o600)
+    # Entries and bytes deleted per search, for the usage counters
+    counts = {}
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except IOError:  # another process is cleaning
+            return 0
+
+        i = 0
+        ttls = {}
+        for n in due:
+            p = os.path.join(dirpath, '{:d}.txt'.format(n))
+            try:
+                with open(p) as fp:
+                    keys = fp.read().decode('utf-8').splitlines()
+            except IOError:  # deleted by `clean --all`
+                continue
+
+            for j, key in enumerate(keys):
+                if deadline and time() >= deadline:
+                    with atomic_writer(p, 'wb') as fp:
+                        fp.write(u''.join(k + u'\n' for k in keys[j:])
+                                 .encode('utf-8'))
+                    log.debug('[clean] out of time')
+                    return i
+
+                uid = key.split('/')[1]
+                if key.endswith('.error'):
+                    ttl = ERROR_CACHE_AGE
+                else:
+                    if uid not in ttls:
+                        ttls[uid] = cache.get_ttl(wf, uid)
+                    ttl = ttls[uid]
+
+                try:
+                    mtime = os.path.getmtime(cache.entry_path(wf, key))
+                except OSError:  # already deleted
+                    continue
+
+                if now - mtime <= ttl:
+                    cache.expire_at(wf, key, mtime + ttl)
+                    continue
+
+                log.debug('[clean/expired] %r', key)
+                size = cache.remove(wf, key)
+                if size >= 0 and not key.endswith('.error'):
+                    entries, nbytes = counts.get(uid, (0, 0))
+                    counts[uid] = (entries + 1, nbytes + size)
+                i += 1
+
+            os.unlink(p)
+
+        return i
+    finally:
+        if counts:
+            lru.removed(wf, counts)
+        os.close(fd)  # also releases lock
+
+
+def clean_all(wf):
+    """Check every cached search file and rebuild the indices.
+
+    The expiry index and the usage logs (see `searchio.lru`) are
+    rebuilt from the files that are kept. Entries are logged in
+    order of modification. Term dictionaries (see `searchio.terms`)
+    are compacted if they're due, and those of searches with no
+    entries deleted.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+
+    Returns:
+        int: Number of files and directories deleted.
+
+    """
+    from shutil import rmtree
+
+    # Rebuild index from scratch
+    dirpath = wf.cachefile(cache.EXPIRY_DIR)
+    if os.path.exists(dirpath):
+        rmtree(dirpath)
+    os.makedirs(dirpath)
 
-    # Only clear state searches
     path = wf.cachefile('searches')
-    if not os.path.exists(path):
-        return
+    uids = os.listdir(path) if os.path.exists(path) else []
+
+    # Dictionaries of searches with no cached suggestions
+    termsdir = wf.cachefile(terms.TERMS_DIR)
+    if os.path.exists(termsdir):
+        for uid in set(os.listdir(termsdir)) - set(uids):
+            terms.remove(wf, wf.decode(uid))
+
+    if not uids:
+        open(os.path.join(dirpath, cache.INDEXED), 'w').close()
+        return 0
+
+    ext = '.' + CACHE_SERIALIZER
 
     def _relpath(p):
         return p.replace(path + '/', '')
@@ -72,20 +201,97 @@ def run(wf, argv):
         return True
 
     i = 0
-    for root, dirnames, filenames in os.walk(path, topdown=False):
-        for fn in filenames:
-            p = os.path.join(root, fn)
-            age = time() - os.path.getmtime(p)
-            if age > MAX_CACHE_AGE:
-                log.debug('[clean/expired] %r', _relpath(p))
-                os.unlink(p)
-                i += 1
+    for uid in uids:
+        top = os.path.join(path, uid)
+        if not os.path.isdir(top):
+            continue
 
-        for dn in dirnames:
-            p = os.path.join(root, dn)
-            if _emptydir(p):
-                log.debug('[clean/empty] %r', _relpath(p))
-                rmtree(p)
-                i += 1
+        # Each search has its own (adaptive) TTL
+        max_age = cache.get_ttl(wf, uid)
+        # Usage log and counters, so later changes are kept
+        snap = lru.snapshot(wf, wf.decode(uid))
+        # (mtime, key, size) of kept entries
+        kept = []
+        for root, dirnames, filenames in os.walk(top, topdown=False):
+            for fn in filenames:
+                p = os.path.join(root, fn)
+                st = os.stat(p)
+                mtime = st.st_mtime
+                is_error = fn.endswith('.error' + ext)
+                ttl = ERROR_CACHE_AGE if is_error else max_age
+                if time() - mtime > ttl:
+                    log.debug('[clean/expired] %r', _relpath(p))
+                    os.unlink(p)
+                    i += 1
+                elif not fn.endswith(ext):  # old format
+                    log.debug('[clean/obsolete] %r', _relpath(p))
+                    os.unlink(p)
+                    i += 1
+                else:
+                    key = wf.decode('searches/' + _relpath(p)[:-len(ext)])
+                    cache.expire_at(wf, key, mtime + ttl)
+                    if not is_error:
+                        kept.append((mtime, key, st.st_size))
+
+            for dn in dirnames:
+                p = os.path.join(root, dn)
+                if _emptydir(p):
+                    log.debug('[clean/empty] %r', _relpath(p))
+                    rmtree(p)
+                    i += 1
+
+        kept.sort()
+        keys = [k for _, k, _ in kept]
+        lru.reset(wf, wf.decode(uid), keys, sum(n for _, _, n in kept),
+                  snap)
+        if keys:
+            if terms.due(wf, wf.decode(uid)):
+                terms.compact(wf, wf.decode(uid), keys)
+        else:
+            terms.remove(wf, wf.decode(uid))
+
+        if _emptydir(top):
+            log.debug('[clean/empty] %r', _relpath(top))
+            rmtree(top)
+            i += 1
+
+    open(os.path.join(dirpath, cache.INDEXED), 'w').close()
+    return i
+
+
+def run(wf, argv):
+    """Run ``searchio clean`` sub-command."""
+    args = util.parse_args(wf, usage(wf), argv)
+
+    # Clear old session data
+    wf.clear_session_cache()
+
+    # Clear entire cache
+    if args.get('--all'):
+        return wf.clear_cache()
+
+    indexed = os.path.exists(wf.cachefile(
+        os.path.join(cache.EXPIRY_DIR, cache.INDEXED)))
+
+    if args.get('--budget-ms'):
+        if not indexed:
+            log.info('[clean] expiry index not built yet, '
+                     'run "searchio clean"')
+            return
+        deadline = time() + int(args['--budget-ms']) / 1000.0
+        i = clean_index(wf, deadline)
+
+    elif args.get('--lru'):
+        ctx = Context(wf)
+        searches = {s.uid: s for s in
+                    (Search.from_file(p) for p in
+                     util.FileFinder([ctx.searches_dir], ['json']))}
+        i = lru.enforce(wf, searches)
+
+    elif args.get('--full') or not indexed:
+        i = clean_all(wf)
+
+    else:
+        i = clean_index(wf)
 
     log.info('[clean] %d stale item(s) deleted', i)
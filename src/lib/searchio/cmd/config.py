@@ -8,24 +8,25 @@
 # Created on 2016-12-17
 #
 
-"""searchio config [<query>]
+"""searchio config [-t] [<query>]
 
 Display (and optionally filter) workflow configuration
-options.
+options and search statistics.
 
 Usage:
-    searchio config [<query>]
+    searchio config [-t] [<query>]
     searchio config -h
 
 Options:
+    -t, --text     Print statistics as text, not Alfred JSON
     -h, --help     Display this help message
 """
 
 from __future__ import print_function, absolute_import
 
 from operator import itemgetter
-
-from docopt import docopt
+import os
+import sys
 
 from workflow import (
     # ICON_SETTINGS,
@@ -34,6 +35,8 @@ from workflow import (
 
 from searchio.core import Context
 # from searchio.engines import Manager as EngineManager
+from searchio.engines import Search
+from searchio import metrics
 from searchio import util
 
 log = util.logger(__name__)
@@ -44,6 +47,57 @@ def usage(wf=None):
     return __doc__
 
 
+def print_metrics(wf):
+    """Print tables of search and host metrics."""
+    def _ms(v):
+        return u'{:0.0f}'.format(v * 1000) if v is not None else u'-'
+
+    for kind, title in (('search', u'Search'), ('host', u'Host')):
+        table = util.Table([title, u'Lookups', u'Hits', u'Stale',
+                            u'Requests', u'Errors', u'KiB', u'p50 ms',
+                            u'p95 ms'])
+        for name, d in sorted(metrics.load(wf, kind).items()):
+            hits = (u'{:0.0f}%'.format(100.0 * d['hits'] / d['lookups'])
+                    if d['lookups'] else u'-')
+            errors = u', '.join(u'{}={:d}'.format(k, n) for k, n
+                                in sorted(d['errors'].items())) or u'0'
+            table.add_row((name, d['lookups'], hits, d['stale'],
+                           d['requests'], errors,
+                           u'{:0.1f}'.format(d['bytes'] / 1024.0),
+                           _ms(metrics.latency_percentile(d, 0.5)),
+                           _ms(metrics.latency_percentile(d, 0.95))))
+
+        print(table)
+        print()
+
+
+def metrics_items(ctx):
+    """Return Alfred items for search and host metrics."""
+    items = []
+    for uid, d in sorted(metrics.load(ctx.wf, 'search').items()):
+        p = ctx.search(uid)
+        if not os.path.exists(p):  # search has been deleted
+            continue
+
+        s = Search.from_file(p)
+        items.append(dict(
+            title=s.title,
+            subtitle=metrics.summary(d),
+            valid=False,
+            icon=s.icon,
+        ))
+
+    for host, d in sorted(metrics.load(ctx.wf, 'host').items()):
+        items.append(dict(
+            title=host,
+            subtitle=metrics.summary(d),
+            valid=False,
+            icon=u'icon.png',
+        ))
+
+    return items
+
+
 def run(wf, argv):
     """Run ``searchio list`` sub-command."""
     ctx = Context(wf)
@@ -56,11 +110,16 @@ def run(wf, argv):
     ICON_ON = ctx.icon('toggle-on')
     ICON_OFF = ctx.icon('toggle-off')
 
-    args = docopt(usage(wf), argv)
+    args = util.parse_args(wf, usage(wf), argv)
 
     log.debug('args=%r', args)
     query = wf.decode(args.get('<query>') or '').strip()
 
+    if args.get('--text') or util.textmode():
+        print('Search statistics', file=sys.stderr)
+        print()
+        return print_metrics(wf)
+
     # ---------------------------------------------------------
     # Configuration items
 
@@ -150,6 +209,8 @@ def run(wf, argv):
             icon=ICON_UPDATE_NONE,
         ))
 
+    items.extend(metrics_items(ctx))
+
     # ---------------------------------------------------------
     # Show results
 
@@ -23,7 +23,6 @@ Options:
 
 from __future__ import print_function, absolute_import
 
-from docopt import docopt
 from workflow import web
 
 from searchio import opensearch, util
@@ -84,7 +83,7 @@ def import_search(wf, url):
 
 def run(wf, argv):
     """Run ``searchio web`` sub-command."""
-    args = docopt(usage(wf), argv)
+    args = util.parse_args(wf, usage(wf), argv)
     error = search = None
     url = args.get('<url>')
     # Clear old cache data
@@ -26,7 +26,6 @@ from __future__ import print_function, absolute_import
 
 # from operator import itemgetter
 
-from docopt import docopt
 from searchio import util
 
 log = util.logger(__name__)
@@ -45,25 +44,35 @@ def run(wf, argv):
     import searchio.cmd.add
     import searchio.cmd.clean
     import searchio.cmd.config
+    import searchio.cmd.history
     import searchio.cmd.list
+    import searchio.cmd.network
+    import searchio.cmd.profile
     import searchio.cmd.reload
     import searchio.cmd.search
+    import searchio.cmd.stats
     import searchio.cmd.user
     import searchio.cmd.variants
+    import searchio.cmd.warm
 
     commands = {
         'add': searchio.cmd.add.usage,
         'clean': searchio.cmd.clean.usage,
         'config': searchio.cmd.config.usage,
         'help': usage,
+        'history': searchio.cmd.history.usage,
         'list': searchio.cmd.list.usage,
+        'network': searchio.cmd.network.usage,
+        'profile': searchio.cmd.profile.usage,
         'reload': searchio.cmd.reload.usage,
         'search': searchio.cmd.search.usage,
+        'stats': searchio.cmd.stats.usage,
         'user': searchio.cmd.user.usage,
         'variants': searchio.cmd.variants.usage,
+        'warm': searchio.cmd.warm.usage,
     }
 
-    args = docopt(usage(wf), argv)
+    args = util.parse_args(wf, usage(wf), argv)
 
     log.debug('args=%r', args)
 
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""searchio history [options] <search> [<query>]
+
+View and record the suggestions you've chosen.
+
+Usage:
+    searchio history add [--] <search> <term> <url>
+    searchio history clear <search>
+    searchio history [-n <num>] <search> [<query>]
+    searchio history -h
+
+Options:
+    -n, --limit <num>  Number of entries to show [default: 20]
+    -h, --help         Display this help message
+
+"add" is called by Alfred when you action a suggestion. Matching
+entries are shown above a search's suggestions, best first.
+"""
+
+from __future__ import print_function, absolute_import
+
+from searchio.history import History
+from searchio import util
+
+log = util.logger(__name__)
+
+
+def usage(wf=None):
+    """CLI usage instructions."""
+    return __doc__
+
+
+def run(wf, argv):
+    """Run ``searchio history`` sub-command."""
+    args = util.parse_args(wf, usage(wf), argv)
+    uid = wf.decode(args.get('<search>') or '').strip()
+    h = History(wf, uid)
+
+    if args.get('add'):
+        term = wf.decode(args.get('<term>') or '').strip()
+        url = wf.decode(args.get('<url>') or '').strip()
+        if not term or not url:
+            raise ValueError('<term> and <url> are required')
+
+        h.add(term, url)
+        log.debug('[history/%s] added %r', uid, term)
+        return
+
+    if args.get('clear'):
+        h.clear()
+        log.info('[history/%s] cleared', uid)
+        return
+
+    query = wf.decode(args.get('<query>') or '').strip()
+    limit = int(args.get('--limit'))
+    entries = h.match(query, limit) if query else h.top(limit)
+
+    table = util.Table([u'Term', u'URL'])
+    for term, url in entries:
+        table.add_row((term, url))
+
+    print(table)
@@ -27,8 +27,6 @@ from __future__ import print_function, absolute_import
 from operator import attrgetter
 import sys
 
-from docopt import docopt
-
 from searchio.core import Context
 from searchio import engines
 # from searchio.engines import load as load_engines
@@ -52,7 +50,7 @@ def usage(wf=None):
 
 def run(wf, argv):
     """Run ``searchio list`` sub-command."""
-    args = docopt(usage(wf), argv)
+    args = util.parse_args(wf, usage(wf), argv)
     ctx = Context(wf)
     query = wf.decode(args.get('<query>') or '').strip()
     ICON_BACK = ctx.icon('back')
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""searchio network [-h|-p]
+
+Show or check whether the network is online.
+
+Usage:
+    searchio network [-p]
+    searchio network -h
+
+Options:
+    -p, --probe  Connect to the probe host and save the result
+    -h, --help   Display this help message
+
+Probes are queued automatically when a request fails with a network
+error, and while the network is offline.
+"""
+
+from __future__ import print_function, absolute_import
+
+from time import time
+
+from searchio import network
+from searchio import util
+
+log = util.logger(__name__)
+
+
+def usage(wf=None):
+    """CLI usage instructions."""
+    return __doc__
+
+
+def run(wf, argv):
+    """Run ``searchio network`` sub-command."""
+    args = util.parse_args(wf, usage(wf), argv)
+
+    if args.get('--probe'):
+        network.probe(wf)
+
+    addr = network.probe_host()
+    if addr is None:
+        print('probing is off')
+        return
+
+    d = network.state(wf)
+    msg = u'offline' if network.offline(wf) else u'online'
+    if d['checked']:
+        msg += u' (checked {:0.0f}s ago)'.format(time() - d['checked'])
+    if d['reason']:
+        msg += u': ' + d['reason']
+
+    print(msg)
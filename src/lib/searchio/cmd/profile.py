@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""searchio profile [options] [<command>]
+
+Show hotspots in profiles collected via SEARCHIO_PROFILE.
+
+Usage:
+    searchio profile [-n <num>] [-s <key>] [<command>]
+    searchio profile --clear
+    searchio profile -h
+
+Options:
+    -c, --clear              Delete collected profiles
+    -n, --limit <num>        Number of functions to show [default: 25]
+    -s, --sort <key>         Sort by "cumulative", "tottime"
+                             or "calls" [default: cumulative]
+    -h, --help               Display this help message
+
+Profiles are merged per sub-command (or only those for <command>).
+Set the SEARCHIO_PROFILE workflow variable to the fraction of runs
+to profile (e.g. 0.1) or to 1 to profile every run.
+"""
+
+from __future__ import print_function, absolute_import
+
+import os
+import pstats
+import sys
+
+from searchio import profiling
+from searchio import util
+
+log = util.logger(__name__)
+
+
+def usage(wf=None):
+    """CLI usage instructions."""
+    return __doc__
+
+
+def run(wf, argv):
+    """Run ``searchio profile`` sub-command."""
+    args = util.parse_args(wf, usage(wf), argv)
+    groups = profiling.profiles(wf)
+
+    if args.get('--clear'):
+        i = 0
+        for paths in groups.values():
+            for p in paths:
+                os.unlink(p)
+                i += 1
+
+        log.info('[profile] %d profile(s) deleted', i)
+        return
+
+    sort = args.get('--sort')
+    if sort not in ('cumulative', 'tottime', 'calls'):
+        raise ValueError('Invalid sort key: {!r}'.format(sort))
+
+    limit = int(args.get('--limit'))
+    cmd = wf.decode(args.get('<command>') or '').strip()
+    if cmd:
+        groups = {cmd: groups.get(cmd, [])}
+
+    if not any(groups.values()):
+        print('No profiles. Set SEARCHIO_PROFILE to collect some.',
+              file=sys.stderr)
+        return
+
+    for name in sorted(groups):
+        paths = groups[name]
+        if not paths:
+            continue
+
+        print(u'searchio {}: {:d} profile(s)'.format(name, len(paths)))
+        stats = pstats.Stats(*paths, stream=sys.stdout)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
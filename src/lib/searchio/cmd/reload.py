@@ -28,7 +28,6 @@ import json
 import os
 from plistlib import readPlist, readPlistFromString, writePlist
 
-from docopt import docopt
 from searchio.core import Context
 from searchio.engines import Search
 from searchio import util
@@ -44,6 +43,8 @@ YOFFSET = 170
 
 # UID of action to connect Script Filters to
 OPEN_URL_UID = '1133DEAA-5A8F-4E7D-9E9C-A76CB82D9F92'
+# UID of action that records chosen suggestions (`searchio history add`)
+HISTORY_UID = '6C8E4B21-3F0A-4D5E-9B7C-2A1F8E6D4C93'
 
 SCRIPT_FILTER = """
 <dict>
@@ -222,11 +223,11 @@ def add_script_filters(wf, data, searches=None):
         d['config']['keyword'] = s.keyword
         data['objects'].append(d)
         data['connections'][s.uid] = [{
-            'destinationuid': OPEN_URL_UID,
+            'destinationuid': uid,
             'modifiers': 0,
             'modifiersubtext': '',
             'vitoclose': False,
-        }]
+        } for uid in (OPEN_URL_UID, HISTORY_UID)]
         data['uidata'][s.uid] = {
             'note': s.title,
             'xpos': XPOS,
@@ -265,7 +266,7 @@ def link_icons(wf, searches):
 
 def run(wf, argv):
     """Run ``searchio reload`` sub-command."""
-    args = docopt(usage(wf), argv)
+    args = util.parse_args(wf, usage(wf), argv)
     searches = None
     log.debug('args=%r', args)
 
@@ -278,3 +279,7 @@ def run(wf, argv):
     remove_script_filters(wf, data)
     add_script_filters(wf, data, searches)
     writePlist(data, ip)
+
+    if Context(wf).getbool('WARM_CACHE'):
+        from searchio.cmd.warm import start
+        start(wf)
@@ -27,16 +27,25 @@ Options:
 from __future__ import print_function, absolute_import
 
 from collections import namedtuple
-import hashlib
+import httplib
 import os
 import sys
 from time import time
 
-from docopt import docopt
-
-from searchio import MAX_CACHE_AGE
+from searchio import ERROR_CACHE_AGE, HEDGE_MIN_SAMPLES, HEDGE_PERCENTILE
+from searchio import CLEAN_BUDGET, HISTORY_MAX_RESULTS
+from searchio import cache
 from searchio import engines
+from searchio import metrics
+from searchio import network
+from searchio.breaker import Breaker, url2host
+from searchio.cmd.clean import clean_index
+from searchio.history import History
+from searchio.latency import Histogram
+from searchio import lru
+from searchio.ratelimit import TokenBucket
 from searchio.core import Context
+from searchio import spans
 from searchio import util
 
 log = util.logger(__name__)
@@ -50,19 +59,61 @@ def usage(wf):
     return __doc__
 
 
-def cached_search(ctx, search, query):
+def cached_search(ctx, search, query, deadline=None, prefetch=False,
+                  info=None):
     """Perform a cache-backed search.
 
-    Cached entries are expired after ``MAX_CACHE_AGE`` seconds.
+    Cached entries are expired after the search's adaptive TTL
+    (see `cache.update_ttl`), which starts at ``MAX_CACHE_AGE``.
+
+    If suggestions can't be fetched before ``deadline``, or the request
+    fails, the expired cache entry (if any) is returned instead. Failures
+    are cached for ``ERROR_CACHE_AGE`` seconds, and hosts that keep
+    failing are skipped by a circuit breaker (see `searchio.breaker`).
+
+    For searches with ``hedge`` set, a second request is sent if the
+    first is slower than most requests to the same host
+    (see `searchio.latency`).
+
+    Requests to each host are rate-limited (see `searchio.ratelimit`).
+    Over the limit, the expired cache entry or cached suggestions for
+    a prefix of ``query`` are returned instead.
+
+    While the network is offline (see `searchio.network`), no requests
+    are sent: suggestions are the cached entry, regardless of age, or
+    cached suggestions for a prefix of ``query``. A request that fails
+    with a network error or times out queues a probe to find out
+    whether the network is down, and falls back on the same.
+
+    Every lookup is counted in the search's and host's metrics
+    (see `searchio.metrics`). Reads and writes of cache entries are
+    logged for the cache's size caps (see `searchio.lru`).
+
+    With ``prefetch`` set (as by ``searchio warm``), half of the host's
+    burst is left for interactive queries, `util.RateLimited` is raised
+    instead of falling back on cached suggestions, and only requests
+    are counted in the metrics, not lookups.
 
     Args:
         ctx (core.Context): Current context
         search (searchio.engines.Search): Search configuration
         query (unicode): Search query to return suggestions for
+        deadline (float, optional): Time (as returned by `time.time()`)
+            by which suggestions must have been fetched.
+        prefetch (bool, optional): Fetching suggestions in advance.
+        info (dict, optional): Receives what happened as
+            ``info['status']``: ``hit`` (fresh cache entry),
+            ``fetched``, ``failed`` (request failed), ``skipped``
+            (request failed recently, host's circuit is open or
+            network is offline) or ``limited`` (rate-limited).
 
     Returns:
         list: Search suggestions. Sequence of Unicode strings.
 
+    Raises:
+        util.RateLimited: Raised if ``prefetch`` is set and the rate
+            limiter refuses the request.
+
     No Longer Raises:
         ValueError: Raised if search is unknown
 
@@ -71,89 +122,238 @@ def cached_search(ctx, search, query):
         log.debug('[search/%s] Suggestions not supported', search.uid)
         return []
 
-    url = util.mkurl(search.suggest_url, query, search.pcencode)
+    # Fetch and cache suggestions for normalised query
+    canonical = cache.canonical_query(search, query)
+    url = util.mkurl(search.suggest_url, canonical, search.pcencode)
+    key = cache.cache_key(search, canonical)
+    host = url2host(url)
+    event = {'lookups': 1}
+    if info is None:
+        info = {}
 
-    # Caching configuration
-    h = hashlib.md5(query.encode('utf-8')).hexdigest()
-    reldir = 'searches/{}/{}/{}'.format(search.uid, h[:2], h[2:4])
     # Ensure cache directory exists
-    dirpath = os.path.join(ctx.wf.cachedir, reldir)
+    dirpath = os.path.dirname(os.path.join(ctx.wf.cachedir, key))
     try:
         os.makedirs(dirpath)
     except OSError as err:
         if err.errno != 17:
             raise err
 
-    key = u'{}/{}'.format(reldir, h)
-
     def _search():
         """Fetch and parse JSON response."""
         from jsonpath_rw import parse
-        # results = OrderedDict()
-        results = []
-        urls = set()  # URLs to results
-
-        # result based on user's query
-        qr = Result(query,
-                    util.mkurl(search.search_url, query, search.pcencode),
-                    search.title)
-
-        data = util.getjson(url)
 
         # parse JSONPath and unwrap results
         jx = parse(search.jsonpath)
 
-        terms = []
-        for m in jx.find(data):
-            v = m.value
-            if isinstance(v, unicode):
-                terms.append(v)
-            elif isinstance(v, list):
-                terms.extend(v)
+        def _terms(data):
+            terms = []
+            for m in jx.find(data):
+                v = m.value
+                if isinstance(v, unicode):
+                    terms.append(v)
+                elif isinstance(v, list):
+                    terms.extend(v)
+
+            return terms
+
+        enough = None
+        if search.max_results:
+            def enough(data):
+                return len(_terms(data)) >= search.max_results
+
+        timeout = deadline - time() if deadline else None
+        hist = Histogram(ctx.wf, host)
+        hedge = None
+        if search.hedge and hist.total >= HEDGE_MIN_SAMPLES:
+            hedge = hist.percentile(HEDGE_PERCENTILE)
+
+        reserve = search.burst / 2.0 if prefetch else 0
+        limiter = TokenBucket(ctx.wf, host, search.rate, search.burst,
+                              reserve)
+        info = {}
+        start = time()
+        with spans.span('fetch'):
+            data = util.getjson(url, timeout, hedge, limiter,
+                                search.encoding, search.max_bytes, enough,
+                                info, search.max_results)
+        event['latency'] = time() - start
+        event['bytes'] = info.get('bytes', 0)
+        hist.add(event['latency'])
+
+        with spans.span('parse'):
+            terms = _terms(data)
+        if search.max_results:
+            terms = terms[:search.max_results]
+
+        return terms
+
+    wf = ctx.wf
+    with spans.span('cache'):
+        ttl = cache.get_ttl(wf, search.uid)
+        age = cache.age(wf, key)
+        cached = (cache.unpack(wf, search.uid, cache.load(wf, key))
+                  if age else None)
+
+    if cached is not None and age < ttl:
+        terms = cached
+        event['hits'] = 1
+        info['status'] = 'hit'
+        lru.accessed(wf, search.uid, key)
 
-        for term in terms:
-            r = Result(term,
-                       util.mkurl(search.search_url, term, search.pcencode),
-                       search.title)
-            results.append(r)
-            urls.add(r.url)
+    else:
+        event['misses'] = 1
+        # Keep expired entry to see whether suggestions have changed
+        # and to fall back on if the server is slow or failing
+        old = cached
+        terms = old or []
+        errkey = key + '.error'
+        errage = cache.age(wf, errkey)
+        breaker = Breaker(wf, host)
+        info['status'] = 'skipped'
+
+        if errage and errage < ERROR_CACHE_AGE:
+            log.debug('[search/%s] request failed %0.0fs ago: %s',
+                      search.uid, errage, cache.load(wf, errkey))
+
+        elif network.offline(wf):
+            log.debug('[search/%s] offline', search.uid)
+            network.check(wf)
+            if not old:
+                terms = cache.prefix_results(wf, search, canonical)
+
+        elif not breaker.allow():
+            log.debug('[search/%s] circuit %s for %s',
+                      search.uid, breaker.state, breaker.host)
+
+        else:
+            try:
+                terms = _search()
+            except util.RateLimited as err:
+                log.debug('[search/%s] %s', search.uid, err)
+                info['status'] = 'limited'
+                breaker.release()  # no request was sent
+                if prefetch:
+                    raise
+                if not old:
+                    terms = cache.prefix_results(wf, search, canonical)
+            except (util.DeadlineExceeded, httplib.HTTPException, IOError,
+                    ValueError) as err:
+                log.warning('[search/%s] %s, using %s', search.uid, err,
+                            'expired cache' if old else 'query only')
+                event.update(requests=1, error=err.__class__.__name__)
+                info['status'] = 'failed'
+                breaker.failure()
+                cache.save(wf, errkey, util.errmsg(err))
+                cache.expire_at(wf, errkey, time() + ERROR_CACHE_AGE)
+                if network.is_network_error(err):
+                    # Host or network? Let the worker find out.
+                    network.suspect(wf)
+                    if not old:
+                        terms = cache.prefix_results(wf, search,
+                                                     canonical)
+            else:
+                event['requests'] = 1
+                info['status'] = 'fetched'
+                breaker.success()
+                network.set_online(wf)
+                with spans.span('cache'):
+                    old_size = (os.path.getsize(cache.entry_path(wf, key))
+                                if age else None)
+                    cache.save(wf, key, cache.pack(wf, search.uid, terms))
+                    lru.written(wf, search, key, old_size)
+                    if old is not None:
+                        ttl = cache.update_ttl(wf, search.uid, old != terms)
+                    cache.expire_at(wf, key, time() + ttl)
+
+        if old and terms is old:
+            event['stale'] = 1
+            lru.accessed(wf, search.uid, key)
+
+    if prefetch:  # not a lookup by the user
+        for k in ('lookups', 'hits', 'misses', 'stale'):
+            event.pop(k, None)
+
+    metrics.record(wf, search.uid, host, event)
+
+    # Generate results from cached terms
+    mkurl = util.url_builder(search.search_url, search.pcencode)
+    results = [Result(t, mkurl(t), search.title) for t in terms]
+
+    # result based on user's query
+    qr = Result(query, mkurl(query), search.title)
+
+    # add query-based result at the end if it's not a duplicate
+    if qr.url not in set([r.url for r in results]):
+        results.append(qr)
+
+    return results
+
+
+def parse_args(wf, argv):
+    """Parse ``searchio search`` arguments.
+
+    The common ``search <search> <query>`` form is handled without
+    calling docopt. Everything else is passed to `util.parse_args`.
 
-        # add query-based result at the end if it's not a duplicate
-        if qr.url not in urls:
-            results.append(qr)
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        argv (list): Command-line arguments.
 
-        return results
+    Returns:
+        dict: docopt-style arguments.
 
-    return ctx.wf.cached_data(key, _search, max_age=MAX_CACHE_AGE)
+    """
+    from searchio.cli import search_fast_path
+    if search_fast_path(argv):
+        return {'--help': False, '--text': False,
+                '<search>': argv[1], '<query>': argv[2]}
+
+    return util.parse_args(wf, usage(wf), argv)
 
 
 def run(wf, argv):
     """Run ``searchio search`` sub-command."""
-    args = docopt(usage(wf), argv)
+    args = parse_args(wf, argv)
     ctx = Context(wf)
     query = wf.decode(args.get('<query>') or '').strip()
     uid = wf.decode(args.get('<search>') or '').strip()
     if not uid or not query:
         raise RuntimeError('<search> and <query> are required')
 
+    spans.tag(search=uid)
     start = time()
     p = ctx.search(uid)
     if not os.path.exists(p):
         raise ValueError('Unknown search "{}" ({!r})'.format(uid, p))
 
-    search = engines.Search.from_file(p)
+    with spans.span('config'):
+        search = engines.Search.from_file(p)
+
+    # Suggestions chosen before go first
+    with spans.span('history'):
+        past = [Result(term, url, search.title) for term, url
+                in History(wf, uid).match(query, HISTORY_MAX_RESULTS)]
 
-    results = cached_search(ctx, search, query)
+    deadline = start + search.timeout if search.timeout else None
+    results = cached_search(ctx, search, query, deadline)
+    if past:
+        urls = set(r.url for r in past)
+        results = past + [r for r in results if r.url not in urls]
 
     log.debug('[search/%s] %d result(s) in %0.3fs',
               uid, len(results), time() - start)
 
+    # Show that suggestions may be out of date
+    offline = u' (offline)' if network.offline(wf) else u''
+
     # ---------------------------------------------------------
     # Text results
 
     if args.get('--text') or util.textmode():
         print()
-        msg = u'{:d} result(s) for "{:s}"'.format(len(results), query)
+        msg = u'{:d} result(s) for "{:s}"{}'.format(len(results), query,
+                                                    offline)
         print(msg, file=sys.stderr)
         print('=' * len(msg))
         print()
@@ -169,13 +369,24 @@ def run(wf, argv):
 
     else:
         for r in results:
-            wf.add_item(
+            it = wf.add_item(
                 r.term,
-                u'Search {} for "{}"'.format(r.source, r.term),
+                u'Search {} for "{}"{}'.format(r.source, r.term, offline),
                 arg=r.url,
                 autocomplete=r.term + u' ',
                 valid=True,
                 icon=search.icon,
             )
-
-        wf.send_feedback()
+            # For `searchio history add`
+            it.setvar('search', uid)
+            it.setvar('term', r.term)
+
+        with spans.span('render'):
+            wf.send_feedback()
+
+    # After results have been sent, so they don't delay them
+    clean_index(wf, time() + CLEAN_BUDGET)
+    lru.schedule(wf)
+    if ctx.getbool('WARM_CACHE'):
+        from searchio.cmd.warm import schedule
+        schedule(wf)
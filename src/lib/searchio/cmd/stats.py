@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""searchio stats [options] [<search>]
+
+Show how long the phases of searchio runs take.
+
+Usage:
+    searchio stats [-c <command>] [<search>]
+    searchio stats --clear
+    searchio stats -h
+
+Options:
+    -c, --command <command>  Only show runs of this sub-command
+    --clear                  Delete recorded timings
+    -h, --help               Display this help message
+
+Runs are grouped by sub-command and, for "search", by search UID.
+Times are in milliseconds.
+"""
+
+from __future__ import print_function, absolute_import
+
+import os
+
+from searchio import spans
+from searchio import util
+
+log = util.logger(__name__)
+
+
+def usage(wf=None):
+    """CLI usage instructions."""
+    return __doc__
+
+
+def run(wf, argv):
+    """Run ``searchio stats`` sub-command."""
+    args = util.parse_args(wf, usage(wf), argv)
+
+    if args.get('--clear'):
+        path = wf.cachefile(spans.SPANS_FILE)
+        for p in (path, path + '.1'):
+            if os.path.exists(p):
+                os.unlink(p)
+                log.info('[stats] deleted %s', util.shortpath(p))
+        return
+
+    cmd = wf.decode(args.get('--command') or '').strip()
+    uid = wf.decode(args.get('<search>') or '').strip()
+    if uid:
+        cmd = 'search'
+
+    # {(cmd, search): {phase: [seconds, ...]}}
+    groups = {}
+    for r in spans.records(wf):
+        if cmd and r.get('cmd') != cmd:
+            continue
+        if uid and r.get('search') != uid:
+            continue
+
+        phases = dict(r.get('phases', {}), total=r['total'])
+        d = groups.setdefault((r.get('cmd'), r.get('search')), {})
+        for k, v in phases.items():
+            d.setdefault(k, []).append(v)
+
+    if not groups:
+        print('No timings recorded.')
+        return
+
+    for key in sorted(groups):
+        name = u'/'.join(s for s in key if s)
+        phases = groups[key]
+        runs = len(phases['total'])
+        print()
+        print(u'{} ({:d} run(s))'.format(name, runs))
+        table = util.Table([u'Phase', u'Runs', u'p50', u'p95', u'p99'])
+        for phase in spans.PHASES:
+            if phase not in phases:
+                continue
+
+            values = sorted(phases[phase])
+            row = [phase, len(values)]
+            for p in (0.5, 0.95, 0.99):
+                row.append(u'{:0.1f}'.format(
+                           util.percentile(values, p) * 1000))
+
+            table.add_row(row)
+
+        print(table)
+
+    print()
@@ -23,7 +23,6 @@ Options:
 
 from __future__ import print_function, absolute_import
 
-from docopt import docopt
 from workflow import Variables
 from workflow.util import set_config
 
@@ -74,7 +73,7 @@ def do_toggle_alfred_sorts(wf):
 
 def run(wf, argv):
     """Run ``searchio web`` sub-command."""
-    args = docopt(usage(wf), argv)
+    args = util.parse_args(wf, usage(wf), argv)
     key = args.get('<setting>')
     if key == 'show-query':
         return do_toggle_show_query(wf)
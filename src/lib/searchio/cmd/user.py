@@ -26,8 +26,6 @@ from __future__ import print_function, absolute_import
 from operator import attrgetter
 import sys
 
-from docopt import docopt
-
 from searchio.core import Context
 from searchio.engines import Search
 from searchio import util
@@ -47,7 +45,7 @@ def usage(wf=None):
 
 def run(wf, argv):
     """Run ``searchio user`` sub-command."""
-    args = docopt(usage(wf), argv)
+    args = util.parse_args(wf, usage(wf), argv)
     ctx = Context(wf)
     query = wf.decode(args.get('<query>') or '').strip()
     ICON_BACK = ctx.icon('back')
@@ -27,8 +27,7 @@ from __future__ import print_function, absolute_import
 from collections import namedtuple
 import sys
 
-from docopt import docopt
-
+from searchio import RATE_BURST, RATE_LIMIT, SEARCH_TIMEOUT
 from searchio.core import Context
 from searchio import engines
 from searchio import util
@@ -54,7 +53,7 @@ def usage(wf):
 
 def run(wf, argv):
     """Run ``searchio variants`` sub-command."""
-    args = docopt(usage(wf), argv)
+    args = util.parse_args(wf, usage(wf), argv)
     ctx = Context(wf)
     engine_id = wf.decode(args.get('<engine>') or '').strip()
     query = wf.decode(args.get('<query>') or '').strip()
@@ -128,6 +127,18 @@ def run(wf, argv):
             it.setvar('suggest_url', v.suggest_url)
             if v.pcencode:
                 it.setvar('pcencode', '1')
+            if v.casefold:
+                it.setvar('casefold', '1')
+            if v.hedge:
+                it.setvar('hedge', '1')
+            if v.timeout != SEARCH_TIMEOUT:
+                it.setvar('timeout', str(v.timeout))
+            if v.rate != RATE_LIMIT:
+                it.setvar('rate', str(v.rate))
+            if v.burst != RATE_BURST:
+                it.setvar('burst', str(v.burst))
+            if v.encoding:
+                it.setvar('encoding', v.encoding)
 
         wf.send_feedback()
 
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""searchio warm [options] [<search>...]
+
+Prefetch suggestions for likely queries into the cache.
+
+Usage:
+    searchio warm [-b] [-n <num>] [-p <num>] [-t <num>] [-w <num>]
+                  [<search>...]
+    searchio warm -h
+
+Options:
+    -b, --background          Run in the background
+    -n, --entries <num>       Top history entries to use [default: 20]
+    -p, --prefixes <num>      Common prefixes to use [default: 20]
+    -t, --term-prefixes <num>
+                              Prefixes of each entry to use [default: 5]
+    -w, --workers <num>       Requests to send in parallel [default: 4]
+    -h, --help                Display this help message
+
+Candidates are the search's most-used history entries and their
+shortest prefixes (the ones typed first), plus the prefixes most
+entries start with. Queries already in the cache are skipped. Requests
+count against each host's rate limit, but leave half of its burst for
+the queries you type.
+
+The results table shows, per search, how many candidates were already
+cached, and how many of the others were fetched, failed, skipped
+(e.g. because the host is failing or the network is offline) or given
+up on because of the rate limit.
+
+All installed searches are warmed unless <search> is given.
+If the WARM_CACHE workflow variable is set, warming is started in
+the background after "reload" and by searches (at most hourly).
+"""
+
+from __future__ import print_function, absolute_import
+
+from operator import itemgetter
+import os
+import Queue
+import threading
+from time import sleep, time
+
+from searchio import WARM_INTERVAL
+from searchio import cache
+from searchio.cmd.search import cached_search
+from searchio.core import Context
+from searchio.engines import Search
+from searchio.history import History
+from searchio import network
+from searchio import util
+from searchio import worker
+
+log = util.logger(__name__)
+
+# File in cache directory whose mtime is when warming last started
+LAST_RUN = 'warm.last'
+# Name of background job
+JOB_NAME = 'warm'
+# Times to retry a rate-limited query before giving up on it
+RETRIES = 5
+# Longest prefix counted when looking for common prefixes
+PREFIX_MAX = 8
+
+
+def usage(wf=None):
+    """CLI usage instructions."""
+    return __doc__
+
+
+def candidates(search, history, entries, prefixes, term_prefixes):
+    """Return queries to prefetch for ``search``, most likely first.
+
+    Args:
+        search (searchio.engines.Search): Search configuration
+        history (searchio.history.History): Search's history
+        entries (int): Number of top history entries to use.
+        prefixes (int): Number of common prefixes to add.
+        term_prefixes (int): Number of prefixes of each entry to add.
+
+    Returns:
+        list: Canonical queries (see `cache.canonical_query`).
+
+    """
+    queries = []
+    seen = set()
+
+    def _add(q):
+        q = cache.canonical_query(search, q)
+        if q and q not in seen:
+            seen.add(q)
+            queries.append(q)
+
+    for term, _ in history.top(entries):
+        for i in range(1, min(len(term), term_prefixes) + 1):
+            _add(term[:i])
+        _add(term)
+
+    counts = {}
+    for i in range(len(history)):
+        key = history.keys[i].decode('utf-8')
+        for n in range(1, min(len(key), PREFIX_MAX) + 1):
+            counts[key[:n]] = counts.get(key[:n], 0) + 1
+
+    common = sorted(counts.items(), key=itemgetter(0))
+    common.sort(key=itemgetter(1), reverse=True)
+    for prefix, _ in common[:prefixes]:
+        _add(prefix)
+
+    return queries
+
+
+def is_fresh(wf, search, query):
+    """Return `True` if ``query`` has unexpired cached suggestions."""
+    age = cache.age(wf, cache.cache_key(search, query))
+    return bool(age) and age < cache.get_ttl(wf, search.uid)
+
+
+def prefetch(ctx, search, query):
+    """Fetch and cache suggestions for ``query``.
+
+    Rate-limited requests are retried after waiting for the host's
+    bucket to refill.
+
+    Returns:
+        str: Status set by `cached_search` (``hit``, ``fetched``,
+            ``failed`` or ``skipped``), or ``limited`` if the request
+            was rate-limited every time.
+
+    """
+    for _ in range(RETRIES):
+        info = {}
+        try:
+            cached_search(ctx, search, query, time() + search.timeout,
+                          prefetch=True, info=info)
+            return info.get('status', 'skipped')
+        except util.RateLimited:
+            sleep(1.0 / search.rate)
+
+    log.debug('[warm/%s] gave up on %r', search.uid, query)
+    return 'limited'
+
+
+def warm(ctx, jobs, workers):
+    """Prefetch ``jobs`` using ``workers`` threads.
+
+    Args:
+        ctx (core.Context): Current context
+        jobs (list): ``(search, query)`` tuples.
+        workers (int): Number of threads.
+
+    Returns:
+        dict: ``{uid: {status: n}}``, where ``status`` is returned by
+            `prefetch`.
+
+    """
+    q = Queue.Queue()
+    for job in jobs:
+        q.put(job)
+
+    lock = threading.Lock()
+    counts = {}
+
+    def _worker():
+        while True:
+            try:
+                search, query = q.get_nowait()
+            except Queue.Empty:
+                return
+
+            status = prefetch(ctx, search, query)
+            with lock:
+                d = counts.setdefault(search.uid, {})
+                d[status] = d.get(status, 0) + 1
+
+    threads = []
+    for i in range(max(1, workers)):
+        t = threading.Thread(target=_worker, name='warm-{:d}'.format(i))
+        t.daemon = True
+        t.start()
+        threads.append(t)
+
+    for t in threads:
+        t.join()
+
+    return counts
+
+
+def _touch(p):
+    """Set mtime of ``p`` to now, creating it if necessary."""
+    with open(p, 'a'):
+        os.utime(p, None)
+
+
+def start(wf, argv=None):
+    """Start ``searchio warm`` in the background.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        argv (list, optional): Additional arguments.
+
+    Returns:
+        bool: `False` if warming is already running.
+
+    """
+    if worker.is_running(wf, JOB_NAME):
+        log.debug('[warm] already running')
+        return False
+
+    _touch(wf.cachefile(LAST_RUN))
+    return worker.submit(wf, JOB_NAME, ['warm'] + list(argv or []),
+                         worker.PRIORITY_LOW)
+
+
+def schedule(wf):
+    """Start ``searchio warm`` in the background if it's due.
+
+    It's due if it last started more than ``WARM_INTERVAL`` seconds ago.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+
+    Returns:
+        bool: `True` if warming was started.
+
+    """
+    try:
+        if time() - os.path.getmtime(wf.cachefile(LAST_RUN)) < WARM_INTERVAL:
+            return False
+    except OSError:  # never run
+        pass
+
+    return start(wf)
+
+
+def run(wf, argv):
+    """Run ``searchio warm`` sub-command."""
+    args = util.parse_args(wf, usage(wf), argv)
+    entries = int(args.get('--entries'))
+    prefixes = int(args.get('--prefixes'))
+    term_prefixes = int(args.get('--term-prefixes'))
+    workers = int(args.get('--workers'))
+    uids = [wf.decode(s) for s in args.get('<search>') or []]
+
+    if args.get('--background'):
+        opts = ['-n', str(entries), '-p', str(prefixes),
+                '-t', str(term_prefixes), '-w', str(workers)]
+        if start(wf, opts + uids):
+            log.info('[warm] started in background')
+        return
+
+    if network.offline(wf):
+        log.info('[warm] network is offline')
+        return
+
+    ctx = Context(wf)
+    _touch(wf.cachefile(LAST_RUN))
+    if uids:
+        paths = [ctx.search(uid) for uid in uids]
+    else:
+        paths = util.FileFinder([ctx.searches_dir], ['json'])
+
+    started = time()
+    jobs = []
+    rows = []
+    for p in paths:
+        if not os.path.exists(p):
+            raise ValueError('Unknown search "{}"'.format(util.path2uid(p)))
+
+        search = Search.from_file(p)
+        if not search.suggest_url:
+            continue
+
+        queries = candidates(search, History(wf, search.uid), entries,
+                             prefixes, term_prefixes)
+        todo = [q for q in queries if not is_fresh(wf, search, q)]
+        log.debug('[warm/%s] %d candidate(s), %d cached', search.uid,
+                  len(queries), len(queries) - len(todo))
+        jobs.extend((search, q) for q in todo)
+        rows.append((search.uid, len(queries), len(queries) - len(todo)))
+
+    counts = warm(ctx, jobs, workers)
+    log.info('[warm] %d query(ies) fetched of %d in %0.1fs',
+             sum(d.get('fetched', 0) for d in counts.values()), len(jobs),
+             time() - started)
+
+    table = util.Table([u'Search', u'Candidates', u'Cached', u'Fetched',
+                        u'Failed', u'Skipped', u'Limited'])
+    for uid, n, cached in sorted(rows):
+        d = counts.get(uid, {})
+        # "hit": cached by a search since the candidates were checked
+        table.add_row((uid, n, cached + d.get('hit', 0),
+                       d.get('fetched', 0), d.get('failed', 0),
+                       d.get('skipped', 0), d.get('limited', 0)))
+
+    print(table)
@@ -28,12 +28,11 @@ import os
 import subprocess
 from urlparse import urlparse
 
-from docopt import docopt
 from workflow import ICON_ERROR, ICON_WARNING
-from workflow.background import run_in_background, is_running
 
 from searchio.core import Context
 from searchio import util
+from searchio import worker
 
 log = util.logger(__name__)
 
@@ -190,8 +189,8 @@ def do_import_search(wf, url):
         picon = ICONS_PROGRESS[i]
         log.debug('progress=%d, i=%d, picon=%s', progress, i, picon)
         wf.setvar('progress', progress + 1)
-        if not is_running('import'):
-            run_in_background('import', ['./searchio', 'fetch', url])
+        if not worker.is_running(wf, 'import'):
+            worker.submit(wf, 'import', ['fetch', url], worker.PRIORITY_HIGH)
 
         status = wf.cached_data('import-status', None, max_age=0, session=True)
         title = status or u'Fetching OpenSearch Configuration …'
@@ -206,7 +205,7 @@ def do_import_search(wf, url):
 
 def run(wf, argv):
     """Run ``searchio web`` sub-command."""
-    args = docopt(usage(wf), argv)
+    args = util.parse_args(wf, usage(wf), argv)
     url = args.get('<url>')
     if not url:
         return do_get_url(wf, args)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""searchio worker [-h|-l]
+
+Run queued background jobs.
+
+Usage:
+    searchio worker [-l]
+    searchio worker -h
+
+Options:
+    -l, --list   Show queued and running jobs
+    -h, --help   Display this help message
+
+The worker is started automatically when a job is queued, and exits
+when it has been idle for a while. Only one worker runs at a time.
+"""
+
+from __future__ import print_function, absolute_import
+
+from time import time
+
+from searchio import util
+from searchio import worker
+
+log = util.logger(__name__)
+
+
+def usage(wf=None):
+    """CLI usage instructions."""
+    return __doc__
+
+
+def run(wf, argv):
+    """Run ``searchio worker`` sub-command."""
+    args = util.parse_args(wf, usage(wf), argv)
+
+    if args.get('--list'):
+        table = util.Table([u'Job', u'Priority', u'State', u'Age',
+                            u'Command'])
+        for job in worker.jobs(wf):
+            state = u'queued'
+            if 'pid' in job:
+                state = u'running ({})'.format(job['pid'] or u'starting')
+            table.add_row((job['name'], job['priority'], state,
+                           u'{:0.0f}s'.format(time() - job['queued']),
+                           u' '.join(job['argv'])))
+
+        print(table)
+        return
+
+    worker.serve(wf)
@@ -39,8 +39,11 @@ class Context(object):
                 os.makedirs(p)
 
     def icon(self, name):
+        """Path to icon for ``name``. Falls back to ``icon.png``."""
         if not self._icon_finder:
-            self._icon_finder = util.FileFinder(self.icon_dirs, IMAGE_EXTS)
+            self._icon_finder = util.FileFinder(
+                self.icon_dirs, IMAGE_EXTS,
+                self.wf.cachefile('icons.index'))
 
         return self._icon_finder.find(name, 'icon.png')
 
@@ -95,7 +98,7 @@ class Context(object):
     def engine_dirs(self):
         """Directories to search for engine configurations."""
         return [
-            os.path.join(os.path.dirname(__file__), 'engines'),
+            self.wf.workflowfile('lib/searchio/engines'),
             self.wf.datafile('engines'),
         ]
 
@@ -35,6 +35,9 @@ from __future__ import print_function, absolute_import
 import json
 import weakref
 
+from searchio import MAX_BYTES, MAX_RESULTS
+from searchio import SEARCH_CACHE_MAX_BYTES, SEARCH_CACHE_MAX_ENTRIES
+from searchio import RATE_BURST, RATE_LIMIT, SEARCH_TIMEOUT
 from searchio.util import path2uid
 
 __all__ = [
@@ -111,9 +114,16 @@ class Engine(object):
     """Search engine. Provides one or more `Variants`.
 
     Attributes:
+        burst (float): Max. number of requests to send in a burst.
+        casefold (bool): Whether engine's suggestions are case-insensitive.
         description (unicode): Search engine details, e.g. "Image search"
+        encoding (str): Encoding of suggestion responses. If empty,
+            the charset in the HTTP headers or UTF-8 is used.
+        hedge (bool): Whether to send hedged requests for suggestions.
         jsonpath (unicode): JSON path to results. The default ``$[1][*]``
             is appropriate for OpenSearch results.
+        rate (float): Max. average number of requests per second.
+        timeout (float): Time limit for fetching suggestions (seconds).
         title (unicode): Name of search engine.
         uid (str): UID of engine (usu. based on filename).
 
@@ -124,7 +134,8 @@ class Engine(object):
     # Required settings
     _required = ('title', 'description', 'variants')
     # Optional settings
-    _optional = ('jsonpath', 'pcencode')
+    _optional = ('jsonpath', 'pcencode', 'casefold', 'timeout', 'hedge',
+                 'rate', 'burst', 'encoding')
     # Settings that should be assigned to private attributes,
     # e.g. "_attribute", not "attribute".
     _private = ('variants',)
@@ -172,6 +183,12 @@ class Engine(object):
         self.description = u''
         self.jsonpath = u'$[1][*]'
         self.pcencode = False
+        self.casefold = False
+        self.timeout = SEARCH_TIMEOUT
+        self.hedge = False
+        self.rate = RATE_LIMIT
+        self.burst = RATE_BURST
+        self.encoding = ''
         self._variants = []
 
     @property
@@ -231,6 +248,12 @@ class Variant(object):
         self._uid = ''
         self.name = ''
         self.pcencode = engine.pcencode
+        self.casefold = engine.casefold
+        self.timeout = engine.timeout
+        self.hedge = engine.hedge
+        self.rate = engine.rate
+        self.burst = engine.burst
+        self.encoding = engine.encoding
         self.title = ''
         self.search_url = ''
         self.suggest_url = ''
@@ -291,21 +314,37 @@ class Search(object):
     """Configuration for retrieving search suggestions.
 
     Attributes:
+        burst (float): Max. number of requests to send in a burst.
+        cache_max_bytes (int): Maximum size of cached suggestions.
+        cache_max_entries (int): Maximum number of cached queries.
+        casefold (bool): Whether queries can be case-folded before
+            fetching suggestions.
+        encoding (str): Encoding of suggestion responses. If empty,
+            the charset in the HTTP headers or UTF-8 is used.
+        hedge (bool): Whether to send a second request for suggestions
+            if the first is slow.
         icon (str): Path to icon file.
         jsonpath (unicode): JSON Path for extracting suggestions from
             API responses.
         keyword (str): Script Filter keyword.
+        max_bytes (int): Maximum size of suggestion response to read.
+        max_results (int): Maximum number of suggestions to read.
         pcencode (bool): Whether to use percent encoding (instead
             of plus encoding).
+        rate (float): Max. average number of requests per second.
         search_url (str): URL for search results.
         suggest_url (str): URL for search suggestions.
+        timeout (float): Time limit for fetching suggestions (seconds).
         title (unicode): Full search title, e.g. "Google (English)".
         uid (str): UID of search. This is a combination of engine and
             variant UIDs.
 
     """
     _required = ('title', 'icon', 'jsonpath', 'search_url')
-    _optional = ('pcencode', 'suggest_url', 'keyword')
+    _optional = ('pcencode', 'suggest_url', 'keyword', 'casefold',
+                 'timeout', 'hedge', 'rate', 'burst', 'encoding',
+                 'max_bytes', 'max_results', 'cache_max_bytes',
+                 'cache_max_entries')
     _private = ()
 
     @classmethod
@@ -321,8 +360,11 @@ class Search(object):
         """
         s = cls(v.uid)
 
+        # Settings variants don't have (e.g. cache sizes) keep
+        # their defaults
         for k in cls._required + cls._optional:
-            setattr(s, k, getattr(v, k))
+            if hasattr(v, k):
+                setattr(s, k, getattr(v, k))
 
         return s
 
@@ -374,6 +416,16 @@ class Search(object):
         self.keyword = ''
         self.jsonpath = '[1]'
         self.pcencode = False
+        self.casefold = False
+        self.timeout = SEARCH_TIMEOUT
+        self.hedge = False
+        self.rate = RATE_LIMIT
+        self.burst = RATE_BURST
+        self.encoding = ''
+        self.max_bytes = MAX_BYTES
+        self.max_results = MAX_RESULTS
+        self.cache_max_bytes = SEARCH_CACHE_MAX_BYTES
+        self.cache_max_entries = SEARCH_CACHE_MAX_ENTRIES
         self.search_url = ''
         self.suggest_url = ''
 
@@ -396,4 +448,34 @@ class Search(object):
         if self.suggest_url:
             d['suggest_url'] = self.suggest_url
 
+        if self.casefold:
+            d['casefold'] = self.casefold
+
+        if self.timeout != SEARCH_TIMEOUT:
+            d['timeout'] = self.timeout
+
+        if self.hedge:
+            d['hedge'] = self.hedge
+
+        if self.rate != RATE_LIMIT:
+            d['rate'] = self.rate
+
+        if self.burst != RATE_BURST:
+            d['burst'] = self.burst
+
+        if self.encoding:
+            d['encoding'] = self.encoding
+
+        if self.max_bytes != MAX_BYTES:
+            d['max_bytes'] = self.max_bytes
+
+        if self.max_results != MAX_RESULTS:
+            d['max_results'] = self.max_results
+
+        if self.cache_max_bytes != SEARCH_CACHE_MAX_BYTES:
+            d['cache_max_bytes'] = self.cache_max_bytes
+
+        if self.cache_max_entries != SEARCH_CACHE_MAX_ENTRIES:
+            d['cache_max_entries'] = self.cache_max_entries
+
         return d
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""History of the suggestions chosen for each search.
+
+Each search has its own `History`, which is saved in the data
+directory (``history/<uid>.marshal``). Entries are ranked by
+"frecency": every use adds 1 to an entry's score, and scores halve
+every ``HISTORY_HALF_LIFE`` seconds. When a history grows beyond
+``HISTORY_MAX_ENTRIES``, the entries with the lowest scores are
+dropped.
+
+Entries are sorted by lowercase term, so prefix lookups are a binary
+search. Terms and URLs are UTF-8 (whose byte order is the same as
+the order of the Unicode strings). Each column is saved as a single
+string plus an `array` of offsets (see `Strings`), so loading even
+a large history is little more than reading the file, and only
+matching entries are ever decoded.
+"""
+
+from __future__ import print_function, absolute_import
+
+from array import array
+from bisect import bisect_left
+import marshal
+import os
+from time import time
+from unicodedata import normalize
+
+from searchio import HISTORY_HALF_LIFE, HISTORY_MAX_ENTRIES
+from searchio import util
+
+log = util.logger(__name__)
+
+# Names of the columns of a history
+COLUMNS = ('keys', 'terms', 'urls', 'scores', 'updated')
+
+
+def _key(term):
+    """Return lookup key (UTF-8) for ``term``."""
+    return normalize('NFC', u' '.join(term.split())).lower().encode('utf-8')
+
+
+class Strings(object):
+    """Read-only sequence of bytestrings packed into one string.
+
+    Attributes:
+        data (str): The bytestrings, concatenated.
+        offsets (array.array): Start of each bytestring in ``data``,
+            plus the end of the last one.
+
+    """
+
+    def __init__(self, data='', offsets=None):
+        """Create new `Strings`."""
+        self.data = data
+        self.offsets = offsets or array('I', [0])
+
+    @classmethod
+    def pack(cls, strings):
+        """Create `Strings` from a sequence of bytestrings."""
+        offsets = array('I', [0])
+        n = 0
+        for s in strings:
+            n += len(s)
+            offsets.append(n)
+
+        return cls(''.join(strings), offsets)
+
+    def __len__(self):
+        """Number of bytestrings."""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        """Return bytestring ``i``."""
+        return self.data[self.offsets[i]:self.offsets[i + 1]]
+
+
+class History(object):
+    """Chosen suggestions for one search.
+
+    The ``keys``, ``terms`` and ``urls`` columns are `Strings` after
+    loading and lists once the history has been changed.
+
+    Attributes:
+        keys (Strings): Lowercase terms (sorted, UTF-8).
+        path (unicode): Path history is saved at.
+        scores (array.array): Score of each entry as of its last use.
+        terms (Strings): Chosen terms (UTF-8).
+        uid (unicode): Search UID.
+        updated (array.array): When each entry was last used.
+        urls (Strings): URL opened for each entry (UTF-8).
+
+    """
+
+    def __init__(self, wf, uid):
+        """Create new `History` and load saved entries.
+
+        Args:
+            wf (workflow.Workflow3): Active workflow object.
+            uid (unicode): Search UID.
+
+        """
+        self.uid = uid
+        self.path = wf.datafile(u'history/{}.marshal'.format(uid))
+        self._reset()
+        self._load()
+
+    def __len__(self):
+        """Number of entries."""
+        return len(self.keys)
+
+    def score(self, i, now=None):
+        """Return current (decayed) score of entry ``i``."""
+        age = (now or time()) - self.updated[i]
+        return self.scores[i] * 0.5 ** (age / HISTORY_HALF_LIFE)
+
+    def add(self, term, url):
+        """Record that ``term`` was chosen and save history.
+
+        Args:
+            term (unicode): Chosen suggestion.
+            url (unicode): URL that was opened.
+
+        """
+        from workflow.util import LockFile
+
+        try:
+            os.makedirs(os.path.dirname(self.path))
+        except OSError as err:
+            if err.errno != 17:
+                raise err
+
+        with LockFile(self.path, 0.5):
+            # Reload to include entries added by other processes
+            self._load()
+            for name in COLUMNS:
+                setattr(self, name, list(getattr(self, name)))
+
+            now = time()
+            key = _key(term)
+            term = u' '.join(term.split()).encode('utf-8')
+            url = url.encode('utf-8')
+            i = bisect_left(self.keys, key)
+            if i < len(self.keys) and self.keys[i] == key:
+                self.scores[i] = self.score(i, now) + 1
+                self.terms[i], self.urls[i] = term, url
+                self.updated[i] = now
+            else:
+                self.keys.insert(i, key)
+                self.terms.insert(i, term)
+                self.urls.insert(i, url)
+                self.scores.insert(i, 1.0)
+                self.updated.insert(i, now)
+
+            if len(self.keys) > HISTORY_MAX_ENTRIES:
+                self._evict(now)
+
+            self._save()
+
+    def match(self, query, limit=None):
+        """Return entries whose term starts with ``query``.
+
+        Args:
+            query (unicode): Query to match (case-insensitive).
+            limit (int, optional): Maximum number of entries to return.
+
+        Returns:
+            list: ``(term, url)`` tuples, highest score first.
+
+        """
+        key = _key(query)
+        if not key:
+            return []
+
+        now = time()
+        matches = []
+        i = bisect_left(self.keys, key)
+        while i < len(self.keys) and self.keys[i].startswith(key):
+            matches.append((self.score(i, now), i))
+            i += 1
+
+        matches.sort(reverse=True)
+        return [self._entry(j) for _, j in matches[:limit]]
+
+    def top(self, n):
+        """Return ``n`` entries with highest score.
+
+        Returns:
+            list: ``(term, url)`` tuples, highest score first.
+
+        """
+        now = time()
+        ranked = sorted(range(len(self.keys)),
+                        key=lambda i: self.score(i, now), reverse=True)
+        return [self._entry(i) for i in ranked[:n]]
+
+    def clear(self):
+        """Delete all entries."""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        self._reset()
+
+    def _entry(self, i):
+        """Return ``(term, url)`` of entry ``i`` as Unicode."""
+        return (self.terms[i].decode('utf-8'),
+                self.urls[i].decode('utf-8'))
+
+    def _evict(self, now):
+        """Drop lowest-scored entries, down to 90% of maximum size."""
+        keep = int(HISTORY_MAX_ENTRIES * 0.9)
+        ranked = sorted(range(len(self.keys)),
+                        key=lambda i: self.score(i, now), reverse=True)
+        keep = sorted(ranked[:keep])
+        log.debug('[history/%s] evicting %d entries', self.uid,
+                  len(self.keys) - len(keep))
+        for name in COLUMNS:
+            values = getattr(self, name)
+            setattr(self, name, [values[i] for i in keep])
+
+    def _reset(self):
+        """Empty history."""
+        self.keys, self.terms, self.urls = Strings(), Strings(), Strings()
+        self.scores, self.updated = array('d'), array('d')
+
+    def _load(self):
+        """Load saved history (if any)."""
+        try:
+            with open(self.path, 'rb') as fp:
+                data = marshal.load(fp)
+        except (IOError, EOFError, ValueError, TypeError):
+            return
+
+        for name, (s, offsets) in zip(COLUMNS[:3], data[:3]):
+            setattr(self, name, Strings(s, array('I', offsets)))
+
+        self.scores = array('d', data[3])
+        self.updated = array('d', data[4])
+
+    def _save(self):
+        """Save history to data directory."""
+        from workflow.util import atomic_writer
+
+        data = []
+        for name in COLUMNS[:3]:
+            s = Strings.pack(getattr(self, name))
+            data.append((s.data, s.offsets.tostring()))
+
+        data.append(array('d', self.scores).tostring())
+        data.append(array('d', self.updated).tostring())
+        with atomic_writer(self.path, 'wb') as fp:
+            marshal.dump(tuple(data), fp, 2)
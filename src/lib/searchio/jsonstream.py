@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Bounded reading of JSON responses.
+
+`read()` streams a response and stops once it has read ``max_bytes``
+or found enough results. Responses whose ``Content-Length`` is within
+``max_bytes`` are read and parsed in one go instead.
+
+`Scanner` tracks the nesting of arrays and objects, so the part of
+the document read so far can be cut after the last complete value
+and the open containers closed, and counts the values completed in
+each container. The partial document is only parsed once some
+container has as many values as results are wanted.
+"""
+
+from __future__ import print_function, absolute_import
+
+import json
+import re
+
+from searchio import util
+
+log = util.logger(__name__)
+
+# Bytes to read from response at a time
+CHUNK_SIZE = 16384
+
+# Characters that matter outside of and inside strings respectively
+_struct = re.compile(r'["\[\]{},]')
+_string = re.compile(r'["\\]')
+# Start of a value in a container
+_value = re.compile(r'\S')
+
+
+class Scanner(object):
+    """Incremental scanner that finds where a JSON document can be cut.
+
+    Attributes:
+        buf (str): Data fed to scanner so far.
+        most (int): Highest number of complete values in any one
+            array or object (i.e. of elements or members).
+
+    """
+
+    def __init__(self):
+        """Create new `Scanner`."""
+        self.buf = ''
+        self._pos = 0  # where to resume scanning
+        self._in_string = False
+        self._closers = ''  # brackets that close currently-open containers
+        self._cut = 0  # position after last complete value
+        self._cut_closers = ''  # brackets that close containers at `_cut`
+        self._open = []  # [values, start] of currently-open containers
+        self.most = 0  # most complete values in one container
+
+    @property
+    def complete(self):
+        """Whether the top-level value has been closed."""
+        return self._cut > 0 and not self._cut_closers
+
+    def feed(self, data):
+        """Add ``data`` to buffer and scan it.
+
+        Args:
+            data (str): Next chunk of JSON document.
+
+        """
+        self.buf += data
+        buf, n, i = self.buf, len(self.buf), self._pos
+        while i < n:
+            if self._in_string:
+                m = _string.search(buf, i)
+                if not m:
+                    i = n
+                elif m.group() == '\\':  # skip escaped character
+                    i = m.end() + 1
+                else:
+                    self._in_string = False
+                    i = m.end()
+                continue
+
+            m = _struct.search(buf, i)
+            if not m:
+                i = n
+                continue
+
+            c, i = m.group(), m.end()
+            if c == '"':
+                self._in_string = True
+                continue
+
+            if c == ',':  # preceding value is complete
+                self._cut, self._cut_closers = i - 1, self._closers
+                if self._open:
+                    self._open[-1][0] += 1
+                    self.most = max(self.most, self._open[-1][0])
+                continue
+
+            if c == '[':
+                self._closers = ']' + self._closers
+                self._open.append([0, i])
+            elif c == '{':
+                self._closers = '}' + self._closers
+                self._open.append([0, i])
+            else:
+                self._closers = self._closers[1:]
+                if self._open:
+                    count, start = self._open.pop()
+                    if count or _value.search(buf, start).end() < i:
+                        self.most = max(self.most, count + 1)
+
+            self._cut, self._cut_closers = i, self._closers
+
+        self._pos = i
+
+    def document(self):
+        """Return longest valid JSON document scanned so far.
+
+        Returns:
+            str: Complete values read so far, plus closing brackets.
+
+        """
+        return self.buf[:self._cut] + self._cut_closers
+
+
+def read(r, max_bytes=None, enough=None, encoding=None, info=None,
+         values=None):
+    """Read and parse JSON from a streamed response.
+
+    Reading stops after ``max_bytes``, or when ``enough`` returns `True`
+    for the data read so far. A response with a ``Content-Length`` of
+    at most ``max_bytes`` is read whole and parsed once.
+
+    ``enough`` is only called once an array or object in the document
+    has ``values`` complete values (see `Scanner.most`). If it returns
+    `False` (i.e. the values weren't the results), it isn't called
+    again till there are twice as many.
+
+    Args:
+        r (workflow.web.Response): Response with ``stream=True``.
+        max_bytes (int, optional): Maximum number of bytes to read.
+        enough (callable, optional): Called with the data parsed
+            from the document read so far.
+        encoding (str, optional): Encoding of response. Default is
+            charset from HTTP headers or UTF-8.
+        info (dict, optional): ``info['bytes']`` is set to the number
+            of bytes read.
+        values (int, optional): Number of values to wait for before
+            calling ``enough``.
+
+    Returns:
+        object: JSON-deserialised (possibly partial) response.
+
+    """
+    if not encoding:
+        encoding = r.raw.info().getparam('charset') or 'utf-8'
+
+    if info is None:
+        info = {}
+
+    length = r.headers.get('content-length', '')
+    if length.isdigit() and (not max_bytes or int(length) <= max_bytes):
+        data = r.json(encoding)
+        info['bytes'] = len(r.content)
+        return data
+
+    scanner = Scanner()
+    size = 0
+    target = values or 1
+    truncated = False
+
+    for chunk in r.iter_content(CHUNK_SIZE):
+        if max_bytes and size + len(chunk) > max_bytes:
+            scanner.feed(chunk[:max_bytes - size])
+            info['bytes'] = max_bytes
+            log.debug('[jsonstream] stopped after %d bytes: %s',
+                      max_bytes, r.url)
+            truncated = True
+            break
+
+        scanner.feed(chunk)
+        size += len(chunk)
+        info['bytes'] = size
+        if enough and scanner.most >= target and not scanner.complete:
+            data = json.loads(scanner.document(), encoding)
+            if enough(data):
+                log.debug('[jsonstream] stopped after %d bytes, have '
+                          'enough results: %s', size, r.url)
+                return data
+            target = scanner.most * 2
+
+    if truncated:
+        return json.loads(scanner.document(), encoding)
+
+    return json.loads(scanner.buf, encoding)
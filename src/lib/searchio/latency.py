@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Per-host histograms of suggestion request latency.
+
+Used to decide when to send a hedged request (see `util.getjson()`).
+Histograms are saved in the cache directory, so they are shared by
+all ``searchio`` processes.
+"""
+
+from __future__ import print_function, absolute_import
+
+import json
+import os
+
+from searchio import LATENCY_MAX_SAMPLES
+from searchio import util
+
+log = util.logger(__name__)
+
+# Upper bounds of histogram buckets in seconds. The last bucket
+# holds everything slower.
+BUCKETS = (0.01, 0.02, 0.03, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.5,
+           0.75, 1.0, 1.5, 2.0, 3.0, 5.0)
+
+
+def bucket(seconds):
+    """Return index of the bucket ``seconds`` belongs in."""
+    i = 0
+    while i < len(BUCKETS) and seconds > BUCKETS[i]:
+        i += 1
+
+    return i
+
+
+class Histogram(object):
+    """Request latencies for one host.
+
+    Attributes:
+        counts (list): Number of requests in each bucket.
+        host (str): Hostname (and port) of suggestion server.
+        path (str): Path of file histogram is saved in.
+
+    """
+
+    def __init__(self, wf, host):
+        """Create new `Histogram` and load its saved counts.
+
+        Args:
+            wf (workflow.Workflow3): Active workflow object.
+            host (str): Hostname (and port) of suggestion server.
+
+        """
+        self.host = host
+        self.path = wf.cachefile(u'latency/{}.json'.format(host))
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self._load()
+
+    @property
+    def total(self):
+        """Number of requests in histogram."""
+        return sum(self.counts)
+
+    def add(self, seconds):
+        """Record the duration of a request and save histogram.
+
+        Once the histogram contains ``LATENCY_MAX_SAMPLES`` requests,
+        all counts are halved, so old requests count for less.
+
+        Args:
+            seconds (float): Duration of request.
+
+        """
+        self.counts[bucket(seconds)] += 1
+        if self.total >= LATENCY_MAX_SAMPLES:
+            self.counts = [n // 2 for n in self.counts]
+
+        self._save()
+
+    def percentile(self, p):
+        """Return (upper bound of bucket containing) percentile ``p``.
+
+        Args:
+            p (float): Percentile between 0 and 1, e.g. 0.9.
+
+        Returns:
+            float: Latency in seconds, or `None` if the slowest
+                bucket contains the percentile.
+
+        """
+        want = p * self.total
+        n = 0
+        for i, count in enumerate(self.counts[:-1]):
+            n += count
+            if n >= want:
+                return BUCKETS[i]
+
+        return None
+
+    def _load(self):
+        """Load saved counts (if any)."""
+        try:
+            with open(self.path) as fp:
+                counts = json.load(fp)
+        except (IOError, OSError, ValueError):
+            return
+
+        if len(counts) == len(self.counts):
+            self.counts = counts
+
+    def _save(self):
+        """Save counts to cache directory."""
+        from workflow.util import atomic_writer
+
+        try:
+            os.makedirs(os.path.dirname(self.path))
+        except OSError as err:
+            if err.errno != 17:
+                raise err
+
+        with atomic_writer(self.path, 'wb') as fp:
+            json.dump(self.counts, fp)
@@ -0,0 +1,406 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Size caps for the suggestion cache with approximate LRU eviction.
+
+Each search's cached suggestions are capped at its
+``cache_max_entries`` entries and ``cache_max_bytes`` bytes, and
+the whole cache at ``CACHE_MAX_ENTRIES`` and ``CACHE_MAX_BYTES``.
+
+Every search has a usage log in the cache directory
+(``usage/<uid>.log``), to which the key of every cache entry that is
+read or written is appended, and counters of its entries and their
+size (``usage/<uid>.json``), which are updated on each write. The
+counters for the whole cache are in ``usage/_all.json``.
+
+When a write takes a search or the whole cache over its cap, or
+a usage log grows beyond ``LRU_LOG_MAX``, ``searchio clean --lru`` is
+started in the background once results have been sent (see
+`schedule`). It replays the usage logs to find the last use of each
+entry, deletes the least-recently-used ones till the caps are only
+``LRU_TARGET`` full, and rewrites the logs without duplicates. It
+also compacts the term dictionaries that are due (see
+`searchio.terms`).
+
+Logs are appended to and rewritten while holding a lock on them
+(``flock()``), and rewritten in place, keeping any keys appended
+since they were read. Counters are only ever changed by adding to or
+subtracting from them, so concurrent updates aren't lost.
+"""
+
+from __future__ import print_function, absolute_import
+
+import fcntl
+import json
+import os
+
+from searchio import CACHE_MAX_BYTES, CACHE_MAX_ENTRIES
+from searchio import LRU_LOG_MAX, LRU_TARGET
+from searchio import cache
+from searchio import terms
+from searchio import util
+
+log = util.logger(__name__)
+
+# Directory of usage logs and counters in cache directory
+USAGE_DIR = 'usage'
+# Name of counters for the whole cache
+ALL = '_all'
+# Name of background job
+JOB_NAME = 'lru'
+
+# Whether eviction is due (set by `written` and `accessed`)
+_due = [False]
+
+
+def _path(wf, name):
+    """Return path of file ``name`` in usage directory."""
+    return wf.cachefile(u'{}/{}'.format(USAGE_DIR, name))
+
+
+def _open(p, flags):
+    """Open file descriptor, creating usage directory if necessary."""
+    try:
+        return os.open(p, flags, 0o600)
+    except OSError as err:
+        if err.errno != 2:
+            raise err
+        os.makedirs(os.path.dirname(p))
+        return os.open(p, flags, 0o600)
+
+
+def _update(p, entries, nbytes):
+    """Add to counters saved at ``p``.
+
+    Args:
+        p (unicode): Path of counters file.
+        entries (int): Number of entries to add.
+        nbytes (int): Number of bytes to add.
+
+    Returns:
+        dict: Updated counters.
+
+    """
+    fd = _open(p, os.O_RDWR | os.O_CREAT)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            d = json.loads(os.read(fd, 1024))
+        except ValueError:  # new or corrupt file
+            d = dict(entries=0, bytes=0)
+
+        d['entries'] = max(0, d['entries'] + entries)
+        d['bytes'] = max(0, d['bytes'] + nbytes)
+
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.ftruncate(fd, 0)
+        os.write(fd, json.dumps(d))
+    finally:
+        os.close(fd)  # also releases lock
+
+    return d
+
+
+def _append(wf, uid, key):
+    """Append ``key`` to usage log of search ``uid``.
+
+    Returns:
+        int: Size of log.
+
+    """
+    fd = _open(_path(wf, uid + '.log'),
+               os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)  # not while log is rewritten
+        os.write(fd, (key + u'\n').encode('utf-8'))
+        return os.fstat(fd).st_size
+    finally:
+        os.close(fd)  # also releases lock
+
+
+def _read(wf, uid):
+    """Return keys in usage log of search ``uid`` and size of log.
+
+    Returns:
+        tuple: List of keys and offset of the end of the last one.
+
+    """
+    try:
+        fd = os.open(_path(wf, uid + '.log'), os.O_RDONLY)
+    except OSError:  # no log
+        return [], 0
+
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        data = b''
+        while True:
+            s = os.read(fd, 65536)
+            if not s:
+                break
+            data += s
+    finally:
+        os.close(fd)  # also releases lock
+
+    size = data.rfind(b'\n') + 1  # ignore incomplete line
+    return data[:size].decode('utf-8').splitlines(), size
+
+
+def _rewrite(wf, uid, keys, since):
+    """Replace usage log of ``uid`` with ``keys``.
+
+    Keys appended to the log after offset ``since`` (i.e. since it
+    was read) are kept after ``keys``.
+
+    """
+    fd = _open(_path(wf, uid + '.log'), os.O_RDWR | os.O_CREAT)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        os.lseek(fd, since, os.SEEK_SET)
+        tail = []
+        while True:
+            s = os.read(fd, 65536)
+            if not s:
+                break
+            tail.append(s)
+
+        data = u''.join(k + u'\n' for k in keys).encode('utf-8')
+        data += b''.join(tail)
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.ftruncate(fd, 0)
+        os.write(fd, data)
+    finally:
+        os.close(fd)  # also releases lock
+
+
+def _over(d, max_entries, max_bytes):
+    """Return `True` if counters ``d`` exceed the caps."""
+    return bool((max_entries and d['entries'] > max_entries) or
+                (max_bytes and d['bytes'] > max_bytes))
+
+
+def counters(wf, name=ALL):
+    """Return saved counters of search ``name`` or the whole cache.
+
+    Returns:
+        dict: Number of ``entries`` and their size in ``bytes``.
+
+    """
+    try:
+        with open(_path(wf, name + '.json')) as fp:
+            return json.load(fp)
+    except (IOError, ValueError):
+        return dict(entries=0, bytes=0)
+
+
+def accessed(wf, uid, key):
+    """Record that cache entry ``key`` of search ``uid`` was read."""
+    if _append(wf, uid, key) > LRU_LOG_MAX:
+        _due[0] = True
+
+
+def written(wf, search, key, old_size=None):
+    """Record that cache entry ``key`` was written.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        search (searchio.engines.Search): Search entry belongs to.
+        key (unicode): Cache key.
+        old_size (int, optional): Size of the entry it replaced.
+
+    """
+    size = os.path.getsize(cache.entry_path(wf, key))
+    if _append(wf, search.uid, key) > LRU_LOG_MAX:
+        _due[0] = True
+
+    entries = 1 if old_size is None else 0
+    nbytes = size - (old_size or 0)
+    d = _update(_path(wf, search.uid + '.json'), entries, nbytes)
+    if _over(d, search.cache_max_entries, search.cache_max_bytes):
+        _due[0] = True
+
+    d = _update(_path(wf, ALL + '.json'), entries, nbytes)
+    if _over(d, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES):
+        _due[0] = True
+
+
+def removed(wf, counts):
+    """Record that entries were deleted.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        counts (dict): ``{uid: (entries, nbytes)}``. Number of entries
+            deleted from each search and their total size.
+
+    """
+    total = [0, 0]
+    for uid, (entries, nbytes) in counts.items():
+        if not entries:
+            continue
+        _update(_path(wf, uid + '.json'), -entries, -nbytes)
+        total[0] += entries
+        total[1] += nbytes
+
+    if total[0]:
+        _update(_path(wf, ALL + '.json'), -total[0], -total[1])
+
+
+def snapshot(wf, uid):
+    """Return state of ``uid``'s usage log and counters for `reset`."""
+    try:
+        size = os.path.getsize(_path(wf, uid + '.log'))
+    except OSError:  # no log
+        size = 0
+
+    return size, counters(wf, uid)
+
+
+def reset(wf, uid, keys, nbytes, snap):
+    """Replace usage log and correct counters of search ``uid``.
+
+    Keys logged and entries written after ``snap`` was taken are kept.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        uid (unicode): Search UID.
+        keys (list): Cache keys, least-recently used first.
+        nbytes (int): Total size of entries.
+        snap (tuple): Returned by `snapshot` before the entries
+            were counted.
+
+    """
+    size, old = snap
+    _rewrite(wf, uid, keys, size)
+    entries, nbytes = len(keys) - old['entries'], nbytes - old['bytes']
+    if entries or nbytes:
+        _update(_path(wf, uid + '.json'), entries, nbytes)
+        _update(_path(wf, ALL + '.json'), entries, nbytes)
+
+
+def evict(wf, uid, max_entries=None, max_bytes=None):
+    """Delete least-recently-used entries of search ``uid``.
+
+    Entries are deleted until there are at most ``max_entries`` of
+    them, totalling at most ``max_bytes`` (`None` = no limit). The
+    usage log is rewritten and the deleted entries subtracted from
+    the counters.
+
+    Returns:
+        tuple: Number of entries deleted and bytes freed.
+
+    """
+    keys, since = _read(wf, uid)
+
+    # Last use of each key
+    last = {}
+    for i, key in enumerate(keys):
+        last[key] = i
+
+    live = []
+    total = 0
+    for key in sorted(last, key=last.get):
+        try:
+            size = os.path.getsize(cache.entry_path(wf, key))
+        except OSError:  # expired or evicted
+            continue
+        live.append((key, size))
+        total += size
+
+    i = n = freed = 0
+    while i < len(live) and (
+            (max_entries is not None and len(live) - i > max_entries) or
+            (max_bytes is not None and total - freed > max_bytes)):
+        size = cache.remove(wf, live[i][0])
+        if size >= 0:
+            n += 1
+            freed += size
+        else:  # deleted meanwhile, and counted by whoever deleted it
+            total -= live[i][1]
+        i += 1
+
+    if n:
+        log.info('[lru/%s] evicted %d entries (%d bytes)', uid, n, freed)
+
+    _rewrite(wf, uid, [k for k, _ in live[i:]], since)
+    removed(wf, {uid: (n, freed)})
+    return n, freed
+
+
+def enforce(wf, searches):
+    """Evict entries of searches over their caps, then over global cap.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        searches (dict): ``{uid: Search}``. Searches that have been
+            deleted aren't in it and get default caps.
+
+    Returns:
+        int: Number of entries deleted.
+
+    """
+    from searchio.engines import Search
+
+    def _target(cap):
+        return int(cap * LRU_TARGET) if cap else None
+
+    try:
+        uids = [fn[:-4] for fn in os.listdir(_path(wf, ''))
+                if fn.endswith('.log')]
+    except OSError:  # nothing cached yet
+        return 0
+
+    i = 0
+    for uid in uids:
+        s = searches.get(uid) or Search(uid)
+        d = counters(wf, uid)
+        if (_over(d, s.cache_max_entries, s.cache_max_bytes) or
+                os.path.getsize(_path(wf, uid + '.log')) > LRU_LOG_MAX):
+            i += evict(wf, uid, _target(s.cache_max_entries),
+                       _target(s.cache_max_bytes))[0]
+
+        if terms.due(wf, uid):
+            terms.compact(wf, uid, cache.keys(wf, uid))
+
+    # Take entries from the biggest searches till the whole cache
+    # is below its cap
+    d = counters(wf)
+    if not _over(d, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES):
+        return i
+
+    extra_entries = extra_bytes = 0
+    if CACHE_MAX_ENTRIES:
+        extra_entries = d['entries'] - _target(CACHE_MAX_ENTRIES)
+    if CACHE_MAX_BYTES:
+        extra_bytes = d['bytes'] - _target(CACHE_MAX_BYTES)
+
+    sizes = sorted(((counters(wf, uid), uid) for uid in uids),
+                   key=lambda t: (t[0]['bytes'], t[0]['entries']),
+                   reverse=True)
+    for c, uid in sizes:
+        if extra_entries <= 0 and extra_bytes <= 0:
+            break
+
+        n, freed = evict(wf, uid, max(0, c['entries'] - extra_entries),
+                         max(0, c['bytes'] - extra_bytes))
+        extra_entries -= n
+        extra_bytes -= freed
+        i += n
+
+    return i
+
+
+def schedule(wf):
+    """Start ``searchio clean --lru`` in the background if it's due."""
+    from searchio import worker
+
+    if not (_due[0] or terms.due_any()) or worker.is_running(wf, JOB_NAME):
+        return
+
+    _due[0] = False
+    worker.submit(wf, JOB_NAME, ['clean', '--lru'])
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Persistent health and cache-effectiveness counters.
+
+Counters are kept per search UID and per suggestion host, each in its
+own small file in the cache directory (``metrics/search/<uid>.json``
+and ``metrics/host/<host>.json``). Files are locked while they're
+updated, so they're shared by all ``searchio`` processes.
+
+Counters:
+
+    lookups     suggestions looked up (i.e. keystrokes)
+    hits        served from the cache before expiry
+    misses      not in the cache or expired
+    stale       expired suggestions served instead of fresh ones
+    requests    HTTP requests sent
+    errors      failed requests by type of error
+    bytes       size of response bodies
+    latency     request durations (counts per `latency.BUCKETS`)
+"""
+
+from __future__ import print_function, absolute_import
+
+import fcntl
+import json
+import os
+from time import time
+
+from searchio.latency import BUCKETS, bucket
+from searchio import util
+
+log = util.logger(__name__)
+
+# Counters that are simply added up
+COUNTERS = ('lookups', 'hits', 'misses', 'stale', 'requests', 'bytes')
+
+
+def empty():
+    """Return new, zeroed counters."""
+    d = {k: 0 for k in COUNTERS}
+    d.update(errors={}, latency=[0] * (len(BUCKETS) + 1), since=time())
+    return d
+
+
+def path(wf, kind, name):
+    """Return path of file counters are saved in.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        kind (str): ``search`` or ``host``.
+        name (unicode): Search UID or hostname.
+
+    Returns:
+        unicode: Path in cache directory.
+
+    """
+    return wf.cachefile(u'metrics/{}/{}.json'.format(kind, name))
+
+
+def update(p, event):
+    """Add ``event`` to counters saved at ``p``.
+
+    Args:
+        p (unicode): Path of counters file.
+        event (dict): Counters to add. ``error`` is the type of error
+            (if any) and ``latency`` the request duration in seconds.
+
+    """
+    try:
+        os.makedirs(os.path.dirname(p))
+    except OSError as err:
+        if err.errno != 17:
+            raise err
+
+    fd = os.open(p, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            d = json.loads(os.read(fd, 65536))
+        except ValueError:  # new or corrupt file
+            d = empty()
+
+        for k in COUNTERS:
+            d[k] += event.get(k, 0)
+
+        if event.get('error'):
+            e = event['error']
+            d['errors'][e] = d['errors'].get(e, 0) + 1
+
+        if event.get('latency') is not None:
+            d['latency'][bucket(event['latency'])] += 1
+
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.ftruncate(fd, 0)
+        os.write(fd, json.dumps(d, separators=(',', ':')))
+    finally:
+        os.close(fd)  # also releases lock
+
+
+def record(wf, uid, host, event):
+    """Add the counters for one lookup to its search's and host's.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        uid (unicode): Search UID.
+        host (unicode): Hostname (and port) of suggestion server.
+        event (dict): Counters to add (see `update`).
+
+    """
+    try:
+        update(path(wf, 'search', uid), event)
+        update(path(wf, 'host', host), event)
+    except (IOError, OSError) as err:  # metrics mustn't break searches
+        log.warning('[metrics] could not save metrics: %s', err)
+
+
+def load(wf, kind):
+    """Return saved counters.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        kind (str): ``search`` or ``host``.
+
+    Returns:
+        dict: ``{name: counters}``
+
+    """
+    dirpath = wf.cachefile(u'metrics/' + kind)
+    if not os.path.exists(dirpath):
+        return {}
+
+    metrics = {}
+    for fn in os.listdir(dirpath):
+        if not fn.endswith('.json'):
+            continue
+
+        try:
+            with open(os.path.join(dirpath, fn)) as fp:
+                metrics[fn[:-5]] = json.load(fp)
+        except (IOError, ValueError):
+            pass
+
+    return metrics
+
+
+def latency_percentile(d, p):
+    """Return (upper bound of bucket containing) percentile ``p``.
+
+    Args:
+        d (dict): Counters.
+        p (float): Percentile between 0 and 1.
+
+    Returns:
+        float: Latency in seconds, or `None` if there are no requests
+            or percentile is in the slowest bucket.
+
+    """
+    total = sum(d['latency'])
+    if not total:
+        return None
+
+    n = 0
+    for i, count in enumerate(d['latency'][:-1]):
+        n += count
+        if n >= p * total:
+            return BUCKETS[i]
+
+    return None
+
+
+def summary(d):
+    """Return one-line summary of counters ``d``.
+
+    Args:
+        d (dict): Counters.
+
+    Returns:
+        unicode: Summary for display in Alfred.
+
+    """
+    parts = [u'{:d} lookup(s)'.format(d['lookups'])]
+    if d['lookups']:
+        parts.append(u'{:0.0f}% cached'.format(
+                     100.0 * d['hits'] / d['lookups']))
+    if d['stale']:
+        parts.append(u'{:d} stale'.format(d['stale']))
+
+    parts.append(u'{:d} request(s)'.format(d['requests']))
+    for p in (0.5, 0.95):
+        v = latency_percentile(d, p)
+        if v is not None:
+            parts.append(u'p{:0.0f} ≤{:0.0f}ms'.format(p * 100, v * 1000))
+
+    errors = sum(d['errors'].values())
+    if errors:
+        parts.append(u'{:d} error(s)'.format(errors))
+
+    return u' · '.join(parts)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Detection of a lost network connection ("offline mode").
+
+Whether the network is up is saved in ``network.json`` in the cache
+directory, so it is shared by all ``searchio`` processes.
+
+A failed request doesn't show that the network is down: a DNS error
+may just mean that one search's host doesn't exist, and a timeout
+that it's slow. So a request that fails with a network-level error
+(timeout, DNS failure, network unreachable) only queues a probe
+(`suspect`), which the worker runs (``searchio network --probe``,
+see `searchio.worker`). The probe connects to ``NETWORK_PROBE_HOST``
+and marks the network offline if it can't. While it's offline,
+searches send no requests (see `searchio.cmd.search.cached_search`),
+and every ``NETWORK_CHECK_INTERVAL`` seconds, one of them queues
+another probe (`check`). The network is back online when a probe or
+any request succeeds.
+
+Probes never delay a search, and the time of the last probe is saved
+after it has finished. The probe host can be changed with the
+``NETWORK_PROBE_HOST`` workflow variable. If it's set to an empty
+value, there are no probes and no offline mode.
+"""
+
+from __future__ import print_function, absolute_import
+
+import errno
+import json
+import os
+import socket
+from time import time
+from urllib2 import URLError
+
+from searchio import NETWORK_CHECK_INTERVAL, NETWORK_PROBE_HOST
+from searchio import NETWORK_PROBE_TIMEOUT
+from searchio import util
+
+log = util.logger(__name__)
+
+# Name of state file in cache directory
+STATE_FILE = 'network.json'
+
+# socket errors that mean the network (not just the host) is down
+NETWORK_ERRNOS = (errno.ENETDOWN, errno.ENETUNREACH, errno.EHOSTUNREACH,
+                  errno.EADDRNOTAVAIL)
+
+# Saved state, loaded once per process
+_state = {}
+
+
+def state(wf):
+    """Return network state.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+
+    Returns:
+        dict: ``online`` (bool), ``checked`` (time of last probe or
+            change) and ``reason`` (why network is offline).
+
+    """
+    if not _state:
+        _state.update(online=True, checked=0.0, reason=None)
+        try:
+            with open(wf.cachefile(STATE_FILE)) as fp:
+                _state.update(json.load(fp))
+        except (IOError, OSError, ValueError):
+            pass
+
+    return _state
+
+
+def offline(wf):
+    """Return `True` if network is believed to be down."""
+    return probe_host() is not None and not state(wf)['online']
+
+
+def set_offline(wf, reason):
+    """Mark network as offline.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        reason (str): Error that showed network is down.
+
+    """
+    if not offline(wf):
+        log.warning('[network] offline: %s', reason)
+
+    _save(wf, online=False, checked=time(), reason=reason)
+
+
+def set_online(wf, checked=False):
+    """Mark network as online.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        checked (bool, optional): Save time of check even if network
+            was already online.
+
+    """
+    if offline(wf):
+        log.info('[network] online')
+    elif not checked:
+        return
+
+    _save(wf, online=True, checked=time(), reason=None)
+
+
+def is_network_error(err):
+    """Return `True` if ``err`` may mean the network is down.
+
+    Args:
+        err (Exception): Error raised by a request.
+
+    Returns:
+        bool: `True` for timeouts, DNS failures and unreachable
+            networks, `False` for other errors (e.g. connection
+            refused).
+
+    """
+    if isinstance(err, util.DeadlineExceeded):  # stalled DNS or connect
+        return True
+
+    if isinstance(err, URLError):
+        err = err.reason
+
+    if isinstance(err, (socket.gaierror, socket.timeout)):
+        return True
+
+    return (isinstance(err, socket.error) and
+            getattr(err, 'errno', None) in NETWORK_ERRNOS)
+
+
+def probe_host():
+    """Return ``(host, port)`` to probe, or `None` if probing is off.
+
+    ``NETWORK_PROBE_HOST`` may be overridden by the workflow variable
+    of the same name.
+
+    """
+    s = os.environ.get('NETWORK_PROBE_HOST', NETWORK_PROBE_HOST).strip()
+    if not s:
+        return None
+
+    host, _, port = s.rpartition(':')
+    if not host or not port.isdigit():  # no port
+        host, port = s, '80'
+
+    return host, int(port)
+
+
+def probe(wf, timeout=NETWORK_PROBE_TIMEOUT):
+    """Connect to probe host and save the result.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        timeout (float, optional): Connection timeout in seconds.
+
+    Returns:
+        bool: `True` if network is online, `False` if it's offline,
+            `None` if probing is off.
+
+    """
+    addr = probe_host()
+    if addr is None:
+        return None
+
+    try:
+        socket.create_connection(addr, timeout).close()
+    except socket.error as err:  # incl. timeout and DNS failure
+        log.debug('[network] probe of %s:%d failed: %s', addr[0], addr[1],
+                  err)
+        set_offline(wf, util.errmsg(err))
+        return False
+
+    set_online(wf, checked=True)
+    return True
+
+
+def _submit(wf):
+    """Queue a probe."""
+    from searchio import worker
+
+    if probe_host() is not None:
+        worker.submit(wf, 'network-probe', ['network', '--probe'],
+                      worker.PRIORITY_HIGH)
+
+
+def suspect(wf):
+    """Queue a probe unless the network was probed recently.
+
+    Called when a request fails with a network error (see
+    `is_network_error`).
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+
+    """
+    if time() - state(wf)['checked'] >= NETWORK_CHECK_INTERVAL:
+        _submit(wf)
+
+
+def check(wf):
+    """Queue a probe if network is offline and a probe is due.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+
+    """
+    if offline(wf) and (time() - state(wf)['checked'] >=
+                        NETWORK_CHECK_INTERVAL):
+        _submit(wf)
+
+
+def _save(wf, **kwargs):
+    """Update and save network state."""
+    from workflow.util import atomic_writer
+
+    d = state(wf)
+    d.update(kwargs)
+    with atomic_writer(wf.cachefile(STATE_FILE), 'wb') as fp:
+        json.dump(d, fp)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Sampled cProfile profiling of ``searchio`` runs.
+
+If the ``SEARCHIO_PROFILE`` workflow variable is set, runs are profiled
+and the profiles saved in the ``profiles`` subdirectory of the cache
+directory. The variable is the fraction of runs to profile, e.g. ``0.05``
+for 1 in 20, or ``1`` (or ``yes``) for all of them.
+
+Use ``searchio profile`` to view the merged profiles.
+"""
+
+from __future__ import print_function, absolute_import
+
+import cProfile
+from datetime import datetime
+import os
+import random
+
+from searchio import PROFILE_MAX_FILES
+from searchio import util
+
+log = util.logger(__name__)
+
+# Name of profile directory in cache directory
+PROFILE_DIR = 'profiles'
+
+
+def sample_rate():
+    """Return fraction of runs to profile from ``SEARCHIO_PROFILE``.
+
+    Returns:
+        float: Number between 0 (off) and 1 (profile every run).
+
+    """
+    v = (os.getenv('SEARCHIO_PROFILE') or '').lower()
+    if not v or v in ('0', 'no', 'off'):
+        return 0.0
+
+    if v in ('yes', 'on'):
+        return 1.0
+
+    try:
+        return min(1.0, max(0.0, float(v)))
+    except ValueError:
+        log.warning('Invalid value for "SEARCHIO_PROFILE": %s', v)
+        return 0.0
+
+
+def command(argv):
+    """Return name of sub-command in ``argv`` (or ``searchio``)."""
+    if argv and not argv[0].startswith('-'):
+        return argv[0]
+
+    return 'searchio'
+
+
+def start():
+    """Start profiler if this run is sampled.
+
+    Returns:
+        cProfile.Profile: Running profiler or `None`.
+
+    """
+    rate = sample_rate()
+    if not rate or random.random() >= rate:
+        return None
+
+    prof = cProfile.Profile()
+    prof.enable()
+    return prof
+
+
+def save(wf, prof, argv):
+    """Stop ``prof`` and save its profile to the cache directory.
+
+    Profiles are named ``<timestamp>.<pid>.<command>.pstats``. Once
+    there are more than ``PROFILE_MAX_FILES``, the oldest are deleted.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        prof (cProfile.Profile): Profiler returned by `start`.
+        argv (list): Command-line arguments (minus program name).
+
+    """
+    prof.disable()
+    dirpath = wf.cachefile(PROFILE_DIR)
+    try:
+        os.makedirs(dirpath)
+    except OSError as err:
+        if err.errno != 17:
+            raise err
+
+    name = '{}.{:d}.{}.pstats'.format(
+        datetime.now().strftime('%Y%m%d-%H%M%S-%f'), os.getpid(),
+        command(argv))
+    prof.dump_stats(os.path.join(dirpath, name))
+    log.debug('[profile] saved %s', name)
+
+    # Filenames start with timestamp, so sorting puts oldest first
+    names = sorted(fn for fn in os.listdir(dirpath)
+                   if fn.endswith('.pstats'))
+    for fn in names[:-PROFILE_MAX_FILES]:
+        try:
+            os.unlink(os.path.join(dirpath, fn))
+        except OSError:  # deleted by another process
+            pass
+
+
+def profiles(wf):
+    """Return saved profiles grouped by sub-command.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+
+    Returns:
+        dict: ``{command: [path, ...]}``
+
+    """
+    dirpath = wf.cachefile(PROFILE_DIR)
+    if not os.path.exists(dirpath):
+        return {}
+
+    d = {}
+    for fn in sorted(os.listdir(dirpath)):
+        if not fn.endswith('.pstats'):
+            continue
+
+        cmd = fn.split('.')[2]
+        d.setdefault(cmd, []).append(os.path.join(dirpath, fn))
+
+    return d
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Per-host token-bucket rate limiter for suggestion requests.
+
+Each host has a bucket holding up to ``burst`` tokens, which refills
+at ``rate`` tokens per second. Every request takes one token, and
+requests are refused while the bucket is empty. Background requests
+(``searchio warm``) use a ``reserve``: they are refused unless the
+bucket would still hold that many tokens afterwards, which keeps the
+rest of the burst for queries the user is actually typing.
+
+The bucket is a tiny file in the cache directory, which is locked
+while it is updated, so it's shared by all ``searchio`` processes.
+"""
+
+from __future__ import print_function, absolute_import
+
+import fcntl
+import json
+import os
+from time import time
+
+from searchio import util
+
+log = util.logger(__name__)
+
+
+class TokenBucket(object):
+    """Rate limiter for one host.
+
+    Attributes:
+        burst (float): Maximum number of tokens in bucket.
+        host (str): Hostname (and port) of suggestion server.
+        path (str): Path of file bucket is saved in.
+        rate (float): Tokens added to bucket per second.
+        reserve (float): Tokens that must be left after taking one.
+
+    """
+
+    def __init__(self, wf, host, rate, burst, reserve=0):
+        """Create new `TokenBucket`.
+
+        Args:
+            wf (workflow.Workflow3): Active workflow object.
+            host (str): Hostname (and port) of suggestion server.
+            rate (float): Tokens added to bucket per second.
+            burst (float): Maximum number of tokens in bucket.
+            reserve (float, optional): Tokens that must be left in
+                bucket after taking one.
+
+        """
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.reserve = reserve
+        self.path = wf.cachefile(u'ratelimit/{}.json'.format(host))
+
+    def take(self):
+        """Take a token from the bucket.
+
+        Returns:
+            bool: `True` if a token was available, i.e. a request
+                may be sent.
+
+        """
+        try:
+            os.makedirs(os.path.dirname(self.path))
+        except OSError as err:
+            if err.errno != 17:
+                raise err
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = time()
+            try:
+                tokens, updated = json.loads(os.read(fd, 1024))
+            except ValueError:  # new or corrupt file
+                tokens, updated = self.burst, now
+
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            ok = tokens >= 1 + self.reserve
+            if ok:
+                tokens -= 1
+
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps([tokens, now]))
+        finally:
+            os.close(fd)  # also releases lock
+
+        if not ok:
+            log.debug('[ratelimit/%s] no tokens left', self.host)
+
+        return ok
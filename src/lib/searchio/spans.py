@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Lightweight timing of the phases of a ``searchio`` run.
+
+Code wraps each phase in `span()`. Time spent in a phase is added up
+over the run, and at the end of the run, `save()` appends a single
+JSON record to ``spans.jsonl`` in the cache directory::
+
+    {"cmd":"search","phases":{"cache":0.0004,...},"search":"google-en",
+     "time":1792396800.0,"total":0.0712}
+
+When the file reaches ``SPANS_MAX_BYTES``, it is renamed to
+``spans.jsonl.1`` (replacing the previous one). ``searchio stats``
+aggregates the records in both files.
+
+This module must not import `searchio.util`, which imports it.
+"""
+
+from __future__ import print_function, absolute_import
+
+from contextlib import contextmanager
+import json
+import os
+import threading
+from time import time
+
+from searchio import SPANS_MAX_BYTES
+
+# Name of span log in cache directory
+SPANS_FILE = 'spans.jsonl'
+
+# Phases in the order they happen
+PHASES = (
+    'startup',  # launcher and imports
+    'init',     # creating Workflow3
+    'run',      # Workflow3.run(), i.e. the sub-command
+    'config',   # loading search configuration
+    'history',  # looking up previously-chosen suggestions
+    'cache',    # reading and writing cached suggestions
+    'fetch',    # util.getjson(), incl. waiting for hedged requests
+    'http',     # workflow.web request (DNS, connect, TLS, headers)
+    'read',     # reading and decoding response body
+    'parse',    # JSONPath extraction
+    'render',   # sending results to Alfred
+    'total',    # launcher to end of run
+)
+
+_lock = threading.Lock()
+_phases = {}
+_tags = {}
+_start = [None]
+
+
+def start(started=None):
+    """Start timing a run.
+
+    Args:
+        started (float, optional): When the run started (as returned
+            by `time.time()`). Defaults to now.
+
+    """
+    _start[0] = started or time()
+
+
+def reset():
+    """Forget the phases and tags recorded so far and stop timing.
+
+    For forked processes, which would otherwise also record their
+    parent's timings.
+    """
+    with _lock:
+        _phases.clear()
+    _tags.clear()
+    _start[0] = None
+
+
+def add(name, seconds):
+    """Add ``seconds`` to phase ``name``."""
+    with _lock:
+        _phases[name] = _phases.get(name, 0.0) + seconds
+
+
+@contextmanager
+def span(name, phases=None):
+    """Context manager that adds its duration to phase ``name``.
+
+    Args:
+        name (str): Name of phase.
+        phases (dict, optional): Add duration to this `dict` instead
+            of the run's phases, e.g. to `add()` only some of them
+            later.
+
+    """
+    t = time()
+    try:
+        yield
+    finally:
+        if phases is None:
+            add(name, time() - t)
+        else:
+            phases[name] = phases.get(name, 0.0) + time() - t
+
+
+def tag(**kwargs):
+    """Add ``kwargs`` (e.g. ``cmd``, ``search``) to the run's record."""
+    _tags.update(kwargs)
+
+
+def save(wf):
+    """Append the run's record to the span log.
+
+    Does nothing if `start()` wasn't called.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+
+    """
+    if _start[0] is None:
+        return
+
+    with _lock:
+        phases = {k: round(v, 6) for k, v in _phases.items()}
+
+    record = dict(_tags, time=round(_start[0], 3),
+                  total=round(time() - _start[0], 6), phases=phases)
+    path = wf.cachefile(SPANS_FILE)
+    try:
+        if os.path.getsize(path) >= SPANS_MAX_BYTES:
+            os.rename(path, path + '.1')
+    except OSError:  # no log yet or rotated by another process
+        pass
+
+    # A single write in append mode, so concurrent runs don't
+    # interleave their records
+    with open(path, 'a') as fp:
+        fp.write(json.dumps(record, separators=(',', ':'),
+                            sort_keys=True) + '\n')
+
+
+def records(wf):
+    """Yield records from span logs, oldest first.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+
+    Yields:
+        dict: Record saved by `save()`.
+
+    """
+    path = wf.cachefile(SPANS_FILE)
+    for p in (path + '.1', path):
+        try:
+            with open(p) as fp:
+                for line in fp:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:  # partially-written line
+                        pass
+        except IOError:
+            pass
@@ -0,0 +1,464 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Per-search dictionaries of interned suggestion terms.
+
+Suggestions for "pyt", "pyth" and "python" are mostly the same, so
+instead of the terms themselves, cache entries store their IDs in
+their search's term dictionary (see `searchio.cache.pack`).
+
+A dictionary is an append-only UTF-8 text file in the cache
+directory, ``terms/<uid>/<gen>.txt``, with one term per line after
+a header line. A term's ID is the offset of its line in the file, so
+reading an entry's terms needs no index: the dictionary is mapped
+into memory and each term read from its offset. That makes a cache
+hit two reads instead of one (the entry, then the pages of the
+dictionary holding its terms), but the dictionary is usually in the
+page cache, and mapping it takes well under a tenth of
+a millisecond.
+
+Adding terms (`intern`) takes a lock on the dictionary and looks up
+each term in its index, ``<gen>.idx``: a hash table (open addressing,
+CRC-32 of the line) of line offsets, mapped into memory. The index
+records how much of the dictionary it covers, and lines added after
+that (e.g. by a process that died before updating the index) are
+indexed on the next call. It's rebuilt from the dictionary when it's
+half full or missing.
+
+Terms are never removed from a dictionary, but `compact` writes a new
+generation containing only the terms referenced by the search's cache
+entries, rewrites the entries and deletes the old generation. It runs
+in the background (with ``searchio clean --lru``) or during
+``searchio clean --full`` once a dictionary has grown to
+``TERMS_COMPACT_RATIO`` times its size after the last compaction.
+
+The header line is ``# <size>``, where ``<size>`` is the size of the
+terms when the dictionary was created by `compact`.
+"""
+
+from __future__ import print_function, absolute_import
+
+import errno
+import fcntl
+import mmap
+import os
+import struct
+from zlib import crc32
+
+from searchio import TERMS_COMPACT_MIN, TERMS_COMPACT_RATIO
+from searchio import util
+
+log = util.logger(__name__)
+
+# Directory of dictionaries in cache directory
+TERMS_DIR = 'terms'
+
+# Index header: number of terms, number of slots, bytes of dictionary
+# indexed. Followed by the slots: offsets of lines (0 = empty).
+INDEX_HEADER = struct.Struct('<III')
+INDEX_SLOT = struct.Struct('<I')
+
+# Minimum number of slots in an index
+INDEX_MIN_SLOTS = 1024
+
+# Mapped dictionaries, ``{(uid, gen): mmap}``
+_maps = {}
+
+# UIDs of searches whose dictionaries are due to be compacted
+_due = set()
+
+
+def _dirpath(wf, uid):
+    """Return path of directory containing dictionaries of ``uid``."""
+    return wf.cachefile(u'{}/{}'.format(TERMS_DIR, uid))
+
+
+def _path(wf, uid, gen):
+    """Return path of dictionary ``gen`` of search ``uid``."""
+    return os.path.join(_dirpath(wf, uid), '{:d}.txt'.format(gen))
+
+
+def _index_path(wf, uid, gen):
+    """Return path of index of dictionary ``gen`` of search ``uid``."""
+    return os.path.join(_dirpath(wf, uid), '{:d}.idx'.format(gen))
+
+
+def _lock(wf, uid):
+    """Return file descriptor holding the lock on ``uid``'s dictionary.
+
+    Closing the descriptor releases the lock.
+
+    """
+    dirpath = _dirpath(wf, uid)
+    try:
+        os.makedirs(dirpath)
+    except OSError as err:
+        if err.errno != errno.EEXIST:
+            raise err
+
+    fd = os.open(os.path.join(dirpath, '.lock'), os.O_RDWR | os.O_CREAT,
+                 0o600)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    return fd
+
+
+def _encode(term):
+    """Return ``term`` as a dictionary line (without newline)."""
+    return u' '.join(term.splitlines()).encode('utf-8')
+
+
+def _header(data):
+    """Return size of terms recorded in dictionary header line."""
+    try:
+        return int(data[2:data.find('\n')])
+    except ValueError:  # missing or corrupt header
+        return 0
+
+
+def generation(wf, uid):
+    """Return current generation of ``uid``'s dictionary, or 0 if none."""
+    try:
+        names = os.listdir(_dirpath(wf, uid))
+    except OSError:
+        return 0
+
+    gens = [int(fn[:-4]) for fn in names
+            if fn.endswith('.txt') and fn[:-4].isdigit()]
+    return max(gens) if gens else 0
+
+
+def _map(wf, uid, gen, size=0):
+    """Return dictionary ``gen`` of ``uid`` mapped into memory.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        uid (unicode): Search UID.
+        gen (int): Generation of dictionary.
+        size (int, optional): Map dictionary again if the mapping is
+            shorter than this (i.e. terms have been added since).
+
+    Returns:
+        mmap.mmap: Mapped dictionary, or `None` if it doesn't exist.
+
+    """
+    key = (uid, gen)
+    if key in _maps and len(_maps[key]) < size:
+        _maps.pop(key).close()
+
+    if key not in _maps:
+        try:
+            with open(_path(wf, uid, gen), 'rb') as fp:
+                _maps[key] = mmap.mmap(fp.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError):  # deleted or empty
+            return None
+
+    return _maps[key]
+
+
+def _find(index, data, line):
+    """Return slot and offset of ``line`` in ``data``.
+
+    Args:
+        index (mmap.mmap): Index of dictionary.
+        data (mmap.mmap): Dictionary.
+        line (str): Encoded term.
+
+    Returns:
+        tuple: Index of the slot holding the line's offset, or of the
+            empty slot it belongs in, and the offset (0 if not found).
+
+    """
+    slots = INDEX_HEADER.unpack_from(index)[1]
+    i = crc32(line) & (slots - 1)
+    n = len(line)
+    while True:
+        pos = INDEX_HEADER.size + i * INDEX_SLOT.size
+        offset = INDEX_SLOT.unpack_from(index, pos)[0]
+        if not offset or data[offset:offset + n + 1] == line + '\n':
+            return i, offset
+        i = (i + 1) & (slots - 1)
+
+
+def _insert(index, slot, offset):
+    """Save ``offset`` in ``slot`` of ``index``."""
+    pos = INDEX_HEADER.size + slot * INDEX_SLOT.size
+    index[pos:pos + INDEX_SLOT.size] = INDEX_SLOT.pack(offset)
+
+
+def _lines(data, start):
+    """Yield ``(offset, line)`` of lines in ``data`` from ``start``."""
+    end = len(data)
+    while start < end:
+        i = data.find('\n', start)
+        if i < 0:  # incomplete line
+            return
+        yield start, data[start:i]
+        start = i + 1
+
+
+def _index(wf, uid, gen, data, extra):
+    """Return index of dictionary ``data``, updating it if necessary.
+
+    The index is rebuilt if it's missing, corrupt or too small to hold
+    ``extra`` more terms, and lines not yet indexed are added.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        uid (unicode): Search UID.
+        gen (int): Generation of dictionary.
+        data (mmap.mmap): Dictionary.
+        extra (int): Number of terms that may be added.
+
+    Returns:
+        mmap.mmap: Writable, mapped index. Caller must close it.
+
+    """
+    path = _index_path(wf, uid, gen)
+    index = None
+    try:
+        with open(path, 'r+b') as fp:
+            index = mmap.mmap(fp.fileno(), 0)
+        count, slots, indexed = INDEX_HEADER.unpack_from(index)
+        if (len(index) != INDEX_HEADER.size + slots * INDEX_SLOT.size or
+                not slots or slots & (slots - 1) or indexed > len(data)):
+            raise ValueError('invalid index')
+        # Keep it at most half full, so probe sequences stay short
+        need = count + data[indexed:].count('\n') + extra
+        if need * 2 > slots:
+            raise ValueError('index full')
+    except (IOError, OSError, ValueError, struct.error):
+        # Build new index with room for the terms to be added
+        if index is not None:
+            index.close()
+        need = data[:].count('\n') + extra
+        slots = INDEX_MIN_SLOTS
+        while slots < need * 4:
+            slots *= 2
+        with open(path, 'wb') as fp:
+            fp.write(INDEX_HEADER.pack(0, slots, 0))
+            fp.write('\0' * (slots * INDEX_SLOT.size))
+        with open(path, 'r+b') as fp:
+            index = mmap.mmap(fp.fileno(), 0)
+        count, indexed = 0, 0
+        log.debug('[terms/%s] building index of dictionary %d (%d slots)',
+                  uid, gen, slots)
+
+    if indexed < len(data):
+        start = indexed or data.find('\n') + 1  # skip header line
+        for offset, line in _lines(data, start):
+            slot, found = _find(index, data, line)
+            if not found:
+                _insert(index, slot, offset)
+                count += 1
+            indexed = offset + len(line) + 1
+        index[:INDEX_HEADER.size] = INDEX_HEADER.pack(count, slots, indexed)
+
+    return index
+
+
+def intern(wf, uid, terms):
+    """Add ``terms`` to ``uid``'s dictionary.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        uid (unicode): Search UID.
+        terms (list): Unicode suggestions.
+
+    Returns:
+        tuple: Generation of dictionary and list of term IDs.
+
+    """
+    fd = _lock(wf, uid)
+    try:
+        gen = generation(wf, uid)
+        if not gen:
+            gen = 1
+            with open(_path(wf, uid, gen), 'wb') as fp:
+                fp.write('# 0\n')
+
+        with open(_path(wf, uid, gen), 'r+b') as fp:
+            data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            index = _index(wf, uid, gen, data, len(terms))
+            try:
+                size = len(data)
+                base = _header(data)
+                ids = []
+                new = []
+                added = {}
+                for term in terms:
+                    line = _encode(term)
+                    slot, offset = _find(index, data, line)
+                    if offset:
+                        ids.append(offset)
+                    elif line in added:
+                        ids.append(added[line])
+                    else:
+                        added[line] = size
+                        ids.append(size)
+                        new.append(line + '\n')
+                        size += len(line) + 1
+
+                if new:
+                    fp.seek(0, os.SEEK_END)
+                    fp.write(''.join(new))
+                    fp.flush()
+                    # Index new lines
+                    count, slots, _ = INDEX_HEADER.unpack_from(index)
+                    for line, offset in added.items():
+                        _insert(index, _find(index, data, line)[0], offset)
+                    index[:INDEX_HEADER.size] = INDEX_HEADER.pack(
+                        count + len(added), slots, size)
+            finally:
+                index.close()
+                data.close()
+    finally:
+        os.close(fd)  # also releases lock
+
+    if size > max(TERMS_COMPACT_MIN, base * TERMS_COMPACT_RATIO):
+        _due.add(uid)
+
+    return gen, ids
+
+
+def lookup(wf, uid, gen, ids):
+    """Return terms with ``ids`` from dictionary ``gen`` of ``uid``.
+
+    Returns:
+        list: Unicode suggestions, or `None` if the dictionary no
+            longer exists (i.e. it has been compacted).
+
+    """
+    data = _map(wf, uid, gen, max(ids) + 1 if ids else 0)
+    if data is None:
+        return None
+
+    terms = []
+    try:
+        for i in ids:
+            j = data.find('\n', i)
+            if j < 0:  # corrupt entry
+                return None
+            terms.append(data[i:j].decode('utf-8'))
+    except (TypeError, UnicodeDecodeError):  # corrupt entry
+        return None
+
+    return terms
+
+
+def due(wf, uid):
+    """Return `True` if ``uid``'s dictionary should be compacted."""
+    if uid in _due:
+        return True
+
+    gen = generation(wf, uid)
+    data = _map(wf, uid, gen) if gen else None
+    if data is None:
+        return False
+
+    size = os.path.getsize(_path(wf, uid, gen))
+    return size > max(TERMS_COMPACT_MIN, _header(data) * TERMS_COMPACT_RATIO)
+
+
+def due_any():
+    """Return `True` if a dictionary this process added to is due."""
+    return bool(_due)
+
+
+def compact(wf, uid, keys):
+    """Replace ``uid``'s dictionary with one containing only used terms.
+
+    Entries referencing other generations can't be read any more and
+    are left to expire. An entry written by another process while the
+    dictionary is being compacted is lost (i.e. read as a miss).
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        uid (unicode): Search UID.
+        keys (list): Cache keys of all the search's entries.
+
+    Returns:
+        int: Number of bytes freed.
+
+    """
+    from workflow.util import atomic_writer
+    from searchio import cache
+
+    fd = _lock(wf, uid)
+    try:
+        gen = generation(wf, uid)
+        if not gen:
+            return 0
+
+        path = _path(wf, uid, gen)
+        with open(path, 'rb') as fp:
+            old = fp.read()
+
+        # Entries using current dictionary and the terms they reference
+        entries = []
+        used = set()
+        for key in keys:
+            data = cache.load(wf, key)
+            if (not cache.is_entry(data) or data[2] != gen or
+                    max(data[3] or [0]) >= len(old)):
+                continue
+            try:
+                mtime = os.path.getmtime(cache.entry_path(wf, key))
+            except OSError:  # deleted
+                continue
+            entries.append((key, mtime, data))
+            used.update(data[3])
+
+        # Keep terms in their old order
+        lines = []
+        for i in sorted(used):
+            lines.append((i, old[i:old.index('\n', i) + 1]))
+
+        body = ''.join(line for _, line in lines)
+        header = '# {:d}\n'.format(len(body))
+        remap = {}
+        offset = len(header)
+        for i, line in lines:
+            remap[i] = offset
+            offset += len(line)
+
+        with atomic_writer(_path(wf, uid, gen + 1), 'wb') as fp:
+            fp.write(header + body)
+
+        # Point entries at new dictionary, keeping their mtimes, which
+        # are their fetch times for the TTL and expiry index
+        for key, mtime, data in entries:
+            cache.save(wf, key, data[:2] + (gen + 1,
+                                            [remap[i] for i in data[3]]))
+            os.utime(cache.entry_path(wf, key), (mtime, mtime))
+
+        os.unlink(path)
+        try:
+            os.unlink(_index_path(wf, uid, gen))
+        except OSError:  # never built
+            pass
+        if (uid, gen) in _maps:
+            _maps.pop((uid, gen)).close()
+        _due.discard(uid)
+        freed = len(old) - offset
+        log.debug('[terms/%s] compacted dictionary: %d entries, %d terms, '
+                  '%d bytes freed', uid, len(entries), len(lines), freed)
+        return freed
+    finally:
+        os.close(fd)  # also releases lock
+
+
+def remove(wf, uid):
+    """Delete all of ``uid``'s dictionaries."""
+    from shutil import rmtree
+
+    dirpath = _dirpath(wf, uid)
+    if os.path.exists(dirpath):
+        rmtree(dirpath)
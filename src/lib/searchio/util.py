@@ -19,8 +19,11 @@ import urllib
 import re
 import subprocess
 import sys
+from time import time
 from uuid import uuid4
 
+from searchio import spans
+
 
 def logger(name):
     return logging.getLogger('workflow.' + name)
@@ -28,28 +31,143 @@ def logger(name):
 
 log = logger(__name__)
 
+# Name of cache file containing pre-parsed docopt patterns
+DOCOPT_CACHE = 'docopt.cpickle'
+
+# In-memory copy of docopt cache. Populated on first call to
+# `parse_args()`.
+_docopt_patterns = None
+
+
+def _docopt_pattern(wf, doc):
+    """Return parsed docopt options and pattern for ``doc``.
+
+    Parsed patterns are cached in the workflow's cache directory,
+    keyed by the MD5 hash of ``doc`` and the version of docopt,
+    so the usage docstrings are only tokenised & parsed once.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        doc (str): Usage docstring.
+
+    Returns:
+        tuple: ``(options, pattern, usage)`` where ``options`` is a list
+            of `docopt.Option`, ``pattern`` the fixed `docopt.Required`
+            pattern and ``usage`` the printable usage.
+
+    """
+    import cPickle
+    import hashlib
+    import docopt
+    from workflow.util import atomic_writer
+
+    global _docopt_patterns
+
+    path = wf.cachefile(DOCOPT_CACHE)
+    if _docopt_patterns is None:
+        _docopt_patterns = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'rb') as fp:
+                    _docopt_patterns = cPickle.load(fp)
+            except Exception as err:
+                log.error('[docopt] bad cache file %r: %r', path, err)
+
+    key = hashlib.md5(docopt.__version__ + _bstr(doc)).hexdigest()
+    if key in _docopt_patterns:
+        return _docopt_patterns[key]
+
+    # Same as `docopt.docopt()`, but without any argv processing
+    usage = docopt.printable_usage(doc)
+    options = docopt.parse_defaults(doc)
+    pattern = docopt.parse_pattern(docopt.formal_usage(usage), options)
+    pattern_options = set(pattern.flat(docopt.Option))
+    for ao in pattern.flat(docopt.AnyOptions):
+        doc_options = docopt.parse_defaults(doc)
+        ao.children = list(set(doc_options) - pattern_options)
+
+    pattern.fix()
+
+    _docopt_patterns[key] = (options, pattern, usage)
+    log.debug('[docopt] caching pattern %s ...', key)
+    try:
+        with atomic_writer(path, 'wb') as fp:
+            cPickle.dump(_docopt_patterns, fp, protocol=-1)
+    except (IOError, OSError) as err:
+        log.error('[docopt] could not write cache %r: %r', path, err)
+
+    return _docopt_patterns[key]
+
+
+def parse_args(wf, doc, argv=None, version=None, options_first=False):
+    """Parse ``argv`` with docopt using cached patterns.
+
+    Drop-in replacement for :func:`docopt.docopt`. Tokenising and
+    parsing of ``doc`` is only done once; the resulting pattern tree
+    is saved in the workflow's cache directory.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        doc (str): Usage docstring.
+        argv (list, optional): Arguments. Defaults to ``sys.argv[1:]``.
+        version (str, optional): Printed if ``--version`` is passed.
+        options_first (bool, optional): Don't allow options after
+            positional arguments.
+
+    Returns:
+        docopt.Dict: Parsed arguments.
+
+    Raises:
+        docopt.DocoptExit: Raised if ``argv`` doesn't match ``doc``.
+
+    """
+    import docopt
+
+    if argv is None:
+        argv = sys.argv[1:]
+
+    options, pattern, usage = _docopt_pattern(wf, doc)
+    docopt.DocoptExit.usage = usage
+    argv = docopt.parse_argv(docopt.TokenStream(argv, docopt.DocoptExit),
+                             list(options), options_first)
+    docopt.extras(True, version, argv, doc)
+    matched, left, collected = pattern.match(argv)
+    if matched and left == []:
+        return docopt.Dict((a.name, a.value)
+                           for a in (pattern.flat() + collected))
+
+    raise docopt.DocoptExit()
+
 
 class FileFinder(object):
     """Find named file in sequence of directories.
 
-    Results are cached.
+    Each directory is listed once and the results are stored in
+    an index of name -> path, so lookups are dictionary hits.
+    If ``cachepath`` is given, the index is saved to disk and
+    re-used as long as the directories' modification times
+    haven't changed.
 
     Attributes:
+        cachepath (str): File to persist the index to (or `None`).
         dirpaths (sequence): Directories to search in.
         extensions (sequence): File extensions to search for.
     """
 
-    def __init__(self, dirpaths, extensions):
+    def __init__(self, dirpaths, extensions, cachepath=None):
         """Create new FileFinder.
 
         Args:
             dirpaths (sequence): Directories to search in.
             extensions (sequence): File extensions to search for.
+            cachepath (str, optional): Path to save index to.
 
         """
         self.dirpaths = dirpaths
         self.extensions = extensions
-        self._hits = {}
+        self.cachepath = cachepath
+        self._files = None
+        self._index = None
 
     def find(self, name, default=None):
         """Find named file in ``self.dirpaths``.
@@ -65,17 +183,10 @@ class FileFinder(object):
         Returns:
             str: Path to file (if found).
         """
-        if name in self._hits:
-            return self._hits[name]
+        if self._index is None:
+            self._load()
 
-        for dp in self.dirpaths:
-            for x in self.extensions:
-                p = os.path.join(dp, '{}.{}'.format(name, x))
-                if os.path.exists(p):
-                    self._hits[name] = p
-                    return p
-
-        return default
+        return self._index.get(name, default)
 
     def __iter__(self):
         """Yield all matching in all directories.
@@ -83,12 +194,133 @@ class FileFinder(object):
         Yields:
             str: Paths to files.
         """
+        if self._files is None:
+            self._load()
+
+        for p in self._files:
+            yield p
+
+    def _mtimes(self):
+        """Modification times of ``self.dirpaths``.
+
+        Returns:
+            list: Modification time of each directory (or `None`
+                if it doesn't exist).
+        """
+        mtimes = []
         for dp in self.dirpaths:
-            for fn in os.listdir(dp):
-                x = os.path.splitext(fn)[1].lstrip('.').lower()
-                if x not in self.extensions:
+            try:
+                mtimes.append(os.stat(dp).st_mtime)
+            except OSError:
+                mtimes.append(None)
+
+        return mtimes
+
+    def _load(self):
+        """Load index from cache or build it from directory listings."""
+        import cPickle
+
+        mtimes = self._mtimes()
+        key = (list(self.dirpaths), list(self.extensions), mtimes)
+
+        if self.cachepath and os.path.exists(self.cachepath):
+            try:
+                with open(self.cachepath, 'rb') as fp:
+                    data = cPickle.load(fp)
+            except Exception as err:
+                log.error('[finder] bad index %r: %r', self.cachepath, err)
+            else:
+                if data.get('key') == key:
+                    self._files = data['files']
+                    self._index = data['index']
+                    return
+
+        self._build()
+
+        if self.cachepath:
+            from workflow.util import atomic_writer
+            data = dict(key=key, files=self._files, index=self._index)
+            try:
+                with atomic_writer(self.cachepath, 'wb') as fp:
+                    cPickle.dump(data, fp, protocol=-1)
+            except (IOError, OSError) as err:
+                log.error('[finder] could not save index %r: %r',
+                          self.cachepath, err)
+
+    def _build(self):
+        """List directories and build name -> path index."""
+        rank = {x: i for i, x in enumerate(self.extensions)}
+        files = []
+        index = {}
+        for dp in self.dirpaths:
+            try:
+                filenames = os.listdir(dp)
+            except OSError:
+                continue
+
+            best = {}  # name: (rank, path) for this directory
+            for fn in filenames:
+                name, x = os.path.splitext(fn)
+                x = x.lstrip('.').lower()
+                if x not in rank:
                     continue
-                yield os.path.join(dp, fn)
+                p = os.path.join(dp, fn)
+                files.append(p)
+                if name not in best or rank[x] < best[name][0]:
+                    best[name] = (rank[x], p)
+
+            for name, (_, p) in best.items():
+                if name not in index:  # earlier directories take priority
+                    index[name] = p
+
+        self._files = files
+        self._index = index
+
+
+class DeadlineExceeded(Exception):
+    """Raised by `getjson()` if a request doesn't finish in time.
+
+    Attributes:
+        url (str): URL that was requested.
+        timeout (float): Time limit in seconds.
+    """
+
+    def __init__(self, url, timeout):
+        """Create new `DeadlineExceeded`.
+
+        Args:
+            url (str): URL that was requested.
+            timeout (float): Time limit in seconds.
+        """
+        self.url = url
+        self.timeout = timeout
+        super(DeadlineExceeded, self).__init__(url, timeout)
+
+    def __str__(self):
+        """Error message."""
+        return 'no response within {:0.2f}s: {}'.format(self.timeout,
+                                                        self.url)
+
+
+class RateLimited(Exception):
+    """Raised by `getjson()` if the rate limiter refuses a request.
+
+    Attributes:
+        url (str): URL that was to be requested.
+    """
+
+    def __init__(self, url):
+        """Create new `RateLimited`.
+
+        Args:
+            url (str): URL that was to be requested.
+        """
+        self.url = url
+        super(RateLimited, self).__init__(url)
+
+    def __str__(self):
+        """Error message."""
+        return 'rate limit exceeded: {}'.format(self.url)
 
 
 class CommandError(Exception):
@@ -143,6 +375,26 @@ class CommandError(Exception):
         return str(self)
 
 
+def errmsg(err):
+    """Return message of exception ``err`` as Unicode.
+
+    Unlike ``str(err)`` or ``unicode(err)``, doesn't fail if the
+    message contains non-ASCII characters.
+
+    """
+    try:
+        return unicode(err)
+    except UnicodeError:
+        pass
+
+    try:  # non-ASCII bytestring message
+        return str(err).decode('utf-8', 'replace')
+    except UnicodeError:  # non-ASCII Unicode message
+        return u' '.join(a if isinstance(a, unicode) else
+                         str(a).decode('utf-8', 'replace')
+                         for a in err.args)
+
+
 def check_output(cmd):
     """Run `cmd` with `subprocess` and capture output.
 
@@ -291,6 +543,40 @@ def mkurl(url, query=None, pcencode=False):
     return url
 
 
+def url_builder(url, pcencode=False):
+    """Return a function that inserts queries into ``url``.
+
+    Faster than calling `mkurl` for each query, as ``url`` is only
+    parsed (and environment variables substituted) once.
+
+    Args:
+        url (str): URL template
+        pcencode (bool, optional): Use percent encoding (instead of
+            plus encoding).
+
+    Returns:
+        callable: Takes a query and returns the same UTF-8 encoded
+            URL as `mkurl`.
+
+    """
+    if pcencode:
+        from urllib import quote
+    else:
+        from urllib import quote_plus as quote
+
+    template = re.sub(r'\$(\{.+?\})', r'\1', _bstr(url))
+    d = {k: quote(v) for k, v in os.environ.items()}
+    d['query'] = '\0'
+    parts = template.format(**d).split('\0')
+
+    def build(query):
+        if not query:
+            return url
+        return quote(_bstr(query)).join(parts)
+
+    return build
+
+
 def url_encode_dict(dic):
     """Copy of `dic` with values URL-encoded.
 
@@ -332,21 +618,208 @@ def shortpath(path):
     return path.replace(os.getenv('HOME'), '~')
 
 
-def getjson(url):
+def percentile(values, p):
+    """Return percentile ``p`` of ``values``.
+
+    Uses linear interpolation between the closest ranks.
+
+    Args:
+        values (list): Sorted numbers.
+        p (float): Percentile between 0 and 1, e.g. 0.95.
+
+    Returns:
+        float: Percentile or `None` if ``values`` is empty.
+
+    """
+    if not values:
+        return None
+
+    k = (len(values) - 1) * p
+    i = int(k)
+    if i + 1 >= len(values):
+        return values[-1]
+
+    return values[i] + (values[i + 1] - values[i]) * (k - i)
+
+
+def getjson(url, timeout=None, hedge=None, limiter=None, encoding=None,
+            max_bytes=None, enough=None, info=None, values=None):
     """Retrieve URL and parse response as JSON.
 
+    If ``timeout`` is given, the request is made in a background
+    thread, so the limit applies to the whole request (DNS lookup,
+    connecting, TLS handshake and reading the response), not just to
+    each socket operation. A request that misses the deadline is
+    abandoned.
+
+    If ``hedge`` is given and there is no response after ``hedge``
+    seconds, a second, identical request is sent on a new connection.
+    Whichever request succeeds first wins.
+
+    If ``limiter`` is given, its ``take()`` method is called before
+    each request is sent, and the request is only sent if it returns
+    `True`.
+
+    If ``max_bytes`` or ``enough`` is given, a response that is larger
+    than ``max_bytes`` or of unknown size is streamed and reading stops
+    early (see `jsonstream.read()`).
+
+    If ``info`` is given, the size of the response body that was read
+    is set as ``info['bytes']``.
+
+    Only the ``http`` and ``read`` spans (see `searchio.spans`) of the
+    request whose response (or error) is returned are recorded, so
+    a hedged request doesn't count twice.
+
     Args:
         url (str): URL to fetch
+        timeout (float, optional): Time limit in seconds.
+        hedge (float, optional): Delay before sending second request.
+        limiter (ratelimit.TokenBucket, optional): Rate limiter.
+        encoding (str, optional): Encoding of response. Default is
+            charset from HTTP headers or UTF-8.
+        max_bytes (int, optional): Maximum number of bytes to read.
+        enough (callable, optional): Called with the data read so
+            far. Reading stops if it returns `True`.
+        info (dict, optional): Receives information about response.
+        values (int, optional): Number of values an array or object
+            must have before ``enough`` is called.
 
     Returns:
         object: JSON-deserialised HTTP response.
 
+    Raises:
+        DeadlineExceeded: Raised if ``timeout`` expires.
+        RateLimited: Raised if ``limiter`` refuses the request.
+
     """
     from workflow import web
-    r = web.get(url)
-    log.debug('[%s] %s', r.status_code, r.url)
-    r.raise_for_status()
-    return r.json()
+
+    def _fetch(phases=None, meta=info):
+        # Keep default socket timeout, so an abandoned thread doesn't
+        # wake up (and spew errors) while the interpreter is exiting.
+        stream = bool(max_bytes or enough)
+        with spans.span('http', phases):
+            r = web.get(url, stream=stream)
+
+        log.debug('[%s] %s', r.status_code, r.url)
+        r.raise_for_status()
+        with spans.span('read', phases):
+            if stream:
+                from searchio import jsonstream
+                return jsonstream.read(r, max_bytes, enough, encoding,
+                                       meta, values)
+
+            data = r.json(encoding)
+            if meta is not None:
+                meta['bytes'] = len(r.content)
+
+            return data
+
+    if limiter and not limiter.take():
+        raise RateLimited(url)
+
+    if timeout is None and hedge is None:
+        return _fetch()
+
+    if timeout is not None and timeout <= 0:
+        raise DeadlineExceeded(url, timeout)
+
+    import errno
+    import select
+    import threading
+
+    # Finished requests. Workers also write a byte to a pipe, so the
+    # main thread can wait for a result with `select`, which, unlike
+    # `Queue.get`, `Event.wait` and `Thread.join` with a timeout,
+    # doesn't poll on Python 2.
+    results = []
+    lock = threading.Lock()
+    rfd, wfd = os.pipe()
+    pipe = [wfd]  # emptied when closed, so late workers don't write
+
+    def _worker(n):
+        # Timings and info of each request are kept apart till it's
+        # known which one's are wanted
+        phases, meta = {}, {}
+        try:
+            result = (n, True, _fetch(phases, meta), phases, meta)
+        except Exception as err:
+            result = (n, False, err, phases, meta)
+
+        with lock:
+            if pipe:
+                results.append(result)
+                os.write(pipe[0], b'.')
+
+    def _use(phases, meta):
+        for name, seconds in phases.items():
+            spans.add(name, seconds)
+        if info is not None:
+            info.update(meta)
+
+    def _start(n):
+        t = threading.Thread(target=_worker, args=(n,),
+                             name='getjson-{:d}'.format(n))
+        t.daemon = True
+        t.start()
+
+    start = time()
+    started = 1
+    hedged = hedge is None  # whether hedging is done with
+    errors = []
+    _start(1)
+    try:
+        while True:
+            elapsed = time() - start
+            waits = []
+            if timeout is not None:
+                waits.append(timeout - elapsed)
+            if not hedged:
+                waits.append(hedge - elapsed)
+            wait = max(0, min(waits)) if waits else None
+
+            try:
+                ready = select.select([rfd], [], [], wait)[0]
+            except select.error as err:
+                if err.args[0] == errno.EINTR:
+                    continue
+                raise
+
+            if not ready:
+                if not hedged and (timeout is None or
+                                   time() - start < timeout):
+                    hedged = True
+                    if not limiter or limiter.take():
+                        log.debug('no response after %0.3fs, hedging: %s',
+                                  hedge, url)
+                        started += 1
+                        _start(started)
+                    continue
+
+                raise DeadlineExceeded(url, timeout)
+
+            os.read(rfd, 1)
+            with lock:
+                n, ok, value, phases, meta = results.pop(0)
+
+            if ok:
+                if n > 1:
+                    log.debug('hedged request won after %0.3fs: %s',
+                              time() - start, url)
+                _use(phases, meta)
+                return value
+
+            errors.append((value, phases, meta))
+            if len(errors) == started:
+                value, phases, meta = errors[0]
+                _use(phases, meta)
+                raise value
+    finally:
+        with lock:
+            del pipe[:]
+            os.close(rfd)
+            os.close(wfd)
 
 
 def in_same_directory(*paths):
@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright (c) 2026 Dean Jackson <deanishe@deanishe.net>
+#
+# MIT Licence. See http://opensource.org/licenses/MIT
+#
+# Created on 2026-10-19
+#
+
+"""Persistent worker that runs ``searchio`` commands in the background.
+
+Replaces `workflow.background.run_in_background`, which launches
+a Python interpreter that double-forks for every job. Instead, `submit`
+adds a job to a queue, and a single worker process (``searchio
+worker``) runs the queued jobs. It's started by `submit` if it isn't
+running, and exits after ``WORKER_IDLE_TIMEOUT`` seconds without jobs.
+
+The queue is a directory in the cache directory, ``jobs/``, with one
+file per job, named after the job. A queued job is ``<name>.json``;
+when it starts, it's renamed to ``<name>.run``. Jobs are
+de-duplicated by name: a job can't be submitted while another with
+the same name is running, and replaces a queued one.
+
+Queued jobs are run lowest priority first, then oldest first, with up
+to ``WORKER_MAX_JOBS`` at a time. Each job runs in a child forked from
+the worker, which already has ``searchio`` imported, with the
+environment of the process that submitted it.
+
+The worker holds a lock on ``jobs/.lock`` while it's running. When
+it's idle, it releases the lock, then checks the queue once more, so
+a job submitted meanwhile either finds the lock free (and starts
+a new worker) or is seen by the exiting worker.
+"""
+
+from __future__ import print_function, absolute_import
+
+import errno
+import fcntl
+import json
+import os
+import sys
+from time import sleep, time
+
+from searchio import WORKER_IDLE_TIMEOUT, WORKER_MAX_JOBS
+from searchio import WORKER_POLL_INTERVAL
+from searchio import util
+
+log = util.logger(__name__)
+
+# Directory of queue in cache directory
+JOBS_DIR = 'jobs'
+
+# Priorities of jobs (lowest runs first)
+PRIORITY_HIGH = 0  # user is waiting for the result
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20  # e.g. prefetching
+
+
+def _path(wf, name):
+    """Return path of file ``name`` in queue directory."""
+    return wf.cachefile(u'{}/{}'.format(JOBS_DIR, name))
+
+
+def _lock(wf):
+    """Return file descriptor holding the worker lock, or `None`.
+
+    Closing the descriptor releases the lock.
+
+    """
+    p = _path(wf, '.lock')
+    try:
+        os.makedirs(os.path.dirname(p))
+    except OSError as err:
+        if err.errno != errno.EEXIST:
+            raise err
+
+    fd = os.open(p, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except IOError:  # worker is running
+        os.close(fd)
+        return None
+
+    return fd
+
+
+def _read(p):
+    """Return job saved at ``p``, or `None`."""
+    try:
+        with open(p) as fp:
+            return json.load(fp)
+    except (IOError, ValueError):  # started, finished or being written
+        return None
+
+
+def _write(p, job):
+    """Save ``job`` to ``p``."""
+    from workflow.util import atomic_writer
+
+    with atomic_writer(p, 'wb') as fp:
+        json.dump(job, fp)
+
+
+def _process_exists(pid):
+    """Return `True` if process ``pid`` exists."""
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+
+    return True
+
+
+def jobs(wf):
+    """Return queued and running jobs.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+
+    Returns:
+        list: Jobs in the order they'll be run (running ones first).
+            Each is a dict with the ``name``, ``argv``, ``priority``
+            and ``queued`` (time) of the job, and the ``pid`` of
+            running jobs.
+
+    """
+    try:
+        names = os.listdir(_path(wf, ''))
+    except OSError:  # no queue
+        return []
+
+    found = []
+    for fn in names:
+        if not fn.endswith(('.json', '.run')):
+            continue
+        job = _read(_path(wf, fn))
+        if job is None:
+            continue
+        if fn.endswith('.run'):
+            job['pid'] = job.get('pid')  # `None` while starting
+            if job['pid'] and not _process_exists(job['pid']):
+                continue  # worker died
+        else:
+            job.pop('pid', None)
+        found.append(job)
+
+    found.sort(key=lambda j: ('pid' not in j, j['priority'], j['queued']))
+    return found
+
+
+def is_running(wf, name):
+    """Return `True` if job ``name`` is running."""
+    job = _read(_path(wf, name + '.run'))
+    if job is None:
+        return False
+
+    # No PID yet if the worker is just starting it
+    return not job.get('pid') or _process_exists(job['pid'])
+
+
+def submit(wf, name, argv, priority=PRIORITY_NORMAL):
+    """Queue ``searchio`` command ``argv`` and start worker if necessary.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        name (str): Name of job. Jobs with the same name aren't run
+            simultaneously.
+        argv (list): Command-line arguments for ``searchio``, e.g.
+            ``['clean', '--lru']``.
+        priority (int, optional): Jobs with lower priorities are
+            run first.
+
+    Returns:
+        bool: `False` if job ``name`` is already running.
+
+    """
+    if is_running(wf, name):
+        log.debug('[worker] job "%s" already running', name)
+        return False
+
+    p = _path(wf, name + '.json')
+    queued = _read(p)
+    if queued:  # keep the higher priority
+        priority = min(priority, queued['priority'])
+
+    try:
+        os.makedirs(os.path.dirname(p))
+    except OSError as err:
+        if err.errno != errno.EEXIST:
+            raise err
+
+    _write(p, dict(name=name, argv=list(argv), priority=priority,
+                   queued=time(), env=dict(os.environ)))
+    log.debug('[worker] queued job "%s": %r', name, argv)
+
+    # Start worker if it isn't running
+    fd = _lock(wf)
+    if fd is not None:
+        os.close(fd)
+        start(wf)
+
+    return True
+
+
+def start(wf):
+    """Launch ``searchio worker`` in a new session."""
+    import subprocess
+
+    with open(os.devnull, 'r+b') as null:
+        subprocess.Popen([wf.workflowfile('searchio'), 'worker'],
+                         cwd=wf.workflowdir, stdin=null, stdout=null,
+                         stderr=null, close_fds=True, preexec_fn=os.setsid)
+
+    log.debug('[worker] started')
+
+
+def _next(wf, running):
+    """Return the next queued job, or `None`.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+        running (set): Names of jobs the worker is running.
+
+    Returns:
+        dict: Job that has been moved to ``<name>.run``.
+
+    """
+    for job in jobs(wf):
+        if 'pid' in job or job['name'] in running:
+            continue
+        p = _path(wf, job['name'] + '.json')
+        # Claim job. Re-read it in case it was replaced meanwhile.
+        try:
+            os.rename(p, p[:-5] + '.run')
+        except OSError:
+            continue
+        return _read(p[:-5] + '.run') or job
+
+    return None
+
+
+def _run(wf, job, lockfd):
+    """Run ``job`` in this (forked) process, then exit."""
+    status = 1
+    try:
+        os.close(lockfd)  # only the worker holds the lock
+        os.environ.clear()
+        os.environ.update({k.encode('utf-8'): v.encode('utf-8')
+                           for k, v in job['env'].items()})
+        os.chdir(wf.workflowdir)
+        sys.argv = ([wf.workflowfile('searchio')] +
+                    [s.encode('utf-8') for s in job['argv']])
+        from searchio.cli import main
+        from searchio import spans
+        spans.reset()  # don't count the worker's startup again
+        main()
+    except SystemExit as err:
+        status = err.code if isinstance(err.code, int) else 1
+    except Exception as err:
+        log.exception('[worker] job "%s" failed: %s', job['name'], err)
+    finally:
+        os._exit(status)
+
+
+def serve(wf):
+    """Run queued jobs until there are none for ``WORKER_IDLE_TIMEOUT``.
+
+    Args:
+        wf (workflow.Workflow3): Active workflow object.
+
+    Returns:
+        int: Number of jobs run, or -1 if a worker is already running.
+
+    """
+    fd = _lock(wf)
+    if fd is None:
+        log.debug('[worker] already running')
+        return -1
+
+    # Jobs left by a worker that died
+    for fn in os.listdir(_path(wf, '')):
+        if fn.endswith('.run'):
+            job = _read(_path(wf, fn)) or {}
+            if not job.get('pid') or not _process_exists(job['pid']):
+                os.unlink(_path(wf, fn))
+
+    children = {}  # {pid: job}
+    n = 0
+    active = time()
+    try:
+        while True:
+            # Reap finished jobs
+            while children:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+                if not pid:
+                    break
+                job = children.pop(pid)
+                os.unlink(_path(wf, job['name'] + '.run'))
+                log.debug('[worker] job "%s" finished in %0.2fs (%d)',
+                          job['name'], time() - job['started'], status >> 8)
+                active = time()
+
+            # Start next jobs
+            while len(children) < WORKER_MAX_JOBS:
+                job = _next(wf, set(j['name'] for j in children.values()))
+                if job is None:
+                    break
+
+                pid = os.fork()
+                if not pid:
+                    _run(wf, job, fd)
+
+                job.update(pid=pid, started=time())
+                children[pid] = job
+                _write(_path(wf, job['name'] + '.run'),
+                       {k: v for k, v in job.items() if k != 'env'})
+                log.debug('[worker] started job "%s" (pid %d): %r',
+                          job['name'], pid, job['argv'])
+                n += 1
+                active = time()
+
+            if not children and time() - active > WORKER_IDLE_TIMEOUT:
+                # Release lock before checking queue for the last time
+                os.close(fd)
+                fd = None
+                if not [j for j in jobs(wf) if 'pid' not in j]:
+                    break
+                fd = _lock(wf)
+                if fd is None:  # a new worker has taken over
+                    break
+                active = time()
+
+            sleep(WORKER_POLL_INTERVAL)
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+    log.debug('[worker] exiting after %d job(s)', n)
+    return n
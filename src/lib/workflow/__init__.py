@@ -10,7 +10,7 @@
 
 """A helper library for `Alfred <http://www.alfredapp.com/>`_ workflows."""
 
-import os
+import pkgutil
 
 # Workflow objects
 from .workflow import Workflow, manager
@@ -61,7 +61,7 @@ from .workflow import (
 
 
 __title__ = 'Alfred-Workflow'
-__version__ = open(os.path.join(os.path.dirname(__file__), 'version')).read()
+__version__ = pkgutil.get_data(__name__, 'version')
 __author__ = 'Dean Jackson'
 __licence__ = 'MIT'
 __copyright__ = 'Copyright 2014-2017 Dean Jackson'
@@ -26,6 +26,7 @@ import subprocess
 import pickle
 
 from workflow import Workflow
+from util import script_command
 
 __all__ = ['is_running', 'run_in_background']
 
@@ -233,7 +234,7 @@ def run_in_background(name, args, **kwargs):
         _log().debug('[%s] command cached: %s', name, argcache)
 
     # Call this script
-    cmd = ['/usr/bin/python', __file__, name]
+    cmd = script_command('background', name)
     _log().debug('[%s] passing job to background runner: %r', name, cmd)
     retcode = subprocess.call(cmd)
 
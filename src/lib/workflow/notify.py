@@ -24,7 +24,9 @@ icon and then calls the application to post notifications.
 
 from __future__ import print_function, unicode_literals
 
+import io
 import os
+import pkgutil
 import plistlib
 import shutil
 import subprocess
@@ -107,14 +109,15 @@ def install_notifier():
     Changes the bundle ID of the installed app and gives it the
     workflow's icon.
     """
-    archive = os.path.join(os.path.dirname(__file__), 'Notify.tgz')
+    # Read via pkgutil, so it also works if the library is zipped
+    archive = io.BytesIO(pkgutil.get_data('workflow', 'Notify.tgz'))
     destdir = wf().datadir
     app_path = os.path.join(destdir, 'Notify.app')
     n = notifier_program()
     log().debug('installing Notify.app to %r ...', destdir)
     # z = zipfile.ZipFile(archive, 'r')
     # z.extractall(destdir)
-    tgz = tarfile.open(archive, 'r:gz')
+    tgz = tarfile.open(fileobj=archive, mode='r:gz')
     tgz.extractall(destdir)
     assert os.path.exists(n), \
         'Notify.app could not be installed in %s' % destdir
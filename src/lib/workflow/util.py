@@ -325,6 +325,36 @@ def appinfo(name):
     return AppInfo(unicodify(name), unicodify(path), unicodify(bid))
 
 
+def script_command(name, *args):
+    """Return command to run library module ``name`` as a script.
+
+    Modules such as ``background`` and ``update`` are run as scripts
+    via ``/usr/bin/python``. If the library has been imported from a
+    zip archive, there is no script file to run, so the module is
+    run from the archive with :mod:`runpy` instead.
+
+    Args:
+        name (str): Name of module in this package, e.g. ``update``.
+        *args: Arguments to pass to the script.
+
+    Returns:
+        list: Command suitable for passing to :func:`subprocess.call`.
+
+    """
+    dirpath = os.path.dirname(__file__)
+    script = os.path.join(dirpath, name + '.py')
+    if os.path.exists(script):
+        return ['/usr/bin/python', script] + list(args)
+
+    archive = os.path.abspath(os.path.dirname(dirpath))
+    package = os.path.basename(dirpath)
+    code = ('import sys, runpy; sys.path.insert(0, {!r}); '
+            'runpy.run_module({!r}, run_name="__main__", alter_sys=True)'
+            ).format(str(archive), str('{}.{}'.format(package, name)))
+
+    return ['/usr/bin/python', '-O', '-S', '-c', code] + list(args)
+
+
 @contextmanager
 def atomic_writer(fpath, mode):
     """Atomic file writer.
@@ -188,12 +188,15 @@ class Response(object):
 
     """
 
-    def __init__(self, request, stream=False):
+    def __init__(self, request, stream=False,
+                 timeout=socket._GLOBAL_DEFAULT_TIMEOUT):
         """Call `request` with :mod:`urllib2` and process results.
 
         :param request: :class:`urllib2.Request` instance
         :param stream: Whether to stream response or retrieve it all at once
         :type stream: bool
+        :param timeout: timeout of socket operations in seconds
+        :type timeout: int
 
         """
         self.request = request
@@ -211,7 +214,7 @@ class Response(object):
 
         # Execute query
         try:
-            self.raw = urllib2.urlopen(request)
+            self.raw = urllib2.urlopen(request, timeout=timeout)
         except urllib2.HTTPError as err:
             self.error = err
             try:
@@ -261,14 +264,25 @@ class Response(object):
 
         self._stream = value
 
-    def json(self):
+    def json(self, encoding=None):
         """Decode response contents as JSON.
 
+        The response body is passed straight to the JSON parser without
+        being decoded to Unicode first or sniffed for an encoding (as
+        :attr:`text` does). It is decoded with ``encoding``, the charset
+        from the ``Content-Type`` header or UTF-8, in that order.
+
+        :param encoding: encoding of response body (overrides HTTP
+            headers)
+        :type encoding: str
         :returns: object decoded from JSON
         :rtype: list, dict or unicode
 
         """
-        return json.loads(self.content, self.encoding or 'utf-8')
+        if not encoding:
+            encoding = self.raw.info().getparam('charset') or 'utf-8'
+
+        return json.loads(self.content, encoding)
 
     @property
     def encoding(self):
@@ -295,8 +309,8 @@ class Response(object):
 
             # Decompress gzipped content
             if self._gzipped:
-                decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
-                self._content = decoder.decompress(self.raw.read())
+                self._content = zlib.decompress(self.raw.read(),
+                                                16 + zlib.MAX_WBITS)
 
             else:
                 self._content = self.raw.read()
@@ -455,6 +469,11 @@ class Response(object):
         return encoding
 
 
+#: Additional :mod:`urllib2` handlers used by :func:`request`, e.g.
+#: to record or replay responses.
+handlers = []
+
+
 def request(method, url, params=None, data=None, headers=None, cookies=None,
             files=None, auth=None, timeout=60, allow_redirects=False,
             stream=False):
@@ -477,7 +496,8 @@ def request(method, url, params=None, data=None, headers=None, cookies=None,
     :type files: dict
     :param auth: username, password
     :type auth: tuple
-    :param timeout: connection timeout limit in seconds
+    :param timeout: timeout of socket operations (connect, each read)
+        in seconds. Only applies to this request's socket.
     :type timeout: int
     :param allow_redirects: follow redirections
     :type allow_redirects: bool
@@ -501,10 +521,8 @@ def request(method, url, params=None, data=None, headers=None, cookies=None,
 
     """
     # TODO: cookies
-    socket.setdefaulttimeout(timeout)
-
     # Default handlers
-    openers = []
+    openers = list(handlers)
 
     if not allow_redirects:
         openers.append(NoRedirectHandler())
@@ -568,7 +586,7 @@ def request(method, url, params=None, data=None, headers=None, cookies=None,
         url = urlparse.urlunsplit((scheme, netloc, path, query, fragment))
 
     req = urllib2.Request(url, data, headers)
-    return Response(req, stream)
+    return Response(req, stream, timeout)
 
 
 def get(url, params=None, headers=None, cookies=None, auth=None,
@@ -47,6 +47,7 @@ from util import (
     AcquisitionError,  # imported to maintain API
     atomic_writer,
     LockFile,
+    script_command,
     uninterruptible,
 )
 
@@ -2322,11 +2323,7 @@ class Workflow(object):
             from background import run_in_background
 
             # update.py is adjacent to this file
-            update_script = os.path.join(os.path.dirname(__file__),
-                                         b'update.py')
-
-            cmd = ['/usr/bin/python', update_script, 'check', github_slug,
-                   version]
+            cmd = script_command('update', 'check', github_slug, version)
 
             if self.prereleases:
                 cmd.append('--prereleases')
@@ -2362,11 +2359,7 @@ class Workflow(object):
         from background import run_in_background
 
         # update.py is adjacent to this file
-        update_script = os.path.join(os.path.dirname(__file__),
-                                     b'update.py')
-
-        cmd = ['/usr/bin/python', update_script, 'install', github_slug,
-               version]
+        cmd = script_command('update', 'install', github_slug, version)
 
         if self.prereleases:
             cmd.append('--prereleases')